@@ -1,10 +1,109 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import importlib
+
 import click
 
+# command -> (module, attribute). The module of a command is imported only
+# when the command is run, its help is read from the source of the module
+COMMANDS = {
+    'generate': ('bdgame.commands.generate', 'generate'),
+    'make': ('bdgame.commands.make', 'make'),
+    'play': ('bdgame.commands.play', 'play'),
+    'serve': ('bdgame.commands.serve', 'serve'),
+    'simulate': ('bdgame.commands.simulate', 'simulate'),
+    'solve': ('bdgame.commands.solve', 'solve'),
+    'stats': ('bdgame.commands.stats', 'stats'),
+    'validate': ('bdgame.commands.validate', 'validate'),
+}
+
+
+def _docstring(module, attribute):
+    ''' Return the docstring of the function of the module, found in the
+    source of the module without importing it. None if the module was
+    installed without its source '''
+
+    # only --help reads the sources, the modules are left out of the start
+    import ast
+    import importlib.util
+
+    spec = importlib.util.find_spec(module)
+    source = spec.loader.get_source(module)
+    if source is None:
+        return None
+    tree = ast.parse(source)
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == attribute:
+            return ast.get_docstring(node) or ''
+    return ''
+
+
+def _short_help(doc, limit):
+    ''' Return the first sentence of the docstring cut to limit characters,
+    like click shows the commands it loaded '''
+
+    text = ' '.join(doc.split('\n\n', 1)[0].split())
+    end = text.find('. ')
+    if end != -1:
+        text = text[:end + 1]
+    if len(text) > limit:
+        text = text[:limit - 3].rsplit(' ', 1)[0] + '...'
+    return text
+
 
-@click.group()
+class LazyGroup(click.Group):
+    ''' Group loading the module of a subcommand only when it is used '''
+
+    def __init__(self, *args, **kwargs):
+        ''' Instantiate the group
+        :args lazy_commands: A dict like COMMANDS
+        '''
+        self.lazy_commands = kwargs.pop('lazy_commands', {})
+        super(LazyGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        ''' Return the names of all the commands '''
+        names = set(super(LazyGroup, self).list_commands(ctx))
+        return sorted(names | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        ''' Return the command, importing its module if needed '''
+
+        command = super(LazyGroup, self).get_command(ctx, cmd_name)
+        if command is not None or cmd_name not in self.lazy_commands:
+            return command
+        module, attribute = self.lazy_commands[cmd_name]
+        command = getattr(importlib.import_module(module), attribute)
+        self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(self, ctx, formatter):
+        ''' List the commands with their short help, without loading them '''
+
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            command = self.commands.get(name)
+            doc = None
+            if command is None:
+                doc = _docstring(*self.lazy_commands[name])
+                if doc is None:
+                    # installed without the sources, the command is loaded
+                    command = self.get_command(ctx, name)
+            if command is None:
+                rows.append((name, _short_help(doc, limit)))
+            elif not command.hidden:
+                rows.append((name, command.get_short_help_str(limit)))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 def app():
     pass
 
@@ -12,9 +111,6 @@ __all__ = [
     'app',
 ]
 
-import bdgame.commands.make
-import bdgame.commands.play
-
 
 if __name__ == '__main__':
     app()
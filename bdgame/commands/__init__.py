@@ -1 +1,16 @@
+#!/usr/bin/env python
+# coding=utf-8
 
+import os
+
+
+def input_path(path):
+    ''' Relative input paths are relative to the source checkout '''
+
+    if not path.startswith('/'):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)),
+            '../..',
+            path
+        )
+    return path
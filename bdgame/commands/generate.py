@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+
+import click
+
+from bdgame.commands import input_path
+from bdgame.exceptions import BDException
+from bdgame.utils.generator import generate as generate_puzzles
+
+
+@click.command()
+@click.option('--words', required=True,
+              help="File with the words to place, one per line")
+@click.option('--gsize', help="Grid size of the puzzles", default="15 15")
+@click.option('--count', default=1, type=int,
+              help="Number of puzzles to generate")
+@click.option('--wcount', default=4, type=int,
+              help="Number of correct words in each puzzle")
+@click.option('--nplayers', default=2, type=int,
+              help="The number of players written in the puzzles")
+@click.option('--seed', default='0',
+              help="Seed of the run, the same seed makes the same puzzles")
+@click.option('--out', default='puzzles',
+              help="Directory to write the puzzles to")
+@click.option('--processes', default=None, type=int,
+              help="Number of worker processes, all the cpus by default")
+def generate(words, gsize, count, wcount, nplayers, seed, out, processes):
+    ''' Generate puzzles in the format play --inp reads '''
+
+    gsize = gsize.strip().split()
+    if len(gsize) != 2:
+        click.echo('Grid size format is wrong.')
+        sys.exit(1)
+    length, breadth = int(gsize[0]), int(gsize[1])
+
+    if not wcount > 0:
+        click.echo("Don't make fool of the players")
+        sys.exit()
+
+    with click.open_file(input_path(words), 'r') as stream:
+        words = stream.read().split()
+
+    failed = 0
+    try:
+        for index, path, error in generate_puzzles(
+                words, length, breadth, wcount, count, out, seed=seed,
+                nplayers=nplayers, processes=processes):
+            if error:
+                failed += 1
+                click.echo('Puzzle %s not generated: %s' % (index, error),
+                           err=True)
+    except BDException as err:
+        click.echo(err.msg)
+        sys.exit(1)
+
+    click.echo('%s puzzles written to %s' % (count - failed, out))
+    if failed:
+        sys.exit(1)
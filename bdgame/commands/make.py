@@ -1,44 +1,56 @@
 #!/usr/bin/env python
 # coding=utf-8
 
-import os
 import sys
 
 import click
 
-from bdgame.app import app
-from bdgame.utils import create_config, take_console_input
+from bdgame.commands import input_path
+from bdgame.exceptions import BDException
+from bdgame.utils import create_config, grid_dir, take_console_input
+from bdgame.utils.grid import get_backend, read_grid, write_grid
+from bdgame.utils.location import parse_location
 
-@app.command()
+@click.command()
 @click.option('--gsize', help="Grid size of board", default="15 15")
 @click.option('--inp', help="Input file path of the grid")
 @click.option('--wcount', prompt="Number of correct words",
               help="Number of correct words", type=int)
 @click.option('--nplayers', prompt="Number of players in the game", default=2,
               help="The number of players that will play this game", type=int)
-def make(nplayers, gsize, inp, wcount):
+@click.option('--game', 'game_id',
+              help="Id to keep the game under in the store ($BDGAME_STORE, "
+                   "$HOME/.bdgame.db by default) instead of $HOME/.bdgame")
+def make(nplayers, gsize, inp, wcount, game_id):
     ''' Given the game configurations, make the game '''
 
     if not wcount > 0:
         click.echo("Don't make fool of the players")
         sys.exit()
 
-    if inp:
-        if not inp.startswith('/'):
-            inp = os.path.join(os.path.abspath(
-                os.path.dirname(__file__)),
-                '../..',
-                inp
-            )
-        with click.open_file(inp, 'r') as input_file:
-            grid = input_file.read()
-            glen = len(grid.splitlines())
-            gbred = len(grid.splitlines()[0].split())
-            gsize = "%s %s" % (glen, gbred)
-    else:
-        if not gsize:
-            gsize = click.prompt("Grid size", default="15 15")
-        grid = take_console_input(gsize)
+    # with the mmap backend the rows go straight to a grid file
+    mapped = get_backend() == 'mmap' and game_id is None
+    try:
+        if inp:
+            inp = input_path(inp)
+            # the rows are checked and stored while the file is read
+            with click.open_file(inp, 'r') as input_file:
+                if mapped:
+                    grid = write_grid(input_file, grid_dir())
+                else:
+                    grid = read_grid(input_file)
+        else:
+            if not gsize:
+                gsize = click.prompt("Grid size", default="15 15")
+            lines = take_console_input(gsize).splitlines()
+            if mapped:
+                grid = write_grid(lines, grid_dir())
+            else:
+                grid = read_grid(lines)
+    except BDException as err:
+        click.echo('Grid is not valid: %s' % err.msg)
+        sys.exit(1)
+    gsize = "%s %s" % (grid.length, grid.breadth)
 
     players = []
     for i in range(1, nplayers + 1):
@@ -60,19 +72,34 @@ def make(nplayers, gsize, inp, wcount):
             click.echo("Locations are two D coordinates, they have to be pairs"
                        " Try again.")
             sys.exit()
-        elif location in locations:
+        try:
+            location = parse_location(location)
+            if not location.shape:
+                raise BDException('Location %s is not a straight line or '
+                                  'an L' % location)
+            location.check_bounds(grid.length, grid.breadth)
+        except BDException as err:
+            click.echo("%s, try again." % err.msg)
+            sys.exit()
+        if location in locations:
             click.echo("Duplicate locations not allowed")
             sys.exit()
         locations.append(location)
         click.echo('Location noted')
 
     # store the locations as comma separated strings
-    locations = ','.join(locations)
-    create_config(
-        nplayers=nplayers,
-        gsize=gsize,
-        grid=grid,
-        players=players,
-        wcount=int(wcount),
-        locations=locations,
-    )
+    locations = ','.join(str(i) for i in locations)
+    try:
+        create_config(
+            nplayers=nplayers,
+            gsize=gsize,
+            grid=None,
+            players=players,
+            wcount=int(wcount),
+            locations=locations,
+            parsed_grid=grid,
+            game=game_id,
+        )
+    except BDException as err:
+        click.echo(err.msg)
+        sys.exit(1)
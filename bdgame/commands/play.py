@@ -1,38 +1,93 @@
 #!/usr/bin/env python
 # coding=utf-8
 
-import os
+import sys
 
 import click
 
-from bdgame.app import app
-from bdgame.utils import load_game_conf, override_conf
+from bdgame.commands import input_path
+from bdgame.exceptions import BDException
+from bdgame.utils import journal, load_game_conf, metrics, override_conf
 from bdgame.utils.game import prepare_game
+from bdgame.utils.turns import ORDERS
 
 
-@app.command()
+@click.command()
 @click.option('--inp',
               help="Input file path of the grid containing grid and other details",
               required=False)
-def play(inp):
+@click.option('--metrics', 'metrics_path',
+              help="File to write timings and counters of the game to, "
+                   ".prom or .txt for the Prometheus text format else "
+                   "json. Also read from $BDGAME_METRICS")
+@click.option('--resume', is_flag=True, default=False,
+              help="Go on with the last unfinished game of the puzzle")
+@click.option('--journal-dir',
+              help="Directory the games are journaled in, "
+                   "$HOME/.bdgame-journals by default")
+@click.option('--keep-journals', default=journal.KEEP_JOURNALS, type=int,
+              help="Journals of finished games kept in the journal "
+                   "directory, the oldest ones are removed. 0 keeps them all")
+@click.option('--game', 'game_id',
+              help="Id of the game to play from the store ($BDGAME_STORE, "
+                   "$HOME/.bdgame.db by default) instead of $HOME/.bdgame")
+@click.option('--order', type=click.Choice(ORDERS), default='round-robin',
+              help="Who plays first, the players then play in turns")
+@click.option('--viewport', is_flag=True, default=False,
+              help="Show a board bigger than the terminal a window at a "
+                   "time, moved with /up /down /left /right /last at the "
+                   "prompt")
+def play(inp, metrics_path, resume, journal_dir, keep_journals, game_id, order,
+         viewport):
     ''' Play the game after loading configuration from .bdgame '''
 
+    metrics.configure(metrics_path)
+
     if inp:
-        if not inp.startswith('/'):
-            inp = os.path.join(os.path.abspath(
-                os.path.dirname(__file__)),
-                '../..',
-                inp
-            )
+        inp = input_path(inp)
 
-        with click.open_file(inp, 'r') as stream:
-            data = stream.readlines()
-        override_conf(data)
+        try:
+            with click.open_file(inp, 'r') as stream:
+                override_conf(stream, game=game_id)
+        except BDException as err:
+            click.echo(err.msg)
+            sys.exit(1)
 
-    # Loads the config and returns a dict
-    conf = load_game_conf()
+    # Loads the config, or the game of the store, and returns a dict
+    try:
+        conf = load_game_conf(game=game_id)
+    except BDException as err:
+        if game_id is None:
+            raise
+        click.echo(err.msg)
+        sys.exit(1)
 
     # game time
-    game = prepare_game(conf)
-    result = game.play_game()
-    game.display_results(result)
+    game = prepare_game(conf, order=order, viewport=viewport)
+    result = None
+    if resume:
+        path = journal.find_unfinished(journal_dir, journal.puzzle_id(conf))
+        if path is None:
+            click.echo('No unfinished game of this puzzle to resume')
+            sys.exit(1)
+        try:
+            result = journal.resume(game, path, keep=keep_journals)
+        except BDException as err:
+            click.echo(err.msg)
+            sys.exit(1)
+        click.echo('Resumed game %s after %s turns' % (
+            game.journal.game_id, game.turns))
+    else:
+        journal.start(game, journal_dir, keep=keep_journals)
+
+    try:
+        if result is None:
+            result = game.play_game()
+        if game_id is not None:
+            # sqlite3 is only imported for games of the store
+            from bdgame.utils import store
+            store.save_result(game_id, game.players, result)
+        game.display_results(result)
+    finally:
+        game.journal.close()
+        metrics.dump()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+
+import click
+
+from bdgame.commands import input_path
+from bdgame.exceptions import BDException
+from bdgame.utils.server import serve as serve_games
+
+
+@click.command()
+@click.argument('puzzles', nargs=-1, required=True)
+@click.option('--host', default='127.0.0.1', help="Address to listen on")
+@click.option('--port', default=8765, type=int, help="Port to listen on")
+def serve(puzzles, host, port):
+    ''' Host games of the given puzzle files or directories over TCP '''
+
+    click.echo('Serving bdgame on %s:%s' % (host, port))
+    try:
+        serve_games([input_path(path) for path in puzzles], host, port)
+    except BDException as err:
+        click.echo(err.msg)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+import json
+
+import click
+
+from bdgame.commands import input_path
+from bdgame.exceptions import BDException
+from bdgame.utils import build_game_conf, parse_puzzle
+from bdgame.utils.bots import make_bot
+from bdgame.utils.simulate import simulate as simulate_games
+
+
+@click.command()
+@click.option('--inp', required=True,
+              help="Puzzle file in the play_input.txt format")
+@click.option('--bots', default='perfect,knows:50',
+              help="Comma separated bots playing: random, perfect or knows:N")
+@click.option('--games', default=1000, type=int,
+              help="Number of games to play")
+@click.option('--seed', default='0',
+              help="Seed of the run, the same seed plays the same games")
+@click.option('--max-turns', default=10000, type=int,
+              help="Turns after which a game is stopped")
+@click.option('--processes', default=None, type=int,
+              help="Number of worker processes, all the cpus by default")
+@click.option('--journal-dir',
+              help="Directory to journal every game in, for bdgame stats")
+def simulate(inp, bots, games, seed, max_turns, processes, journal_dir):
+    ''' Play many games between bots and show the results as json '''
+
+    bots = [bot.strip() for bot in bots.split(',') if bot.strip()]
+    if len(bots) < 2:
+        click.echo('At least two bots are needed to play')
+        sys.exit(1)
+    try:
+        for bot in bots:
+            make_bot(bot)
+    except ValueError as err:
+        click.echo(str(err))
+        sys.exit(1)
+
+    with click.open_file(input_path(inp), 'r') as stream:
+        data = stream.readlines()
+
+    try:
+        puzzle = parse_puzzle(data)
+        glen, gbred = [int(i) for i in puzzle['gsize'].split()]
+        conf = build_game_conf(
+            nplayers=len(bots),
+            players=bots,
+            glen=glen,
+            gbred=gbred,
+            grid=puzzle['grid'],
+            wcount=puzzle['wcount'],
+            locations=','.join(puzzle['locations']),
+        )
+    except BDException as err:
+        click.echo(err.msg)
+        sys.exit(1)
+
+    result = simulate_games(conf, bots, games, seed=seed,
+                            max_turns=max_turns, processes=processes,
+                            journal_dir=journal_dir)
+    click.echo(json.dumps(result, indent=2, sort_keys=True))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+
+import click
+
+from bdgame.commands import input_path
+from bdgame.utils import _check_grid_sane, _get_grid
+from bdgame.utils.solver import build_trie, solve as find_words
+
+
+@click.command()
+@click.option('--inp', required=True,
+              help="Input file path of the grid, like for make")
+@click.option('--dictionary', required=True,
+              help="File with the words to look for, one per line")
+@click.option('--out', default='-',
+              help="File to write the locations to, stdout by default")
+@click.option('--min-length', default=2, type=int,
+              help="Shortest word to look for")
+@click.option('--show-words', is_flag=True, default=False,
+              help="Write the word after each location")
+def solve(inp, dictionary, out, min_length, show_words):
+    ''' Find all the words of a dictionary in a grid '''
+
+    with click.open_file(input_path(inp), 'r') as input_file:
+        text = input_file.read()
+    grid = _get_grid(text)
+    length, breadth = grid.length, grid.breadth
+    if not length or not _check_grid_sane(text, length, breadth):
+        click.echo('All the rows of the grid must have the same length')
+        sys.exit(1)
+
+    with click.open_file(input_path(dictionary), 'r') as words:
+        trie = build_trie(words, min_length=min_length,
+                          max_length=max(length, breadth))
+
+    count = 0
+    with click.open_file(out, 'w') as output:
+        for word, r1, c1, r2, c2 in find_words(grid, length, breadth, trie):
+            if (r1, c1) == (r2, c2):
+                location = '%s %s' % (r1, c1)
+            else:
+                location = '%s %s %s %s' % (r1, c1, r2, c2)
+            if show_words:
+                location = '%s %s' % (location, word)
+            output.write(location + '\n')
+            count += 1
+    click.echo('%s words found' % count, err=True)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+import json
+
+import click
+
+from bdgame.utils.journal import journal_dir
+from bdgame.utils.stats import CHUNK_SIZE, stats as read_stats
+
+
+@click.command()
+@click.argument('paths', nargs=-1)
+@click.option('--out', default='-', help="File to write the json report to")
+@click.option('--top', default=10, type=int,
+              help="Length of the lists of words found first and never found")
+@click.option('--processes', default=None, type=int,
+              help="Number of worker processes, all the cpus by default")
+@click.option('--chunk-size', default=CHUNK_SIZE // (1024 * 1024), type=int,
+              help="Megabytes of journals read by a worker at a time")
+def stats(paths, out, top, processes, chunk_size):
+    ''' Report on the games recorded in journals as json. PATHS are journal
+    files or directories of them, $HOME/.bdgame-journals by default '''
+
+    if chunk_size < 1:
+        click.echo('--chunk-size must be at least 1')
+        sys.exit(1)
+    paths = paths or [journal_dir()]
+    total = read_stats(paths, processes=processes,
+                       chunk_size=chunk_size * 1024 * 1024)
+    if not total.records:
+        click.echo('No recorded game found in %s' % ', '.join(paths))
+        sys.exit(1)
+
+    with click.open_file(out, 'w') as stream:
+        json.dump(total.report(top=top), stream, indent=2, sort_keys=True)
+        stream.write('\n')
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+import json
+
+import click
+
+from bdgame.utils.validate import puzzle_files, validate as check_files
+
+
+@click.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--out', default='-', help="File to write the results to")
+@click.option('--processes', default=None, type=int,
+              help="Number of worker processes, all the cpus by default")
+def validate(paths, out, processes):
+    ''' Check puzzle files in the format play --inp reads, one json line
+    per file. PATHS are puzzle files or directories of .txt puzzles '''
+
+    files = puzzle_files(paths)
+    if not files:
+        click.echo('No puzzle found in %s' % ', '.join(paths))
+        sys.exit(1)
+
+    invalid = 0
+    with click.open_file(out, 'w') as stream:
+        for result in check_files(files, processes=processes):
+            if not result['valid']:
+                invalid += 1
+            stream.write(json.dumps(result, sort_keys=True) + '\n')
+            stream.flush()
+
+    click.echo('%s puzzles checked, %s invalid' % (len(files), invalid),
+               err=True)
+    if invalid:
+        sys.exit(1)
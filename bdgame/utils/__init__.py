@@ -3,59 +3,137 @@
 
 import os
 import sys
-import json
-from configparser import ConfigParser
+import itertools
 
 import click
 
 from bdgame.exceptions import BDException, ItemNotFound
+from bdgame.utils import cache, config, metrics
+from bdgame.utils import grid as grids
+from bdgame.utils import path as paths
+from bdgame.utils.location import Location, parse_location, split_locations
+from bdgame.utils.words import WordIndex
+
+
+def cfg_path():
+    ''' Return the path of the config file, $HOME is read when it is
+    needed and not at import '''
+    return os.path.join(os.environ.get('HOME'), '.bdgame')
+
+
+def grid_dir():
+    ''' Return the directory of the grid files, see grid.write_grid '''
+    return cfg_path() + '-grids'
+
+
+def __getattr__(name):
+    ''' Keep CFG_PATH working, it is computed on use '''
+    if name == 'CFG_PATH':
+        return cfg_path()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
-CFG_PATH = os.path.join(os.environ.get('HOME'), '.bdgame')
-CONFIG = ConfigParser()
-CONFIG.optionxform = str
 
 BLACKLISTED_WORDS = ['PASS']
 
-def create_config(nplayers, gsize, grid, players, wcount, locations):
+def create_config(nplayers, gsize, grid, players, wcount, locations,
+                  parsed_grid=None, game=None):
     ''' Method that creates the configuration file
     of the game based on the info provided
 
     :args np: Number of players to be playing the game
     :args gsize: Grid size of the board
+    :args parsed_grid: The Grid already built from grid, it is compiled
+    with the locations right away so play does not parse the grid again. The
+    config only keeps the path of a grid file. grid may be None, the text of
+    the grid is then written from it a row at a time
+    :args game: Id of the game to keep in the store instead of the config
+    file
     '''
 
-    CONFIG['nplayers'] = {'nplayers': nplayers}
-    CONFIG['players'] = {'players': players}
-    CONFIG['wcount'] = {'wcount': wcount}
-    CONFIG['locations'] = {'locations': locations}
-    CONFIG['gsize'] = {'gsize': gsize}
-    CONFIG['grid'] = {'grid': grid}
+    if game is not None:
+        _store_game(game, nplayers, gsize, parsed_grid or grid, players,
+                    wcount, locations)
+        return
+
+    items = {
+        'nplayers': nplayers,
+        'players': players,
+        'wcount': wcount,
+        'locations': locations,
+        'gsize': gsize,
+    }
+    if isinstance(parsed_grid, grids.MmapGrid):
+        # the letters stay in the grid file, known by its path in grid_dir
+        # so the directory can be moved with $HOME
+        items['grid_file'] = os.path.relpath(parsed_grid.path, grid_dir())
+    elif grid is None:
+        items['grid'] = parsed_grid.iter_text()
+    else:
+        items['grid'] = grid
 
-    if os.path.exists(CFG_PATH):
+    path = cfg_path()
+    if os.path.exists(path):
         if click.confirm('You already have a config file, if you continue '
                          'the config of last game will be lost '):
-            with click.open_file(CFG_PATH, 'w+') as config_file:
-                CONFIG.write(config_file)
+            config.write(path, items)
             click.echo('New config file created in $HOME/.bdgame')
         else:
             click.echo('You aborted creating new config file')
             sys.exit(1)
     else:
-        with click.open_file(CFG_PATH, 'w+') as config_file:
-            CONFIG.write(config_file)
+        config.write(path, items)
+    # only the config points to grid files, the ones of the games before
+    # are not needed any more
+    grids.remove_grids(grid_dir(), keep=(
+        parsed_grid.path if isinstance(parsed_grid, grids.MmapGrid)
+        else None))
+
+    if parsed_grid is not None:
+        _prime_cache(path, items, parsed_grid)
+
+
+def _store_game(game, nplayers, gsize, grid, players, wcount, locations):
+    ''' Keep the game in the store, see create_config '''
+
+    from bdgame.utils import store
+
+    if store.game_exists(game):
+        if not click.confirm('You already have a game %s, if you continue '
+                             'it will be lost ' % game):
+            click.echo('You aborted creating the game')
+            sys.exit(1)
+    store.save_game(game, nplayers, players, gsize, grid, wcount, locations)
+    click.echo('Game %s saved in %s' % (game, store.store_path()))
+
 
+def _prime_cache(path, items, parsed_grid):
+    ''' Store the compiled puzzle of the config file using the items just
+    written to it and the grid built while reading the input, the file is
+    not read back. A puzzle which does not compile is left to be reported
+    when it is played '''
 
-def _get_item(item):
+    glen, gbred = [int(i) for i in items['gsize'].split()]
+    if isinstance(parsed_grid, grids.MmapGrid):
+        grid = parsed_grid.digest
+    elif isinstance(items['grid'], str):
+        grid = items['grid']
+    else:
+        # the rows written to the config are made again to be hashed
+        grid = parsed_grid.iter_text()
+    locations = items['locations']
+    try:
+        puzzle = _compile_puzzle(grid, glen, gbred, locations,
+                                 parsed_grid=parsed_grid)
+    except (BDException, IndexError, ValueError):
+        return
+    cache.dump(cache.cache_path(path),
+               cache.puzzle_key(glen, gbred, grid, locations), puzzle)
+
+
+def _get_item(item, path=None):
     ''' Read the configuration file and return the value of given
     item in config '''
-
-    if os.path.exists(CFG_PATH):
-        CONFIG.read(CFG_PATH)
-        if item not in CONFIG.sections():
-            return None
-        values = CONFIG[item]
-        return values[item]
-    return None
+    return config.load(path or cfg_path()).get(item)
 
 
 def _check_grid_sane(grid, glen, gbred):
@@ -72,8 +150,8 @@ def _check_grid_sane(grid, glen, gbred):
     return True
 
 
-def _get_grid(grid):
-    ''' Return grid in form of 2D list '''
+def _get_grid(grid, backend=None):
+    ''' Return grid in form of a Grid, stored as the backend says '''
 
     grid = grid.splitlines()
     grid_copy = []
@@ -81,79 +159,118 @@ def _get_grid(grid):
         row = row.split()
         row = [i.upper() for i in row]
         grid_copy.append(row)
-    return grid_copy
+    return grids.from_rows(grid_copy, backend=backend)
 
 
-def _get_locations():
+def _get_locations(snapshot=None):
     ''' Get the locations from config  and turn it into a list '''
 
-    locations = _get_item('locations')
+    if snapshot is None:
+        snapshot = config.load(cfg_path())
+    locations = snapshot.get('locations')
     if not locations:
         raise ItemNotFound(
             'Coordinates of correct words(locations) not found in .bdgame')
-    locations = locations.strip().split(',')
+    return _split_locations(locations)
 
-    locations_copy = []
-    for i in locations:
-        i = i.strip().split()
-        locations_copy.append(i)
 
-    return locations_copy
+def _split_locations(locations):
+    ''' Turn the comma separated locations into a list of Location '''
+    return split_locations(locations)
 
 
 def _get_words(grid, locations):
-    ''' Given the locations in grid, extract the words out of it
-    :args grid: A 2D list of strings
-    :args locations: A list of lists where each list represents Coordinates
-    of each word
+    ''' Given the locations in grid, extract the words out of it into a
+    WordIndex
+    :args grid: A Grid or a 2D list of strings
+    :args locations: A list of Location, or of lists of numbers, one for
+    each word
     '''
 
-    words = {}
+    if not isinstance(grid, grids.Grid):
+        grid = grids.ListGrid(grid)
+
+    locations = [parse_location(i) for i in locations]
     for location in locations:
-        shape = recognize_shape(location)
-        if not shape:
+        if not location.shape:
             raise BDException('The word is not fitting any shape')
-
-        word = trav_grid(
-            grid=grid,
-            location=location,
-            shape=shape,
-            select='word'
-        )
-
-        if word not in words:
-            words[word] = {}
-            words[word]['count'] = 1
-            words[word]['locations'] = [location]
+        location.check_bounds(grid.length, grid.breadth)
+
+    # All the words are read from the grid in one go
+    found = {}
+    words_read = paths.read_words(grid, [i.path for i in locations])
+    for location, word in zip(locations, words_read):
+        if word not in found:
+            found[word] = [location]
         else:
-            words[word]['count'] += 1
-            words[word]['locations'].append(location)
+            found[word].append(location)
+
+    words = WordIndex()
+    for word, word_locations in found.items():
+        words.extend(word, word_locations)
 
-        for bword in BLACKLISTED_WORDS:
-            if bword in words:
-                words.pop(bword)
-                click.echo("%s is blacklisted, removed")
+    for bword in BLACKLISTED_WORDS:
+        if bword in words:
+            words.remove(bword)
+            click.echo("%s is blacklisted, removed" % bword)
 
     return words
 
 
-def load_game_conf():
-    ''' Method which returns all the items required for the game '''
+def _compile_puzzle(grid, glen, gbred, locations, parsed_grid=None):
+    ''' Parse the grid and the locations of the puzzle and extract its
+    words, the result only holds data which marshal can store. The grid is
+    not parsed again if parsed_grid is given '''
+
+    if parsed_grid is not None:
+        grid = parsed_grid
+        sane = (grid.length, grid.breadth) == (glen, gbred)
+    else:
+        sane = _check_grid_sane(grid, glen, gbred)
+        # Get the grid in form of 2D array
+        grid = _get_grid(grid)
+    locations = _split_locations(locations)
+    words = _get_words(grid, locations)
+
+    # marshal can not store a Location, the words keep the indexes of
+    # their locations which are stored as tuples of numbers
+    indexes = dict((location, i) for i, location in enumerate(locations))
+    return {
+        'sane': sane,
+        'grid': grid.dump(),
+        'locations': [location.points for location in locations],
+        'words': dict(
+            (word, {'count': words.count(word),
+                    'locations': [indexes[i] for i in words.locations(word)]})
+            for word in words
+        ),
+    }
+
+
+@metrics.timed('load_game_conf')
+def load_game_conf(path=None, game=None):
+    ''' Method which returns all the items required for the game, from the
+    store if the id of a game is given '''
+
+    if game is not None:
+        from bdgame.utils import store
+        return store.load_game(game)
 
-    nplayers = _get_item('nplayers')
+    # every item is read from the same parse of the file
+    snapshot = config.load(path or cfg_path())
+
+    nplayers = snapshot.get_int('nplayers')
     if not nplayers:
         raise ItemNotFound('Number of players(nplayers) not found in .bdgame')
-    nplayers = int(nplayers)
 
-    players = _get_item('players')
+    players = snapshot.get_list('players')
     if not players:
         raise ItemNotFound('Player names (players) not found in .bdgame')
 
-    players = players.split(',')
     if len(players) != nplayers:
         raise BDException('Names of all the players aren\'t present in .bdgame file')
 
-    gsize = _get_item('gsize')
+    gsize = snapshot.get('gsize')
     if not gsize:
         raise ItemNotFound('Grid size (gsize) is absent in .bdgame')
 
@@ -163,29 +280,85 @@ def load_game_conf():
     gsize = gsize.strip().split(' ')
     glen, gbred = int(gsize[0]), int(gsize[1])
 
-    grid = _get_item('grid')
+    grid = snapshot.get('grid')
     if not grid:
-        raise ItemNotFound('Grid is absent in .bdgame')
+        grid_file = snapshot.get('grid_file')
+        if not grid_file:
+            raise ItemNotFound('Grid is absent in .bdgame')
+        try:
+            grid = grids.MmapGrid(os.path.join(grid_dir(), grid_file))
+        except (OSError, ValueError) as err:
+            raise BDException('Grid file %s can not be read: %s' % (
+                grid_file, err))
+
+    wcount = snapshot.get_int('wcount')
+    if not wcount:
+        raise ItemNotFound('Number of correct words (wcount) not in .bdgame')
 
-    sane = _check_grid_sane(grid, glen, gbred)
-    if not sane:
+    locations = snapshot.get('locations')
+    if not locations:
+        raise ItemNotFound(
+            'Coordinates of correct words(locations) not found in .bdgame')
+
+    return build_game_conf(
+        nplayers=nplayers,
+        players=players,
+        glen=glen,
+        gbred=gbred,
+        grid=grid,
+        wcount=wcount,
+        locations=locations,
+        compiled_path=cache.cache_path(path or cfg_path()),
+    )
+
+
+def build_game_conf(nplayers, players, glen, gbred, grid, wcount, locations,
+                    compiled_path=None):
+    ''' Return all the items required for the game from the raw values of
+    the config. The compiled puzzle is kept in compiled_path if given. The
+    grid may be a MmapGrid instead of text '''
+
+    parsed_grid = None
+    source = grid
+    if isinstance(grid, grids.MmapGrid):
+        # a grid file is named by the hash of its letters, it is known by
+        # its name without reading it
+        parsed_grid = grid
+        source = grid.digest
+
+    if compiled_path is None:
+        puzzle = _compile_puzzle(grid, glen, gbred, locations,
+                                 parsed_grid=parsed_grid)
+    else:
+        # The parsed puzzle is reused as long as the grid and locations
+        # are same
+        key = cache.puzzle_key(glen, gbred, source, locations)
+        puzzle = cache.load(compiled_path, key)
+        if puzzle is None:
+            puzzle = _compile_puzzle(grid, glen, gbred, locations,
+                                     parsed_grid=parsed_grid)
+            cache.dump(compiled_path, key, puzzle)
+
+    if not puzzle['sane']:
         click.echo('Grid does not match with grid size, check in config file '
                    ' or make the game again')
 
-    # Get the grid in form of 2D array
-    grid = _get_grid(grid)
+    # the words share the Location objects, their coordinates are worked
+    # out once for the whole game
+    locations = [Location(i) for i in puzzle['locations']]
+    words = WordIndex()
+    for word, value in puzzle['words'].items():
+        words.extend(word, [locations[i] for i in value['locations']])
 
-    wcount = _get_item('wcount')
-    if not wcount:
-        raise ItemNotFound('Number of correct words (wcount) not in .bdgame')
-    wcount = int(wcount)
+    # the compiled grid of a grid file keeps its path, which is not right
+    # any more if the home moved
+    if parsed_grid is None:
+        parsed_grid = grids.load_grid(puzzle['grid'])
 
-    locations = _get_locations()
-    words = _get_words(grid, locations)
     output = {
         'nplayers': nplayers,
         'players': players,
-        'grid': grid,
+        'grid': parsed_grid,
         'glen': glen,
         'gbred': gbred,
         'wcount': wcount,
@@ -196,22 +369,75 @@ def load_game_conf():
     return output
 
 
-def override_conf(stream):
-    ''' Given the file data in form of list of strings, override the existing config
-    file. The grid is fixed to be 15 x 15 in this case '''
+def parse_puzzle(stream, read_grid=None):
+    ''' Given the lines of the file, return the parts of the puzzle in it.
+    The grid comes first and ends at the line holding the number of correct
+    words, their locations and the number of players follow. Blank lines of
+    the grid are left out, like grid.iter_rows does
+    :args read_grid: Called with the lines of the grid as they are read,
+    the Grid it returns is the grid of the puzzle instead of its text. The
+    lines are not kept, grid.write_grid takes a grid of any size this way
+    '''
 
-    # The first 15 lines are the grid
-    grid = stream[:15]
-    grid = ''.join(grid)
+    lines = iter(stream)
+    # the line ending the grid
+    end = []
+
+    def grid_lines():
+        for line in lines:
+            if line.strip().isdigit():
+                end.append(line)
+                return
+            if line.strip():
+                yield line
+
+    rows = grid_lines()
+    if read_grid is None:
+        rows = list(rows)
+        grid = ''.join(rows)
+        gsize = '%s %s' % (len(rows), len(rows[0].split())) if rows else None
+    else:
+        grid = read_grid(rows)
+        # in case the grid was not read to its end
+        for _ in rows:
+            pass
+        gsize = '%s %s' % (grid.length, grid.breadth)
+    if not gsize or not end:
+        raise BDException('Puzzle needs a grid followed by the number of '
+                          'correct words')
 
     # Number of correct words
-    wcount = int(stream[15])
+    wcount = int(end[0])
 
     # Locations of correct words
-    locations = ','.join(stream[16:16+wcount])
+    locations = [i.strip() for i in itertools.islice(lines, wcount)]
+    nplayers = next(lines, None)
+    if len(locations) != wcount or nplayers is None:
+        raise BDException('Puzzle ends before the number of players')
 
     # Number of players
-    nplayers = int(stream[16+wcount])
+    nplayers = int(nplayers)
+
+    return {
+        'grid': grid,
+        'gsize': gsize,
+        'wcount': wcount,
+        'locations': locations,
+        'nplayers': nplayers,
+    }
+
+
+def override_conf(stream, game=None):
+    ''' Given the lines of the file, override the existing config file, or
+    the game of the store if its id is given. The size of the grid is found
+    from the number of its lines. With the mmap backend the grid goes to a
+    grid file as the lines are read '''
+
+    mapped = game is None and grids.get_backend() == 'mmap'
+    puzzle = parse_puzzle(stream, read_grid=(
+        (lambda lines: grids.write_grid(lines, grid_dir())) if mapped
+        else None))
+    nplayers = puzzle['nplayers']
 
     players = []
     for i in range(1, nplayers + 1):
@@ -225,13 +451,18 @@ def override_conf(stream):
     # store the names of players as a comma separated string
     players = ",".join(players)
 
+    # with the mmap backend the config points to the grid file
+    parsed_grid = puzzle['grid'] if mapped else None
+
     create_config(
         nplayers=nplayers,
-        grid=grid,
-        gsize='15 15',
+        grid=None if mapped else puzzle['grid'],
+        gsize=puzzle['gsize'],
         players=players,
-        wcount=wcount,
-        locations=locations,
+        wcount=puzzle['wcount'],
+        locations=','.join(puzzle['locations']),
+        parsed_grid=parsed_grid,
+        game=game,
     )
 
 
@@ -250,60 +481,24 @@ def take_console_input(gsize):
 def trav_grid(grid, location, shape='any', select='word'):
     ''' Get the word from the grid
     :args grid: A 2D list of letters
-    :args location: A list of either 4 or 6 elements, depending upon the shape
-    word in the grid.
-    :args shape: A string saying what kind of shape the word forms like:
-        horizontal, vertical, diagonal or L '''
-
-    coordinates = []
-    if shape == 'horizontal':
-        for i in range(int(location[1]), int(location[3]) + 1):
-            if (int(location[0]), i) not in coordinates:
-                coordinates.append((int(location[0]), i))
-
-    if shape == 'vertical':
-        for i in range(int(location[0]), int(location[2]) + 1):
-            if (i, int(location[1])) not in coordinates:
-                coordinates.append((i, int(location[1])))
-
-    if shape == 'diagonal':
-        diff = abs(int(location[0]) - int(location[2]))
-        for i in range(diff+1):
-            if (int(location[0])+i, int(location[1])+i) not in coordinates:
-                coordinates.append((int(location[0])+i, int(location[1])+i))
-
-    if shape == 'oneletter':
-        if (int(location[0]), int(location[1])) not in coordinates:
-            coordinates.append((int(location[0]), int(location[1])))
+    :args location: A Location, or a list of pairs of numbers, each pair
+    is a cell where the word starts, turns or ends
+    :args shape: Kept for old callers, the shape is the one of the location
+    '''
+
+    location = parse_location(location)
+    if location.path is None:
+        raise BDException('The word is not fitting any shape')
 
     if select == 'word':
-        string = ''
-        for i in coordinates:
-            string += grid[i[0]][i[1]]
-        return string
+        if isinstance(grid, grids.Grid):
+            return grid.letters(location.coordinates)
+        return ''.join(grid[i][j] for i, j in location.coordinates)
 
-    return coordinates
+    return list(location.coordinates)
 
 
 def recognize_shape(location):
-    ''' Given a location, find what shape it is '''
-
-    if len(location) == 2:
-        return 'oneletter'
-
-    if len(location) == 4:
-        if location[0] == location[2]:
-            return 'horizontal'
-
-        if location[1] == location[3]:
-            return 'vertical'
-
-        # if the shape is diagonal
-        # x1 - x2 == y1 - y2
-        if int(location[0]) == (
-                int(location[2]) + int(location[1]) - int(location[3])):
-            return 'diagonal'
-
-    elif len(location) == 6:
-        # Maybe L shape in future
-        pass
+    ''' Given a location, find what shape it is: oneletter, horizontal,
+    vertical, diagonal, L, path or None '''
+    return parse_location(location).shape
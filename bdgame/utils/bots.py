@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import abc
+import random
+
+import click
+
+# (row step, column step) of the shapes a random guess is read along
+GUESS_DIRECTIONS = [(0, 1), (1, 0), (1, 1)]
+
+
+class PlayerInput(abc.ABC):
+    ''' Gives the answers of a player, one per turn '''
+
+    @abc.abstractmethod
+    def get_input(self, game, player):
+        ''' Return the answer of the player for this turn '''
+
+
+class ConsoleInput(PlayerInput):
+    ''' Asks the answer on the console '''
+
+    def get_input(self, game, player):
+        ''' Prompt the user to give input, the commands moving the window
+        of the board (see Game.view) are run and the user is asked again '''
+
+        while True:
+            answer = click.prompt("%s play, it\'s your turn: " % player.name)
+            if not answer.strip().startswith('/'):
+                return answer
+            game.view(answer.strip())
+
+
+class RandomGuesser(PlayerInput):
+    ''' Guesses random runs of letters read from the grid and sometimes
+    passes, so a game of random guessers ends '''
+
+    def __init__(self, seed=None, pass_rate=0.2, max_length=8):
+        ''' Instantiate the bot '''
+        self.rng = random.Random(seed)
+        self.pass_rate = pass_rate
+        self.max_length = max_length
+
+    def get_input(self, game, player):
+        ''' Return a random guess or PASS '''
+
+        if self.rng.random() < self.pass_rate:
+            return 'PASS'
+
+        board = game.board
+        row = self.rng.randrange(board.length)
+        column = self.rng.randrange(board.breadth)
+        drow, dcolumn = self.rng.choice(GUESS_DIRECTIONS)
+        count = self.rng.randint(2, self.max_length)
+        letters = []
+        while (len(letters) < count and row < board.length and
+               column < board.breadth):
+            letters.append(board.grid[row][column])
+            row += drow
+            column += dcolumn
+        return ''.join(letters)
+
+
+class PartialSolver(PlayerInput):
+    ''' Knows each word of the puzzle with the given probability and answers
+    the words it knows which are not found yet, it passes when none is left '''
+
+    def __init__(self, knows=1.0, seed=None):
+        ''' Instantiate the bot
+        :args knows: Probability of knowing a word, from 0 to 1
+        '''
+        self.rng = random.Random(seed)
+        self.knows = knows
+        self._known = None
+
+    def _known_words(self, game):
+        ''' Decide which words the bot knows, the first time it plays '''
+
+        if self._known is None:
+            self._known = [
+                word for word in sorted(game.conf['words'])
+                if self.rng.random() < self.knows
+            ]
+        return self._known
+
+    def get_input(self, game, player):
+        ''' Return a known word still on the board or PASS '''
+
+        words = game.conf['words']
+        left = [word for word in self._known_words(game)
+                if words.count(word)]
+        if not left:
+            return 'PASS'
+        return self.rng.choice(left)
+
+
+class PerfectSolver(PartialSolver):
+    ''' Knows every word of the puzzle '''
+
+    def __init__(self, seed=None):
+        ''' Instantiate the bot '''
+        super(PerfectSolver, self).__init__(knows=1.0, seed=seed)
+
+
+def make_bot(spec, seed=None):
+    ''' Make a bot from its name: random, perfect or knows:N where N is the
+    percentage of the words the bot knows '''
+
+    name, _, arg = spec.partition(':')
+    if name == 'random':
+        return RandomGuesser(seed=seed)
+    if name == 'perfect':
+        return PerfectSolver(seed=seed)
+    if name == 'knows':
+        try:
+            percent = float(arg)
+        except ValueError:
+            percent = -1
+        if 0 <= percent <= 100:
+            return PartialSolver(knows=percent / 100.0, seed=seed)
+    raise ValueError('Unknown bot %s, use random, perfect or knows:N' % spec)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import sys
+import marshal
+import hashlib
+
+# Header of a compiled puzzle file, the key follows it
+MAGIC = b'BDGC'
+FORMAT_VERSION = 1
+
+# Characters of a text hashed at a time, a big grid is never encoded whole
+HASH_CHUNK = 1024 * 1024
+
+
+def _chunks(part):
+    ''' Yield the part in pieces, a part which is not a str or a number
+    is an iterable of str pieces already '''
+
+    if not isinstance(part, str):
+        if isinstance(part, (int, float)) or part is None:
+            part = str(part)
+        else:
+            for chunk in part:
+                yield chunk
+            return
+    for start in range(0, len(part), HASH_CHUNK):
+        yield part[start:start + HASH_CHUNK]
+
+
+def puzzle_key(*parts):
+    ''' Return the hash identifying a puzzle made of the given parts. A
+    part may be given as an iterable of strings, it is hashed like the
+    string they make. Like .pyc files the python version is part of it,
+    marshal data is not portable across versions '''
+
+    digest = hashlib.sha256()
+    digest.update(('%s %s %s' % (
+        FORMAT_VERSION, sys.version_info[:2], marshal.version)).encode())
+    for part in parts:
+        # every part is hashed on its own, ('ab', 'c') and ('a', 'bc') stay
+        # apart
+        part_digest = hashlib.sha256()
+        for chunk in _chunks(part):
+            part_digest.update(chunk.encode('utf-8'))
+        digest.update(part_digest.digest())
+    return digest.digest()
+
+
+def cache_path(cfg_path):
+    ''' Return the path of the compiled puzzle kept next to the config '''
+    return cfg_path + 'c'
+
+
+def load(path, key):
+    ''' Return the compiled puzzle stored in the file if it was compiled from
+    the puzzle with the given key, else None '''
+
+    try:
+        with open(path, 'rb') as stream:
+            header = stream.read(len(MAGIC) + len(key))
+            if header != MAGIC + key:
+                return None
+            # marshal.load reads a file in tiny pieces, loads is much faster
+            return marshal.loads(stream.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def dump(path, key, puzzle):
+    ''' Store the compiled puzzle in the file, a failure to write only
+    means the puzzle will be compiled again next time '''
+
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bdgame-')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(MAGIC + key)
+            stream.write(marshal.dumps(puzzle))
+        # readers never see a half written file
+        os.replace(tmp_path, path)
+    except (OSError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
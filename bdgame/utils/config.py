@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+from types import MappingProxyType
+
+import click
+
+from bdgame.exceptions import BDException
+
+# path -> ConfigSnapshot of the last parse of the file
+_SNAPSHOTS = {}
+
+
+class ConfigSnapshot(object):
+    ''' Immutable view of the items of a config file as it was when it
+    was read. Every item lives in a section of the same name '''
+
+    __slots__ = ('path', 'stamp', '_items')
+
+    def __init__(self, path, stamp, items):
+        ''' Instantiate the snapshot '''
+        object.__setattr__(self, 'path', path)
+        object.__setattr__(self, 'stamp', stamp)
+        object.__setattr__(self, '_items', MappingProxyType(dict(items)))
+
+    def __setattr__(self, name, value):
+        ''' Snapshots are shared between games, they can not be changed '''
+        raise AttributeError('Config snapshots are read only')
+
+    def __repr__(self):
+        ''' Represent the snapshot '''
+        return "Config of %s: %s" % (self.path, sorted(self._items))
+
+    def __contains__(self, item):
+        ''' Check if the item is present in the config '''
+        return item in self._items
+
+    def get(self, item, default=None):
+        ''' Return the value of the item as a string '''
+        return self._items.get(item, default)
+
+    def get_int(self, item, default=None):
+        ''' Return the value of the item as an integer '''
+
+        value = self._items.get(item)
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise BDException('%s in %s is not a number' % (item, self.path))
+
+    def get_list(self, item, sep=','):
+        ''' Return the value of the item split on sep, or an empty list '''
+
+        value = self._items.get(item)
+        if not value:
+            return []
+        return value.split(sep)
+
+
+def _stamp(path):
+    ''' Return what identifies the version of the file on disk, or None if
+    it does not exist '''
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _parse(path, stamp):
+    ''' Read the config file into a new snapshot '''
+
+    from configparser import ConfigParser
+
+    parser = ConfigParser()
+    parser.optionxform = str
+    parser.read(path)
+    items = {}
+    for section in parser.sections():
+        if section in parser[section]:
+            items[section] = parser[section][section]
+    return ConfigSnapshot(path, stamp, items)
+
+
+def load(path):
+    ''' Return the snapshot of the config file, the file is parsed again
+    only if its modification time or size changed since the last read '''
+
+    stamp = _stamp(path)
+    if stamp is None:
+        return ConfigSnapshot(path, None, {})
+
+    snapshot = _SNAPSHOTS.get(path)
+    if snapshot is None or snapshot.stamp != stamp:
+        snapshot = _parse(path, stamp)
+        _SNAPSHOTS[path] = snapshot
+    return snapshot
+
+
+def forget(path):
+    ''' Drop the snapshot of the file, the next load reads it again '''
+    _SNAPSHOTS.pop(path, None)
+
+
+def write(path, items):
+    ''' Write the items to the config file, each in its own section. A
+    value may be an iterable of strings instead of a string, the pieces are
+    written one after the other without being joined '''
+
+    from configparser import ConfigParser
+
+    parser = ConfigParser()
+    parser.optionxform = str
+    pieces = {}
+    for item, value in items.items():
+        if isinstance(value, (str, int)):
+            parser[item] = {item: value}
+        else:
+            pieces[item] = value
+    with click.open_file(path, 'w+') as config_file:
+        parser.write(config_file)
+        # the way ConfigParser writes a value of many lines
+        for item, value in pieces.items():
+            config_file.write('[%s]\n%s = ' % (item, item))
+            for piece in value:
+                config_file.write(piece.replace('\n', '\n\t'))
+            config_file.write('\n\n')
+    forget(path)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # coding=utf-8
 
-from bdgame.utils import model
+from bdgame.utils import metrics, model
+from bdgame.utils.render import Renderer
+from bdgame.utils.turns import make_order
 
 
 def make_players(players):
@@ -10,19 +12,28 @@ def make_players(players):
     '''
 
     player_list = []
-    for player in players:
-        player_list.append(model.Player(name=player))
+    for i, player in enumerate(players):
+        color = model.PLAYER_COLORS[i % len(model.PLAYER_COLORS)]
+        player_list.append(model.Player(name=player, color=color))
 
     return player_list
 
 
-def make_game(board, players, conf):
-    ''' Make the game from given board, players and game configurations '''
+def make_game(board, players, conf, player_input=None, headless=False,
+              output=None, order=None, viewport=False):
+    ''' Make the game from given board, players and game configurations
+    :args viewport: Show a board bigger than the terminal a window at a time
+    '''
 
     game = model.Game(
         board=board,
         players=players,
-        conf=conf
+        conf=conf,
+        renderer=Renderer(viewport=True) if viewport else None,
+        player_input=player_input,
+        headless=headless,
+        output=output,
+        order=order,
     )
     return game
 
@@ -39,10 +50,27 @@ def make_board(grid, glen, gbred):
     return board
 
 
-def prepare_game(conf):
-    ''' Given the game configurations, prepare the game '''
+def fresh_conf(conf):
+    ''' Return a copy of the game configurations a new game can be played
+    on. Only the words change during a game, the grid is shared '''
+
+    conf = dict(conf)
+    conf['words'] = conf['words'].copy()
+    return conf
+
+
+@metrics.timed('prepare_game')
+def prepare_game(conf, player_input=None, headless=False, output=None,
+                 order='round-robin', seed=None, viewport=False):
+    ''' Given the game configurations, prepare the game
+    :args order: Name of the turn order, see bdgame.utils.turns.ORDERS
+    :args viewport: Show a board bigger than the terminal a window at a time
+    '''
 
     players = make_players(conf['players'])
     board = make_board(conf['grid'], conf['glen'], conf['gbred'])
-    game = make_game(board, players, conf)
+    game = make_game(board, players, conf, player_input=player_input,
+                     headless=headless, output=output,
+                     order=make_order(order, len(players), seed=seed),
+                     viewport=viewport)
     return game
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import random
+import string
+import multiprocessing
+
+import bdgame.utils as utils
+from bdgame.exceptions import BDException
+from bdgame.utils import validate
+from bdgame.utils.solver import ALL_DIRECTIONS
+
+ALPHABET = string.ascii_uppercase
+
+# Tries to place one word before moving on to the next one
+PLACE_ATTEMPTS = 50
+# Tries to make a valid puzzle, each with its own seed, before giving up
+PUZZLE_ATTEMPTS = 5
+
+# Words list of the worker processes, set once by _init_worker
+_WORDS = None
+
+
+def clean_words(words, max_length):
+    ''' Upper case the words and keep the ones the game can play '''
+
+    cleaned = []
+    for word in words:
+        word = word.strip().upper()
+        if len(word) < 2 or len(word) > max_length or not word.isalpha():
+            continue
+        if word in utils.BLACKLISTED_WORDS:
+            continue
+        cleaned.append(word)
+    return cleaned
+
+
+def puzzle_seed(seed, index, attempt=0):
+    ''' Return the seed of one puzzle, it depends only on the seed of the
+    run and the position of the puzzle so any puzzle can be made again '''
+    return '%s:%s:%s' % (seed, index, attempt)
+
+
+def _place(rng, cells, owners, index, word, length, breadth, directions):
+    ''' Put the word on the cells, crossing only on equal letters and on at
+    most one cell of each placed word. owners maps a cell to the indexes of
+    the words on it, the word is added as index.
+    Returns the location or None if no place was found '''
+
+    count = len(word)
+    for _ in range(PLACE_ATTEMPTS):
+        drow, dcolumn = rng.choice(directions)
+        # the first letter must leave room for the rest of the word
+        rows = range(max(0, -drow * (count - 1)),
+                     min(length, length - drow * (count - 1)))
+        columns = range(max(0, -dcolumn * (count - 1)),
+                        min(breadth, breadth - dcolumn * (count - 1)))
+        if not rows or not columns:
+            continue
+        row, column = rng.choice(rows), rng.choice(columns)
+
+        path = [(row + drow * k, column + dcolumn * k) for k in range(count)]
+        if any(cells[i][j] not in (None, word[k])
+               for k, (i, j) in enumerate(path)):
+            continue
+        # a word sharing two cells with another one hides part of it
+        shared = {}
+        for cell in path:
+            for other in owners.get(cell, ()):
+                shared[other] = shared.get(other, 0) + 1
+        if any(i > 1 for i in shared.values()):
+            continue
+        for k, (i, j) in enumerate(path):
+            cells[i][j] = word[k]
+            owners.setdefault((i, j), []).append(index)
+        return (row, column, path[-1][0], path[-1][1])
+    return None
+
+
+def make_puzzle(words, length, breadth, wcount, seed, directions=None):
+    ''' Make one puzzle with wcount of the words placed in the grid and the
+    other cells filled with random letters. Returns a dict with the grid as
+    rows of letters, the locations as strings and the placed words '''
+
+    directions = directions or ALL_DIRECTIONS
+    rng = random.Random(seed)
+    cells = [[None] * breadth for _ in range(length)]
+    # (row, column) -> indexes of the placed words on the cell
+    owners = {}
+
+    candidates = list(words)
+    rng.shuffle(candidates)
+    locations = []
+    placed = []
+    for word in candidates:
+        if len(placed) == wcount:
+            break
+        location = _place(rng, cells, owners, len(placed), word, length,
+                          breadth, directions)
+        if location is None:
+            continue
+        locations.append('%s %s %s %s' % location)
+        placed.append(word)
+
+    if len(placed) != wcount:
+        raise BDException('Could place only %s of %s words' % (
+            len(placed), wcount))
+
+    for row in cells:
+        for j in range(breadth):
+            if row[j] is None:
+                row[j] = rng.choice(ALPHABET)
+
+    return {
+        'grid': cells,
+        'locations': locations,
+        'words': placed,
+    }
+
+
+def check_puzzle(puzzle):
+    ''' Check the puzzle the way validate does, then read the words back the
+    way the game does and make sure they are the placed ones '''
+
+    errors = validate.check_puzzle(
+        format_puzzle(puzzle, 1).splitlines(True))
+    if errors:
+        raise BDException('; '.join(error['message'] for error in errors))
+
+    text = '\n'.join(' '.join(row) for row in puzzle['grid'])
+    grid = utils._get_grid(text)
+    locations = utils._split_locations(','.join(puzzle['locations']))
+    words = utils._get_words(grid, locations)
+
+    found = sorted(
+        word for word in words for _ in words.locations(word))
+    if found != sorted(puzzle['words']):
+        raise BDException('Words read from the grid are not the placed ones')
+
+
+def format_puzzle(puzzle, nplayers):
+    ''' Return the text of the puzzle in the play_input.txt format '''
+
+    lines = ['  '.join(row) for row in puzzle['grid']]
+    lines.append(str(len(puzzle['locations'])))
+    lines.extend(puzzle['locations'])
+    lines.append(str(nplayers))
+    return '\n'.join(lines) + '\n'
+
+
+def generate_one(words, index, options):
+    ''' Make, check and write the puzzle at the index. Returns
+    (index, path, error) where error is None if the puzzle was written '''
+
+    error = None
+    for attempt in range(PUZZLE_ATTEMPTS):
+        seed = puzzle_seed(options['seed'], index, attempt)
+        try:
+            puzzle = make_puzzle(
+                words, options['length'], options['breadth'],
+                options['wcount'], seed)
+            check_puzzle(puzzle)
+        except (BDException, IndexError) as err:
+            error = getattr(err, 'msg', str(err))
+            continue
+
+        path = os.path.join(
+            options['out'], 'puzzle-%0*d.txt' % (options['digits'], index))
+        with open(path, 'w') as stream:
+            stream.write(format_puzzle(puzzle, options['nplayers']))
+        return index, path, None
+    return index, None, error
+
+
+def _init_worker(words):
+    ''' Keep the words list in the worker, it is sent once per process '''
+    global _WORDS
+    _WORDS = words
+
+
+def _generate_task(task):
+    ''' Run generate_one in a worker process '''
+    index, options = task
+    return generate_one(_WORDS, index, options)
+
+
+def generate(words, length, breadth, wcount, count, out, seed=0,
+             nplayers=2, processes=None):
+    ''' Generate count puzzles into the out directory across a pool of
+    processes. Yields (index, path, error) as the puzzles are done '''
+
+    words = clean_words(words, max(length, breadth))
+    if len(words) < wcount:
+        raise BDException('Not enough usable words to place %s' % wcount)
+    if not os.path.isdir(out):
+        os.makedirs(out)
+
+    options = {
+        'length': length,
+        'breadth': breadth,
+        'wcount': wcount,
+        'nplayers': nplayers,
+        'seed': seed,
+        'out': out,
+        'digits': len(str(count)),
+    }
+    tasks = [(index, options) for index in range(1, count + 1)]
+
+    if processes == 1:
+        for index, _ in tasks:
+            yield generate_one(words, index, options)
+        return
+
+    pool = multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(words,))
+    try:
+        chunksize = max(1, count // ((processes or os.cpu_count() or 1) * 4))
+        for result in pool.imap_unordered(
+                _generate_task, tasks, chunksize=chunksize):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import mmap
+import struct
+import hashlib
+import tempfile
+
+from bdgame.exceptions import BDException
+
+# Environment variable choosing how the letters of the grid are stored
+BACKEND_ENV = 'BDGAME_GRID_BACKEND'
+BACKENDS = ('auto', 'numpy', 'bytes', 'list', 'mmap')
+
+# A grid file holds the letters row after row, one byte each, followed by
+# the trailer: the magic and the length and breadth of the grid. The cell
+# (i, j) is the byte i * breadth + j
+GRID_EXT = '.grid'
+GRID_MAGIC = b'BDGRID1\0'
+GRID_TRAILER = struct.Struct('<8sQQ')
+
+
+def _numpy():
+    ''' Return the numpy module or None if it is not installed '''
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _check_line(line, length, breadth):
+    ''' Raise IndexError if the line (row, column, row step, column step,
+    number of letters) goes out of the grid '''
+
+    row, column, drow, dcolumn, count = line
+    if count <= 0:
+        return
+    last_row = row + drow * (count - 1)
+    last_column = column + dcolumn * (count - 1)
+    if not (0 <= row < length and 0 <= last_row < length and
+            0 <= column < breadth and 0 <= last_column < breadth):
+        raise IndexError('Location %s %s %s %s is out of the grid' % (
+            row, column, last_row, last_column))
+
+
+class Grid(object):
+    ''' A grid of letters. grid[i] is the i-th row and supports [j] '''
+
+    backend = None
+
+    def __init__(self, length, breadth):
+        ''' Instantiate the grid '''
+        self.length = length
+        self.breadth = breadth
+
+    def __len__(self):
+        ''' Number of rows in the grid '''
+        return self.length
+
+    def __repr__(self):
+        ''' Represent the grid '''
+        return "%s grid of %s x %s" % (self.backend, self.length, self.breadth)
+
+    def __iter__(self):
+        ''' Iterate over the rows '''
+        for i in range(self.length):
+            yield self[i]
+
+    def letters(self, coordinates):
+        ''' Return the word made of the letters at the coordinates '''
+        return ''.join(self[i][j] for i, j in coordinates)
+
+    def words(self, lines):
+        ''' Return the word on each line, a line is a tuple of
+        (row, column, row step, column step, number of letters) '''
+
+        words = []
+        for line in lines:
+            _check_line(line, self.length, self.breadth)
+            row, column, drow, dcolumn, count = line
+            words.append(''.join(
+                self[row + drow * k][column + dcolumn * k]
+                for k in range(count)
+            ))
+        return words
+
+    def dump(self):
+        ''' Return the grid as data marshal can store, see load_grid '''
+        return (self.length, self.breadth, self.tobytes())
+
+    def tobytes(self):
+        ''' Return the letters row after row, one byte each '''
+        return ''.join(''.join(row) for row in self).encode('ascii')
+
+    def text(self):
+        ''' Return the grid as text, letters split by spaces like in the
+        input files '''
+        return ''.join(self.iter_text())
+
+    def iter_text(self):
+        ''' Yield the text of the grid a row at a time, see text '''
+        for i in range(self.length):
+            yield ' '.join(self[i]) + ('\n' if i < self.length - 1 else '')
+
+
+class ListGrid(Grid):
+    ''' Grid stored as a list of lists of letters, it works with any text '''
+
+    backend = 'list'
+
+    def __init__(self, rows):
+        ''' Instantiate the grid '''
+        super(ListGrid, self).__init__(
+            len(rows), len(rows[0]) if rows else 0)
+        self.rows = rows
+
+    def __getitem__(self, i):
+        ''' Return the i-th row '''
+        return self.rows[i]
+
+    def dump(self):
+        ''' Return the grid as data marshal can store, see load_grid '''
+        return (self.length, self.breadth, self.rows)
+
+
+class BytesGrid(Grid):
+    ''' Grid stored as one byte per letter, row after row '''
+
+    backend = 'bytes'
+
+    def __init__(self, data, length, breadth):
+        ''' Instantiate the grid '''
+        super(BytesGrid, self).__init__(length, breadth)
+        self.data = data
+
+    def __getitem__(self, i):
+        ''' Return the i-th row '''
+        if not 0 <= i < self.length:
+            raise IndexError('Row %s is out of the grid' % i)
+        start = i * self.breadth
+        return self.data[start:start + self.breadth].decode('ascii')
+
+    def letters(self, coordinates):
+        ''' Return the word made of the letters at the coordinates '''
+        stride = self.breadth
+        return bytes(
+            self.data[i * stride + j] for i, j in coordinates
+        ).decode('ascii')
+
+    def words(self, lines):
+        ''' Return the word on each line, every word is one strided slice of
+        the letters '''
+
+        stride = self.breadth
+        data = self.data
+        words = []
+        for line in lines:
+            _check_line(line, self.length, self.breadth)
+            row, column, drow, dcolumn, count = line
+            start = row * stride + column
+            step = drow * stride + dcolumn
+            if step == 0:
+                word = data[start:start + 1]
+            else:
+                stop = start + step * count
+                word = data[start:stop if stop >= 0 else None:step]
+            words.append(word.decode('ascii'))
+        return words
+
+    def dump(self):
+        ''' Return the grid as data marshal can store, see load_grid. The
+        letters are not copied, marshal stores a bytearray as bytes '''
+        return (self.length, self.breadth, self.data)
+
+    def tobytes(self):
+        ''' Return the letters row after row, one byte each '''
+        return bytes(self.data)
+
+
+class NumpyGrid(Grid):
+    ''' Grid stored as a 2D uint8 array, the words are read with one fancy
+    indexing over all the lines '''
+
+    backend = 'numpy'
+
+    def __init__(self, array):
+        ''' Instantiate the grid '''
+        super(NumpyGrid, self).__init__(array.shape[0], array.shape[1])
+        self.array = array
+
+    def __getitem__(self, i):
+        ''' Return the i-th row '''
+        if not 0 <= i < self.length:
+            raise IndexError('Row %s is out of the grid' % i)
+        return self.array[i].tobytes().decode('ascii')
+
+    def letters(self, coordinates):
+        ''' Return the word made of the letters at the coordinates '''
+
+        if not coordinates:
+            return ''
+        rows, columns = zip(*coordinates)
+        return self.array[list(rows), list(columns)].tobytes().decode('ascii')
+
+    def words(self, lines):
+        ''' Return the word on each line '''
+
+        if not lines:
+            return []
+        numpy = _numpy()
+        lines = numpy.asarray(lines, dtype=numpy.int64).reshape(-1, 5)
+        counts = lines[:, 4]
+        ends = numpy.cumsum(counts)
+        starts = ends - counts
+        # position of every letter inside its own word
+        offsets = numpy.arange(ends[-1])
+        offsets -= numpy.repeat(starts, counts)
+        rows = numpy.repeat(lines[:, 0], counts)
+        rows += numpy.repeat(lines[:, 2], counts) * offsets
+        columns = numpy.repeat(lines[:, 1], counts)
+        columns += numpy.repeat(lines[:, 3], counts) * offsets
+
+        # negative indexes would silently wrap around
+        outside = ((rows < 0) | (rows >= self.length) |
+                   (columns < 0) | (columns >= self.breadth))
+        if outside.any():
+            bad = int(numpy.searchsorted(ends, numpy.argmax(outside),
+                                         side='right'))
+            _check_line(tuple(lines[bad].tolist()), self.length, self.breadth)
+
+        letters = self.array[rows, columns].tobytes().decode('ascii')
+        return [letters[start:end]
+                for start, end in zip(starts.tolist(), ends.tolist())]
+
+    def tobytes(self):
+        ''' Return the letters row after row, one byte each '''
+        return self.array.tobytes()
+
+
+class MmapGrid(BytesGrid):
+    ''' Grid read from a grid file mapped in memory, see write_grid. Only
+    the pages of the cells read are loaded, processes mapping the same file
+    share them '''
+
+    backend = 'mmap'
+
+    def __init__(self, path):
+        ''' Instantiate the grid from the grid file at path '''
+
+        with open(path, 'rb') as stream:
+            size = os.fstat(stream.fileno()).st_size
+            if size < GRID_TRAILER.size:
+                raise BDException('%s is not a grid file' % path)
+            stream.seek(size - GRID_TRAILER.size)
+            magic, length, breadth = GRID_TRAILER.unpack(
+                stream.read(GRID_TRAILER.size))
+            if (magic != GRID_MAGIC or not length or
+                    length * breadth != size - GRID_TRAILER.size):
+                raise BDException('%s is not a grid file' % path)
+            data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        super(MmapGrid, self).__init__(data, length, breadth)
+        self.path = path
+
+    def __reduce__(self):
+        ''' Pickle the grid by its path, it is mapped again '''
+        return (MmapGrid, (self.path,))
+
+    @property
+    def digest(self):
+        ''' Return the hash of the letters, the name of the file '''
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def dump(self):
+        ''' Return the grid as data marshal can store, see load_grid. Only
+        the path is kept, the letters stay in the file '''
+        return (self.length, self.breadth, self.path)
+
+    def tobytes(self):
+        ''' Return the letters row after row, one byte each '''
+        return self.data[:self.length * self.breadth]
+
+
+def write_grid(lines, directory):
+    ''' Write the grid in the lines to a grid file in the directory, one
+    row at a time so the grid is never held in memory, and return it as a
+    MmapGrid. The file is named by the hash of the letters, the same grid
+    is written once. See iter_rows for the checks '''
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.grid-')
+    try:
+        digest = hashlib.sha256()
+        length = 0
+        breadth = 0
+        with os.fdopen(fd, 'wb') as stream:
+            for _, row in iter_rows(lines):
+                row = row.encode('ascii')
+                stream.write(row)
+                digest.update(row)
+                length += 1
+                breadth = len(row)
+            if not length:
+                raise BDException('The grid is empty')
+            stream.write(GRID_TRAILER.pack(GRID_MAGIC, length, breadth))
+        digest.update(b'%d %d' % (length, breadth))
+        path = os.path.join(directory, digest.hexdigest()[:32] + GRID_EXT)
+        # the file is only read, by any game process of the host
+        os.chmod(tmp_path, 0o644)
+        # readers never see a half written file
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return MmapGrid(path)
+
+
+def remove_grids(directory, keep=None):
+    ''' Remove the grid files of the directory but the one at keep, files
+    being written by write_grid are left alone. A game mapping a removed
+    file still reads it, the file is gone once it is closed '''
+
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(directory, name)
+        if not name.endswith(GRID_EXT) or path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_backend(backend=None):
+    ''' Return the backend to store grids with, from the argument or the
+    environment. auto picks numpy when it is installed. Only grid files
+    are mapped, a mmap grid made from letters in memory is kept as bytes '''
+
+    backend = backend or os.environ.get(BACKEND_ENV) or 'auto'
+    if backend not in BACKENDS:
+        raise BDException('Unknown grid backend %s, use one of %s' % (
+            backend, ', '.join(BACKENDS)))
+    if backend == 'auto':
+        backend = 'numpy' if _numpy() is not None else 'bytes'
+    elif backend == 'numpy' and _numpy() is None:
+        raise BDException('The numpy grid backend needs numpy installed')
+    return backend
+
+
+def from_bytes(data, length, breadth, backend=None):
+    ''' Make a grid of the backend from the letters row after row. bytes
+    and bytearray are used as they are, the grid holds on to them '''
+
+    backend = get_backend(backend)
+    if len(data) != length * breadth:
+        raise BDException('Grid data does not match the grid size')
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    if backend == 'numpy':
+        numpy = _numpy()
+        array = numpy.frombuffer(data, dtype=numpy.uint8)
+        return NumpyGrid(array.reshape(length, breadth))
+    if backend == 'list':
+        text = data.decode('ascii')
+        return ListGrid([list(text[i * breadth:(i + 1) * breadth])
+                         for i in range(length)])
+    return BytesGrid(data, length, breadth)
+
+
+def from_rows(rows, backend=None):
+    ''' Make a grid from a list of lists of letters. Grids of letters which
+    are not single ascii characters can only be kept as lists '''
+
+    backend = get_backend(backend)
+    breadth = len(rows[0]) if rows else 0
+    compact = backend != 'list' and all(len(row) == breadth for row in rows)
+    if compact:
+        text = ''.join(''.join(row) for row in rows)
+        compact = len(text) == len(rows) * breadth
+    if compact:
+        try:
+            data = text.encode('ascii')
+        except UnicodeEncodeError:
+            compact = False
+    if not compact:
+        return ListGrid(rows)
+    return from_bytes(data, len(rows), breadth, backend=backend)
+
+
+def iter_rows(lines):
+    ''' Yield (line number, row) for each row of the grid in the lines,
+    where row is the upper cased letters joined together. Every row must be
+    as wide as the first one and hold only ascii letters, the first bad row
+    raises BDException with its line number. Blank lines are skipped '''
+
+    breadth = None
+    for number, line in enumerate(lines, 1):
+        letters = line.split()
+        if not letters:
+            continue
+        row = ''.join(letters).upper()
+        if breadth is None:
+            breadth = len(letters)
+        if len(letters) != breadth:
+            raise BDException('Line %s has %s letters, the grid is %s wide'
+                              % (number, len(letters), breadth))
+        # every letter is one character if the row is as long as the list
+        if len(row) != breadth or not (row.isascii() and row.isalpha()):
+            raise BDException('Line %s has something other than single '
+                              'letters A-Z' % number)
+        yield number, row
+
+
+def read_grid(lines, backend=None):
+    ''' Build a grid while reading the lines one by one, only the compact
+    letters are kept in memory. See iter_rows for the checks '''
+
+    data = bytearray()
+    length = 0
+    breadth = 0
+    for _, row in iter_rows(lines):
+        data += row.encode('ascii')
+        length += 1
+        breadth = len(row)
+    if not length:
+        raise BDException('The grid is empty')
+    return from_bytes(data, length, breadth, backend=backend)
+
+
+def load_grid(dump, backend=None):
+    ''' Make a grid back from what Grid.dump returned '''
+
+    length, breadth, data = dump
+    if isinstance(data, list):
+        return ListGrid(data)
+    if isinstance(data, str):
+        return MmapGrid(data)
+    return from_bytes(data, length, breadth, backend=backend)
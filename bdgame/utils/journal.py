@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import json
+import time
+import hashlib
+from array import array
+
+from bdgame.exceptions import BDException
+
+# Records written between two fsyncs of the journal
+SYNC_EVERY = 16
+# Turns between two snapshots of the game, a resume replays fewer moves
+SNAPSHOT_EVERY = 50
+# Journals of finished games play keeps, the oldest ones are removed
+KEEP_JOURNALS = 1000
+
+JOURNAL_EXT = '.journal'
+# A journal is renamed to it when its game ends
+FINISHED_EXT = '.done' + JOURNAL_EXT
+SNAPSHOT_EXT = '.snapshot'
+# Kept in the snapshots, changed with what game_state keeps
+SNAPSHOT_FORMAT = 1
+
+
+def journal_dir():
+    ''' Return the directory the journals are kept in by default, next to
+    the config file '''
+
+    from bdgame.utils import cfg_path
+    return cfg_path() + '-journals'
+
+
+def new_game_id():
+    ''' Return a new random id for a game '''
+    return os.urandom(8).hex()
+
+
+def puzzle_id(conf):
+    ''' Return an id of the puzzle of the game configurations, the same
+    grid and locations give the same id whatever the backend of the grid.
+    The text of the grid is hashed a row at a time, it may hold any letter '''
+
+    grid = conf['grid']
+    digest = hashlib.sha256(b'%d %d\n' % (grid.length, grid.breadth))
+    for row in grid.iter_text():
+        digest.update(row.encode('utf-8'))
+    for location in conf['locations']:
+        digest.update(b',' + str(location).encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(path):
+    ''' Return the path of the snapshot kept next to the journal '''
+    return os.path.splitext(path)[0] + SNAPSHOT_EXT
+
+
+def read_records(path, offset=0):
+    ''' Yield (offset after the record, record) for every record of the
+    journal from the offset on. A last record cut short by a crash is left
+    out '''
+
+    with open(path, 'rb') as stream:
+        stream.seek(offset)
+        for line in stream:
+            if not line.endswith(b'\n'):
+                return
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            yield offset, record
+
+
+def _last_record(path):
+    ''' Return the last complete record of the journal or None '''
+
+    with open(path, 'rb') as stream:
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(max(0, size - 4096))
+        lines = stream.read().split(b'\n')
+    # the text after the last newline is empty or a record cut short
+    for line in reversed(lines[:-1]):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def _write_atomic(path, data):
+    ''' Write the file aside and rename it, readers never see half of it '''
+
+    tmp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(tmp_path, 'wb') as stream:
+        stream.write(data)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(tmp_path, path)
+
+
+def game_state(game):
+    ''' Return the state of the game as plain data, see restore_state. The
+    locations are kept as their indexes in the game configurations '''
+
+    conf = game.conf
+    indexes = dict((location, i) for i, location in enumerate(
+        conf['locations']))
+    players = game.players
+    words = conf['words']
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'turns': game.turns,
+        'last_player': (game.index(game.last_player)
+                        if game.last_player is not None else None),
+        'passes': game.passes,
+        'eliminated': [i for i in range(len(players))
+                       if game.order.is_eliminated(i)],
+        'players': [[player.score, player.log.tolist(), player.misses]
+                    for player in players],
+        'words': dict(
+            (word, [words.count(word),
+                    [indexes[i] for i in words.unclaimed(word)]])
+            for word in words
+        ),
+        'claims': [
+            [indexes[location],
+             game.index(player) if player is not None else None]
+            for location, player in game.board.claims
+        ],
+    }
+
+
+def restore_state(game, state):
+    ''' Put the game in the state returned by game_state '''
+
+    conf = game.conf
+    locations = conf['locations']
+    players = game.players
+
+    game.turns = state['turns']
+    game.passes = state['passes']
+    for index in state['eliminated']:
+        game.order.eliminate(index)
+    last_player = state['last_player']
+    game.last_player = players[last_player] if last_player is not None \
+        else None
+    for i, (player, saved) in enumerate(zip(players, state['players'])):
+        player.score = saved[0]
+        game.standings.set(i, saved[0])
+        player.log = array('I', saved[1])
+        player.misses = saved[2]
+
+    for word, (_, indexes) in state['words'].items():
+        conf['words'].restore(word, [locations[i] for i in indexes])
+
+    game.board.recognized_locations = []
+    for index, player in state['claims']:
+        game.board.claim(locations[index],
+                         players[player] if player is not None else None)
+
+
+class Journal(object):
+    ''' Append-only record of the turns of one game, one json line each.
+    Every record is written as soon as it is made, they are synced to the
+    disk in batches. A snapshot of the game is taken every few turns so a
+    resume only replays the moves after it '''
+
+    def __init__(self, path, game_id, puzzle, offset=0,
+                 sync_every=SYNC_EVERY, snapshot_every=SNAPSHOT_EVERY,
+                 keep=None):
+        ''' Instantiate the journal
+        :args puzzle: The puzzle_id of the game, every record has it so a
+        record can be counted without the rest of the journal
+        :args offset: Size of the journal when it is opened, records are
+        appended after it
+        :args keep: Number of journals of finished games kept in the
+        directory when the game ends, see rotate. All of them if None
+        '''
+        self.path = path
+        self.game_id = game_id
+        self.puzzle = puzzle
+        self.offset = offset
+        self.sync_every = sync_every
+        self.snapshot_every = snapshot_every
+        self.keep = keep
+        self._pending = 0
+        # unbuffered, a record is in the file as soon as write returns
+        self._stream = open(path, 'ab', buffering=0)
+
+    def _append(self, record):
+        ''' Write the record to the journal '''
+
+        record['game'] = self.game_id
+        record['puzzle'] = self.puzzle
+        record['ts'] = round(time.time(), 3)
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        self._stream.write(line + b'\n')
+        self.offset += len(line) + 1
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        ''' Make sure the records written are on the disk '''
+        if self._pending:
+            os.fsync(self._stream.fileno())
+            self._pending = 0
+
+    def start(self, game):
+        ''' Record the start of the game with the player starting it, the
+        turn order may have picked him at random '''
+        self._append({
+            't': 'start',
+            'players': [player.name for player in game.players],
+            'first': game.order.first(),
+        })
+
+    def move(self, game, player, user_input, outcome):
+        ''' Record a turn played '''
+
+        self._append({
+            't': 'move',
+            'turn': game.turns,
+            'seat': game.index(player),
+            'player': player.name,
+            'input': user_input,
+            'outcome': outcome,
+        })
+        if game.turns % self.snapshot_every == 0:
+            self.snapshot(game)
+
+    def eliminate(self, game, player):
+        ''' Record a player taken out of the turns '''
+        self._append({
+            't': 'eliminate',
+            'seat': game.index(player),
+            'player': player.name,
+        })
+
+    def end(self, game, result):
+        ''' Record the result of the game with the scores and the words
+        nobody found. Its snapshot is not needed any more, the journal is
+        renamed to FINISHED_EXT and the oldest finished ones are rotated
+        out '''
+
+        words = game.conf['words']
+        self._append({
+            't': 'end',
+            'turns': game.turns,
+            'winner': result if isinstance(result, str) else result.name,
+            'scores': dict((player.name, player.score)
+                           for player in game.players),
+            'left': sorted(word for word in words if words.count(word)),
+        })
+        self.close()
+        try:
+            os.remove(snapshot_path(self.path))
+        except OSError:
+            pass
+        if not self.path.endswith(FINISHED_EXT):
+            finished = self.path[:-len(JOURNAL_EXT)] + FINISHED_EXT
+            os.replace(self.path, finished)
+            self.path = finished
+        if self.keep:
+            rotate(os.path.dirname(self.path), self.keep)
+
+    def snapshot(self, game):
+        ''' Store the state of the game with the offset of the journal it
+        matches, the journal is synced first so it is never behind '''
+
+        self.sync()
+        state = game_state(game)
+        state['game'] = self.game_id
+        state['offset'] = self.offset
+        _write_atomic(snapshot_path(self.path),
+                      json.dumps(state, separators=(',', ':')).encode('utf-8'))
+
+    def close(self):
+        ''' Sync and close the journal '''
+        if not self._stream.closed:
+            self.sync()
+            self._stream.close()
+
+
+def _mtime(path):
+    ''' Return the modification time of the file, 0 if it is gone '''
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def rotate(directory, keep):
+    ''' Remove the oldest journals of finished games in the directory so
+    keep of them are left. Nothing is removed before there are a tenth
+    more than keep, the files are not looked at after every game '''
+
+    try:
+        names = [name for name in os.listdir(directory)
+                 if name.endswith(FINISHED_EXT)]
+    except OSError:
+        return
+    if len(names) <= keep + keep // 10:
+        return
+    paths = sorted((os.path.join(directory, name) for name in names),
+                   key=_mtime)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def start(game, directory=None, keep=None):
+    ''' Start journaling a new game in the directory, returns the Journal
+    which is also set on the game. See Journal for keep '''
+
+    directory = directory or journal_dir()
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    game_id = new_game_id()
+    journal = Journal(os.path.join(directory, game_id + JOURNAL_EXT),
+                      game_id, puzzle_id(game.conf), keep=keep)
+    journal.start(game)
+    game.journal = journal
+    return journal
+
+
+def find_unfinished(directory=None, puzzle=None):
+    ''' Return the path of the latest journal of a game which did not end,
+    of the puzzle if given, or None '''
+
+    directory = directory or journal_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return None
+
+    paths = [os.path.join(directory, name) for name in names
+             if name.endswith(JOURNAL_EXT) and
+             not name.endswith(FINISHED_EXT)]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths:
+        last = _last_record(path)
+        if last is None or last['t'] == 'end':
+            continue
+        if puzzle is not None:
+            first = next(read_records(path), (0, None))[1]
+            if first is None or first.get('puzzle') != puzzle:
+                continue
+        return path
+    return None
+
+
+def resume(game, path, keep=None):
+    ''' Bring the game back to where the journal stops: the latest snapshot
+    is loaded and only the moves after it are replayed. The journal is set
+    on the game to go on with, see Journal for keep. Returns the result if
+    the game turns out to be over, else None '''
+
+    offset, header = next(read_records(path), (0, None))
+    if header is None or header['t'] != 'start':
+        raise BDException('%s is not a game journal' % path)
+    if header['puzzle'] != puzzle_id(game.conf):
+        raise BDException('The journal is of another puzzle')
+    if header['players'] != [player.name for player in game.players]:
+        raise BDException('The journal is of other players: %s' % ', '.join(
+            header['players']))
+    if 'first' in header:
+        game.order.start_with(header['first'])
+
+    try:
+        with open(snapshot_path(path), 'rb') as stream:
+            state = json.loads(stream.read())
+    except (OSError, ValueError):
+        state = None
+    if state is not None and state.get('game') == header['game'] and \
+            state.get('format') == SNAPSHOT_FORMAT:
+        restore_state(game, state)
+        offset = state['offset']
+
+    headless = game.headless
+    game.headless = True
+    game.journal = None
+    result = None
+    try:
+        for end, record in read_records(path, offset):
+            if record['t'] == 'eliminate':
+                offset = end
+                game.eliminate(game.players[record['seat']])
+            elif record['t'] == 'move':
+                offset = end
+                result = game.play_turn(game.players[record['seat']],
+                                        record['input'])
+                if result is not None:
+                    break
+    finally:
+        game.headless = headless
+
+    # drop a record cut short by the crash, new ones go after the last good
+    with open(path, 'r+b') as stream:
+        stream.truncate(offset)
+    journal = Journal(path, header['game'], header['puzzle'], offset=offset,
+                      keep=keep)
+    game.journal = journal
+    if result is not None:
+        journal.end(game, result)
+    return result
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from bdgame.exceptions import BDException
+from bdgame.utils import path as paths
+
+
+class Location(object):
+    ''' Where a word is on the grid. The numbers are parsed once when it is
+    made, the path of straight segments (see bdgame.utils.path), the shape
+    and the coordinates are worked out the first time they are needed.
+    Locations can not be changed, equal ones have the same points '''
+
+    __slots__ = ('points', '_path', '_shape', '_coordinates')
+
+    def __init__(self, points):
+        ''' Instantiate the location
+        :args points: The numbers of the location, like [2, 3, 2, 5] or
+        ['2', '3', '2', '5']. Every pair is a cell, the word runs from the
+        first cell to the last one through the others in any of the eight
+        directions, 6 numbers make an L
+        '''
+        try:
+            points = tuple(int(i) for i in points)
+        except (TypeError, ValueError):
+            raise BDException('Location %s is not made of numbers' % (
+                ' '.join(str(i) for i in points),))
+        object.__setattr__(self, 'points', points)
+        object.__setattr__(self, '_path', False)
+        object.__setattr__(self, '_shape', False)
+        object.__setattr__(self, '_coordinates', None)
+
+    def __setattr__(self, name, value):
+        ''' Locations are immutable '''
+        raise AttributeError('Location can not be changed')
+
+    def __reduce__(self):
+        ''' Pickle the location by its points '''
+        return (Location, (self.points,))
+
+    def __repr__(self):
+        ''' Represent the location '''
+        return 'Location(%s)' % ', '.join(str(i) for i in self.points)
+
+    def __str__(self):
+        ''' The location the way it is written in the config '''
+        return ' '.join(str(i) for i in self.points)
+
+    def __eq__(self, other):
+        ''' Equality of location '''
+        if not isinstance(other, Location):
+            return NotImplemented
+        return self.points == other.points
+
+    def __ne__(self, other):
+        ''' Inequality of location '''
+        if not isinstance(other, Location):
+            return NotImplemented
+        return self.points != other.points
+
+    def __hash__(self):
+        ''' Hash of the points '''
+        return hash(self.points)
+
+    def __len__(self):
+        ''' Number of points '''
+        return len(self.points)
+
+    def __getitem__(self, index):
+        ''' The point at the index '''
+        return self.points[index]
+
+    def __iter__(self):
+        ''' Iterate over the points '''
+        return iter(self.points)
+
+    @property
+    def path(self):
+        ''' Return the segments of the location, None if the points do not
+        make a path '''
+
+        path = self._path
+        if path is False:
+            path = paths.make_path(self.points)
+            object.__setattr__(self, '_path', path)
+        return path
+
+    @property
+    def shape(self):
+        ''' Return the shape of the location, see bdgame.utils.path.shape,
+        None if the points do not make a path '''
+
+        shape = self._shape
+        if shape is False:
+            path = self.path
+            shape = path and paths.shape(path)
+            object.__setattr__(self, '_shape', shape)
+        return shape
+
+    @property
+    def coordinates(self):
+        ''' Return the (row, column) of the cells covered by the location,
+        computed on first use '''
+
+        coordinates = self._coordinates
+        if coordinates is None:
+            if self.path is None:
+                raise BDException('The word is not fitting any shape')
+            coordinates = paths.cells(self.path)
+            object.__setattr__(self, '_coordinates', coordinates)
+        return coordinates
+
+    def check_bounds(self, length, breadth):
+        ''' Raise BDException if the location goes out of a grid of the
+        given size '''
+
+        if self.path is not None and not paths.inside(
+                self.path, length, breadth):
+            raise BDException('Location %s is out of the %s x %s grid' % (
+                self, length, breadth))
+
+
+def parse_location(location):
+    ''' Return the Location of a Location, a string like "2 3 2 5" or a
+    sequence of numbers '''
+
+    if isinstance(location, Location):
+        return location
+    if isinstance(location, str):
+        location = location.split()
+    return Location(location)
+
+
+def split_locations(locations):
+    ''' Turn the comma separated locations into a list of Location '''
+    return [Location(i.split()) for i in locations.strip().split(',')]
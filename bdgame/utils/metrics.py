@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import json
+import time
+import signal
+import functools
+
+# Environment variable holding the file to write the metrics to
+METRICS_ENV = 'BDGAME_METRICS'
+
+# Upper bounds in seconds of the buckets of the render latency histogram
+RENDER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                  2.5, 5.0)
+
+# The Metrics being recorded, None when metrics are disabled
+_current = None
+
+
+class Histogram(object):
+    ''' Counts of observations falling under each bucket bound '''
+
+    def __init__(self, buckets):
+        ''' Instantiate the histogram '''
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        ''' Add one observation '''
+
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        ''' Return (bound, observations <= bound) pairs '''
+
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics(object):
+    ''' Wall times of the phases of a game and counters of what happened '''
+
+    def __init__(self, path=None):
+        ''' Instantiate the metrics
+        :args path: File the metrics are dumped to, .prom or .txt files get
+        the Prometheus text format and others json
+        '''
+        self.path = path
+        self.started = time.time()
+        # phase -> [calls, total seconds, max seconds]
+        self.phases = {}
+        self.counters = {}
+        self.histograms = {'render_seconds': Histogram(RENDER_BUCKETS)}
+
+    def record(self, phase, seconds):
+        ''' Add one run of the phase '''
+
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds > stats[2]:
+            stats[2] = seconds
+
+    def incr(self, counter, value=1):
+        ''' Increase the counter '''
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def as_dict(self):
+        ''' Return the metrics as a dict of plain values '''
+
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'phases': dict(
+                (phase, {'calls': stats[0], 'total_seconds': stats[1],
+                         'max_seconds': stats[2]})
+                for phase, stats in self.phases.items()
+            ),
+            'counters': dict(self.counters),
+            'histograms': dict(
+                (name, {'buckets': histogram.cumulative(),
+                        'count': histogram.count, 'sum': histogram.sum})
+                for name, histogram in self.histograms.items()
+            ),
+        }
+
+    def prometheus(self):
+        ''' Return the metrics in the Prometheus text format '''
+
+        lines = [
+            '# TYPE bdgame_phase_calls_total counter',
+        ]
+        for phase, stats in sorted(self.phases.items()):
+            lines.append('bdgame_phase_calls_total{phase="%s"} %d' % (
+                phase, stats[0]))
+        lines.append('# TYPE bdgame_phase_seconds_total counter')
+        for phase, stats in sorted(self.phases.items()):
+            lines.append('bdgame_phase_seconds_total{phase="%s"} %.9f' % (
+                phase, stats[1]))
+        lines.append('# TYPE bdgame_phase_seconds_max gauge')
+        for phase, stats in sorted(self.phases.items()):
+            lines.append('bdgame_phase_seconds_max{phase="%s"} %.9f' % (
+                phase, stats[2]))
+        for counter, value in sorted(self.counters.items()):
+            lines.append('# TYPE bdgame_%s_total counter' % counter)
+            lines.append('bdgame_%s_total %d' % (counter, value))
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append('# TYPE bdgame_%s histogram' % name)
+            for bound, count in histogram.cumulative():
+                lines.append('bdgame_%s_bucket{le="%s"} %d' % (
+                    name, bound, count))
+            lines.append('bdgame_%s_bucket{le="+Inf"} %d' % (
+                name, histogram.count))
+            lines.append('bdgame_%s_sum %.9f' % (name, histogram.sum))
+            lines.append('bdgame_%s_count %d' % (name, histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path=None):
+        ''' Write the metrics to the file '''
+
+        path = path or self.path
+        if not path:
+            return
+        if path.endswith(('.prom', '.txt')):
+            text = self.prometheus()
+        else:
+            text = json.dumps(self.as_dict(), indent=2, sort_keys=True) + '\n'
+        # write aside and rename so a scraper never reads half a file
+        tmp_path = '%s.%s.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w') as stream:
+            stream.write(text)
+        os.replace(tmp_path, path)
+
+
+def current():
+    ''' Return the Metrics being recorded or None '''
+    return _current
+
+
+def enable(path=None):
+    ''' Start recording metrics, they are dumped to path. SIGUSR1 dumps them
+    while the game goes on '''
+
+    global _current
+    _current = Metrics(path)
+    if path and hasattr(signal, 'SIGUSR1'):
+        try:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: dump())
+        except ValueError:
+            # signals can only be handled in the main thread
+            pass
+    return _current
+
+
+def disable():
+    ''' Stop recording metrics '''
+    global _current
+    _current = None
+
+
+def configure(path=None):
+    ''' Enable the metrics if a file is given or set in the environment '''
+
+    path = path or os.environ.get(METRICS_ENV)
+    if path:
+        return enable(path)
+    return None
+
+
+def dump(path=None):
+    ''' Write the metrics being recorded, if any '''
+    if _current is not None:
+        _current.dump(path)
+
+
+def incr(counter, value=1):
+    ''' Increase the counter if metrics are recorded '''
+    if _current is not None:
+        _current.incr(counter, value)
+
+
+def timed(phase, histogram=None):
+    ''' Decorator recording the wall time of every call of the function as
+    the phase, and in the histogram if given. When metrics are disabled the
+    only cost is one check '''
+
+    def decorator(func):
+        ''' Wrap the function '''
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ''' Time the call '''
+            metrics = _current
+            if metrics is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                metrics.record(phase, seconds)
+                if histogram is not None:
+                    metrics.histograms[histogram].observe(seconds)
+        return wrapper
+    return decorator
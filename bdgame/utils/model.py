@@ -1,21 +1,64 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+from array import array
+
 import click
 
-import bdgame.utils as utils
-from bdgame.exceptions import BDException
+from bdgame.utils import metrics
+from bdgame.utils.bots import ConsoleInput
+from bdgame.utils.location import parse_location
+from bdgame.utils.render import VIEW_COMMANDS, Renderer
+from bdgame.utils.standings import Standings
+from bdgame.utils.turns import RoundRobin
+
+# Colors used to show the words found by each player, in order of joining
+PLAYER_COLORS = ['blue', 'green', 'magenta', 'cyan', 'red', 'white']
+
+# Players shown in the standings line after each turn
+STANDINGS_TOP = 3
+
+# What an answer can turn out to be, kept by their index in the answer logs
+OUTCOMES = ('pass', 'correct', 'taken', 'wrong')
+_OUTCOME_CODES = dict((outcome, i) for i, outcome in enumerate(OUTCOMES))
+_CORRECT = _OUTCOME_CODES['correct']
+# Set in the log entries of the answers kept in the misses of the player
+_MISS = 4
+
+
+class Vocabulary(object):
+    ''' The answers of a game which can be right, PASS and the words of the
+    puzzle, each one kept once and known by its id. Wrong answers are not
+    in it, a game is not made to keep every guess for ever '''
+
+    __slots__ = ('ids', 'words')
+
+    def __init__(self, words=()):
+        ''' Instantiate the vocabulary of the words '''
+        self.words = list(words)
+        self.ids = dict((word, i) for i, word in enumerate(self.words))
+
+    def id(self, word):
+        ''' Return the id of the word, None if it is not in the vocabulary '''
+        return self.ids.get(word)
 
 
 class Board(object):
     ''' The Board Class '''
 
+    __slots__ = ('grid', 'length', 'breadth', '_recognized_locations',
+                 'claims', '_owners')
+
     def __init__(self, grid, length, breadth):
         ''' Instantiate the board '''
         self.grid = grid
         self.length = length
         self.breadth = breadth
         self._recognized_locations = []
+        # (location, player) of every claim, in order
+        self.claims = []
+        # (row, column) -> (location, player) of the word claiming the cell
+        self._owners = {}
 
     def __repr__(self):
         ''' Represent the board '''
@@ -28,19 +71,54 @@ class Board(object):
 
     @recognized_locations.setter
     def recognized_locations(self, value):
-        ''' Add new recognized_location on the board '''
-        self._recognized_locations = value
+        ''' Replace the recognized_locations on the board, the players who
+        claimed them are not known any more '''
+        self._recognized_locations = []
+        self.claims = []
+        self._owners = {}
+        for location in value:
+            self.claim(location)
 
+    def claim(self, location, player=None):
+        ''' Mark the cells of the location as recognized by the player '''
 
-class Player(object):
-    ''' The Player Class '''
+        location = parse_location(location)
+        for coordinate in location.coordinates:
+            self._owners[coordinate] = (location, player)
+        self._recognized_locations.append(location)
+        self.claims.append((location, player))
+
+    def owner(self, row, column):
+        ''' Return the (location, player) which claimed the cell or None if
+        the cell is not recognized yet '''
+        return self._owners.get((row, column))
 
-    def __init__(self, name):
-        ''' Instantiate the player object '''
+
+class Player(object):
+    ''' The Player Class. Every answer is kept in the log as the id of the
+    word in the vocabulary, or its index in the misses when it is not one,
+    and the index of its outcome in OUTCOMES, four bytes each '''
+
+    __slots__ = ('name', 'color', 'agent', 'score', 'log', 'misses',
+                 'vocabulary')
+
+    def __init__(self, name, color='blue', agent=None, vocabulary=None):
+        ''' Instantiate the player object
+        :args agent: The PlayerInput giving the answers of the player, the
+        input of the game is used if None
+        :args vocabulary: The Vocabulary of the answers, the game gives its
+        own to its players
+        '''
         self.name = name
-        self._score = 0
-        self._answers = []
-        self._correct_answers = []
+        self.color = color
+        self.agent = agent
+        self.score = 0
+        # id << 3 | _MISS if a miss | outcome code of every answer, in order
+        self.log = array('I')
+        # the answers which are not in the vocabulary, as they were given
+        self.misses = []
+        self.vocabulary = vocabulary if vocabulary is not None \
+            else Vocabulary()
 
     def __repr__(self):
         ''' Represent the player object '''
@@ -50,238 +128,346 @@ class Player(object):
         ''' Equality of player '''
         return self.name == other.name
 
-    @property
-    def score(self):
-        ''' Returns the score of the player '''
-        return self._score
-
-    @score.setter
-    def score(self, value):
-        ''' Set the score'''
-        self._score = value
+    def record(self, answer, outcome):
+        ''' Add the answer and its outcome, one of OUTCOMES, to the log '''
+        code = _OUTCOME_CODES[outcome]
+        word_id = self.vocabulary.id(answer)
+        if word_id is None:
+            word_id = len(self.misses)
+            self.misses.append(answer)
+            code |= _MISS
+        self.log.append(word_id << 3 | code)
+
+    def _answer(self, entry):
+        ''' Return the answer of the log entry '''
+        if entry & _MISS:
+            return self.misses[entry >> 3]
+        return self.vocabulary.words[entry >> 3]
+
+    def history(self):
+        ''' Yield the (answer, outcome) of every answer, in order '''
+        for entry in self.log:
+            yield self._answer(entry), OUTCOMES[entry & 3]
 
     @property
     def answers(self):
         ''' Returns the answers answered by the user '''
-        return self._answers
-
-    @answers.setter
-    def answers(self, value):
-        ''' Set the answers '''
-        self._answers = value
+        return [self._answer(entry) for entry in self.log]
 
     @property
     def correct_answers(self):
         ''' Returns the correct answers answered by the user '''
-        return self._correct_answers
-
-    @correct_answers.setter
-    def correct_answers(self, correct_answers):
-        ''' Set the correct answers '''
-        self._correct_answers = correct_answers
+        return [self._answer(entry) for entry in self.log
+                if entry & 3 == _CORRECT]
 
 
 class Game(object):
     ''' The Game class '''
 
-    def __init__(self, board, players, conf):
-        ''' Instantiate the game object '''
+    __slots__ = ('board', 'players', 'conf', 'headless', 'output',
+                 'renderer', 'player_input', 'journal', 'order', 'vocabulary',
+                 '_indexes', 'turns', '_last', 'passes', 'standings')
+
+    def __init__(self, board, players, conf, renderer=None,
+                 player_input=None, headless=False, output=None,
+                 journal=None, order=None):
+        ''' Instantiate the game object
+        :args player_input: The PlayerInput asked for the answers of the
+        players without an agent of their own, the console by default
+        :args headless: Play without showing the board or any message
+        :args output: Function called with the messages about the game
+        instead of printing them
+        :args journal: The Journal every turn is written to, if any
+        :args order: The TurnOrder of the players, round robin by default
+        '''
         self.board = board
         self.players = players
         self.conf = conf
+        self.headless = headless
+        self.output = output
+        # a headless game never draws the board
+        if renderer is None and not headless:
+            renderer = Renderer()
+        self.renderer = renderer
+        self.player_input = player_input or ConsoleInput()
+        self.journal = journal
+        self.order = order or RoundRobin(len(players))
+        # the answers of all the players which are not misses
+        self.vocabulary = Vocabulary(['PASS'] + sorted(conf['words']))
+        for player in players:
+            player.vocabulary = self.vocabulary
+        # id(player) -> index, players are told apart even with same names
+        self._indexes = dict((id(player), i) for i, player in
+                             enumerate(players))
+        self.turns = 0
+        # index of the player who played last
+        self._last = None
+        # turns in a row which were PASS
+        self.passes = 0
+        # nobody can score more than the number of words
+        self.standings = Standings(len(players),
+                                   max_score=conf['words'].remaining)
+
+    @property
+    def last_player(self):
+        ''' Return the player who played last or None '''
+        if self._last is None:
+            return None
+        return self.players[self._last]
+
+    @last_player.setter
+    def last_player(self, player):
+        ''' Set the player who played last '''
+        self._last = None if player is None else self._indexes[id(player)]
+
+    def index(self, player):
+        ''' Return the index of the player in the game '''
+        return self._indexes[id(player)]
+
+    def _echo(self, message):
+        ''' Show a message about the game unless playing headless '''
+        if self.headless:
+            return
+        if self.output is not None:
+            self.output(message)
+        else:
+            click.echo(message)
 
     def _words_left(self):
         ''' Check if there are any words left to be checked out '''
 
-        count = 0
-        for word in self.conf['words']:
-            count += self.conf['words'][word]['count']
-
-        return count
-
-    def _recognized_location(self, j, i):
-        ''' From the recognized_locations in board, check if the Coordinates
-        are recognized or not '''
-
-        for location in self.board.recognized_locations:
-            shape = utils.recognize_shape(location)
-            if not shape:
-                raise BDException('The word is not fitting any shape')
-            all_coordinates = utils.trav_grid(
-                self.board.grid,
-                location,
-                shape=shape,
-                select='coordinates'
-            )
+        return self.conf['words'].remaining
 
-            # click.echo(all_coordinates, nl=False)
-            if (i, j) in all_coordinates:
-                return True
+    def _cell_color(self, row, column):
+        ''' Return the color of the cell, the words found are shown in the
+        color of the player who found them '''
 
-        return False
+        owner = self.board.owner(row, column)
+        if owner is None:
+            return 'yellow'
+        if owner[1] is None:
+            return 'blue'
+        return owner[1].color
 
-    def display_board(self):
+    @metrics.timed('display_board', histogram='render_seconds')
+    def display_board(self, full=False):
         ''' Display the board in a fancy manner '''
-
-        click.echo()
-        for i in range(self.board.length):
-            for j in range(self.board.breadth):
-                if not self._recognized_location(j, i):
-                    click.echo(
-                        click.style(str(' ' + self.board.grid[i][j] + ' '),
-                                    fg="yellow"), nl=False
-                    )
-                    click.echo(nl=False)
-                else:
-                    click.echo(
-                        click.style(str(' ' + self.board.grid[i][j] + ' '),
-                                    fg="blue"), nl=False
-                    )
-                    click.echo(nl=False)
-
-            click.echo()
-        click.echo()
+        if self.headless or self.renderer is None:
+            return
+        self.renderer.render(self.board, self._cell_color, full=full)
+
+    def view(self, command):
+        ''' Move the window of the board and show it again. The command is
+        one of VIEW_COMMANDS, scrolling ones may be followed by a number of
+        cells and go half the window by default, /last shows the last word
+        found '''
+
+        viewport = self.renderer.viewport if self.renderer else None
+        if viewport is None or not viewport.rows:
+            self._echo('The whole board is shown, play --viewport to scroll '
+                       'the boards bigger than the terminal')
+            return
+        parts = command.split()
+        name = parts[0].lower()
+        if (name not in VIEW_COMMANDS or len(parts) > 2 or
+                (len(parts) == 2 and not parts[1].isdigit())):
+            self._echo('Use one of %s, all but /last take a number of cells'
+                       % ', '.join(VIEW_COMMANDS))
+            return
+        count = int(parts[1]) if len(parts) == 2 else None
+
+        if name == '/last':
+            if not self.board.claims:
+                self._echo('No word is found yet')
+                return
+            coordinates = self.board.claims[-1][0].coordinates
+            viewport.center(*coordinates[len(coordinates) // 2])
+        elif name in ('/up', '/down'):
+            step = count or max(1, viewport.rows // 2)
+            viewport.scroll(step if name == '/down' else -step, 0)
+        else:
+            step = count or max(1, viewport.columns // 2)
+            viewport.scroll(0, step if name == '/right' else -step)
+        self.display_board()
 
     def _game_starter(self):
-        ''' Choose who will start the game
-        The logic can be tweaked '''
-        return self.players[0]
+        ''' Choose who will start the game, the turn order decides '''
+        return self.players[self.order.first()]
 
     def _get_player_turn(self, last_player):
         ''' Return the player object whose turn is now '''
 
-        if not last_player:
+        if last_player is None:
             return self._game_starter()
-
-        for i in range(len(self.players)):
-            if self.players[i] == last_player:
-                return self.players[(i+1) % len(self.players)]
+        return self.players[self.order.next(self.index(last_player))]
 
     def _check_winner(self):
         ''' From the players score, check who is the winner and return name
-        and if any two players having highest score have same score, the match
+        and if more than one player has the highest score, the match
         is draw, return 'draw' '''
 
-        p_scores = sorted(self.players, key=lambda x: x.score, reverse=True)
-        if p_scores[0].score == p_scores[1].score:
+        leaders = self.standings.leaders()
+        if len(leaders) != 1:
             return "draw"
-        return p_scores[0]
+        return self.players[leaders[0]]
+
+    def standings_line(self, player=None):
+        ''' Return the first players with their rank and score, and the
+        rank of the player if he is not one of them '''
+
+        top = self.standings.top(STANDINGS_TOP)
+        parts = ['%s. %s %s' % (self.standings.rank(index),
+                                self.players[index].name, score)
+                 for index, score in top]
+        if player is not None:
+            index = self.index(player)
+            if index not in [i for i, _ in top]:
+                parts.append('... %s. %s %s' % (
+                    self.standings.rank(index), player.name,
+                    self.standings.scores[index]))
+        return 'Standings: %s' % ', '.join(parts)
 
     def _process_correct_input(self, user_input, current_player):
         ''' Adjust the variables when user input was correct '''
 
         words = self.conf['words']
 
-        # update the user's answers
-        answers = current_player.answers
-        answers.append(user_input)
-        current_player.answers = answers
+        current_player.record(user_input, 'correct')
 
         # increase his score
         current_player.score += 1
-        # update his correct_answers list
-        correct_answers = current_player.correct_answers
-        correct_answers.append(user_input)
-        current_player.correct_answers = correct_answers
+        self.standings.add(self.index(current_player))
 
-        # update the recognized_locations
-        recognized_locations = self.board.recognized_locations
-        recognized_locations.append(words[user_input]['locations'][0])
-        self.board.recognized_locations = recognized_locations
-
-        # decrease the word count
-        words[user_input]['count'] -= 1
-        # as of now, just remove any of the duplicates
-        words[user_input]['locations'].pop()
+        # mark the cells of the occurrence used up as claimed by the player
+        self.board.claim(words.claim(user_input), current_player)
 
+    @metrics.timed('process_user_input')
     def _process_user_input(self, user_input, current_player):
-        ''' Process the user input '''
+        ''' Process the user input. Returns what the answer was: pass,
+        correct, taken or wrong '''
 
         words = self.conf['words']
         if user_input == 'PASS':
-            # update the user's answers
-            answers = current_player.answers
-            answers.append(user_input)
-            current_player.answers = answers
-            click.echo(
+            metrics.incr('passes')
+            current_player.record(user_input, 'pass')
+            self._echo(
                 "%s has PASSed, %s's score is %s" % (
                     current_player.name,
                     current_player.name,
                     current_player.score
                     )
             )
-        elif user_input in words and words[user_input]['count'] > 0:
+            return 'pass'
+        elif words.count(user_input):
             # he answered correctly
+            metrics.incr('correct_answers')
             self._process_correct_input(user_input, current_player)
-            click.echo(
+            self._echo(
                 "%s is a correct choice. %s's score is %s" % (
                     user_input,
                     current_player.name,
                     current_player.score
                 )
             )
-        elif user_input in words and words[user_input]['count'] == 0:
+            return 'correct'
+        elif user_input in words:
             # The word already taken, even the duplicate ones of the word
-            # update the user's answers
-            answers = current_player.answers
-            answers.append(user_input)
-            current_player.answers = answers
-            click.echo(
+            metrics.incr('taken_answers')
+            current_player.record(user_input, 'taken')
+            self._echo(
                 "%s is a already identified. %s's score is %s" % (
                     user_input,
                     current_player.name,
                     current_player.score
                 )
             )
+            return 'taken'
         else:
             # he answered wrong
-            # update the user's answers
-            answers = current_player.answers
-            answers.append(user_input)
-            current_player.answers = answers
-            click.echo(
+            metrics.incr('wrong_answers')
+            current_player.record(user_input, 'wrong')
+            self._echo(
                 "%s is a wrong choice. %s's score is %s" % (
                     user_input,
                     current_player.name,
                     current_player.score
                 )
             )
-
-    def play_game(self):
-        ''' Play the game '''
-
-        last_player = None
-        while self._words_left():
-            current_player = self._get_player_turn(
-                last_player=last_player,
-            )
+            return 'wrong'
+
+    def current_player(self):
+        ''' Return the player who has to answer now '''
+        if self._last is None:
+            return self.players[self.order.first()]
+        return self.players[self.order.next(self._last)]
+
+    def eliminate(self, player):
+        ''' Take the player out of the turns, the game goes on with the
+        others '''
+        self.order.eliminate(self.index(player))
+        if self.journal is not None:
+            self.journal.eliminate(self, player)
+
+    def _all_passed(self):
+        ''' Check if all the players passed their last two turns, the
+        players play in turns so it is the last two rounds '''
+        return self.passes >= 2 * self.order.active
+
+    def play_turn(self, current_player, user_input):
+        ''' Play the answer of the player. Returns the result of the game if
+        it is over after this turn, else None '''
+
+        user_input = user_input.strip().upper()
+        self.turns += 1
+        metrics.incr('turns')
+
+        # Process the user input
+        outcome = self._process_user_input(user_input, current_player)
+        self._last = self._indexes[id(current_player)]
+        if outcome == 'pass':
+            self.passes += 1
+        else:
+            self.passes = 0
+        if not self.headless:
+            self._echo(self.standings_line(current_player))
+        if self.journal is not None:
+            self.journal.move(self, current_player, user_input, outcome)
+
+        # Check if all passed twice
+        if self._all_passed() or not self._words_left():
+            result = self._check_winner()
+            if self.journal is not None:
+                self.journal.end(self, result)
+            return result
+        return None
+
+    @metrics.timed('play_game')
+    def play_game(self, max_turns=None):
+        ''' Play the game, it stops after max_turns turns if given '''
+
+        if not self._words_left():
+            return self._check_winner()
+
+        while max_turns is None or self.turns < max_turns:
+            current_player = self.current_player()
 
             # Show the board
             self.display_board()
 
-            # Prompt the user to give input
-            user_input = click.prompt(
-                "%s play, it\'s your turn: " % current_player.name)
-            user_input = user_input.strip().upper()
+            # Ask the player, or the bot playing for him, to give input
+            agent = current_player.agent or self.player_input
+            user_input = agent.get_input(self, current_player)
 
-            # Process the user input
-            self._process_user_input(user_input, current_player)
-
-            # Check if all passed twice
-            all_pass = True
-            for player in self.players:
-                if player.answers[-2:] != ['PASS', 'PASS']:
-                    all_pass = False
-            if all_pass:
-                return self._check_winner()
-
-            last_player = current_player
+            result = self.play_turn(current_player, user_input)
+            if result is not None:
+                return result
 
         return self._check_winner()
 
-
     def display_results(self, result):
         ''' Given the result, display it '''
+        if self.renderer is not None:
+            self.renderer.close()
         if not isinstance(result, str):
             click.echo()
             click.secho("The game is over and ", nl=False, fg="green")
@@ -292,10 +478,14 @@ class Game(object):
             click.secho("%s " % result.correct_answers, nl=False, fg="blue")
             click.echo()
             click.secho("The final board looks like: ", fg="red")
-            self.display_board()
+            self.display_board(full=True)
         else:
             click.echo()
-            click.secho("Match draw :/ ", fg="green")
+            click.secho("Match draw :/ ", fg="green", nl=False)
+            click.secho("between %s" % ', '.join(
+                self.players[i].name for i in self.standings.leaders()),
+                fg="blue")
             click.echo()
             click.echo("The final board looks like: ")
-            self.display_board()
+            self.display_board(full=True)
+        click.echo(self.standings_line())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import itertools
+
+# (row step, column step) of the eight directions a word can run in
+DIRECTIONS = [
+    (0, 1), (1, 0), (1, 1), (-1, 1),
+    (0, -1), (-1, 0), (-1, -1), (1, -1),
+]
+
+
+def _sign(value):
+    ''' Return -1, 0 or 1 '''
+    return (value > 0) - (value < 0)
+
+
+def segment(row, column, last_row, last_column):
+    ''' Return the straight run of cells from (row, column) to (last_row,
+    last_column), both included, as (row, column, row step, column step,
+    number of cells). None if the cells are not on one of the eight
+    directions '''
+
+    drow = last_row - row
+    dcolumn = last_column - column
+    if drow and dcolumn and abs(drow) != abs(dcolumn):
+        return None
+    return (row, column, _sign(drow), _sign(dcolumn),
+            max(abs(drow), abs(dcolumn)) + 1)
+
+
+def make_path(points):
+    ''' Return the path going through the points, given as row, column
+    pairs, as a tuple of segments. The corner of two segments belongs to the
+    first one. None if the points are not pairs, a part is not straight or
+    a corner is repeated '''
+
+    if len(points) < 2 or len(points) % 2:
+        return None
+    if len(points) == 2:
+        return ((points[0], points[1], 0, 0, 1),)
+
+    path = []
+    for k in range(0, len(points) - 2, 2):
+        part = segment(*points[k:k + 4])
+        if part is None:
+            return None
+        if path:
+            row, column, drow, dcolumn, count = part
+            if count == 1:
+                return None
+            # skip the corner, the segment before ends on it
+            part = (row + drow, column + dcolumn, drow, dcolumn, count - 1)
+        path.append(part)
+    return tuple(path)
+
+
+def shape(path):
+    ''' Return the name of the shape of the path: oneletter, horizontal,
+    vertical, diagonal, L (two segments) or path '''
+
+    if len(path) == 2:
+        return 'L'
+    if len(path) > 2:
+        return 'path'
+    row, column, drow, dcolumn, count = path[0]
+    if count == 1 and not (drow or dcolumn):
+        return 'oneletter'
+    if not drow:
+        return 'horizontal'
+    if not dcolumn:
+        return 'vertical'
+    return 'diagonal'
+
+
+def cell_count(path):
+    ''' Return the number of cells of the path '''
+    return sum(part[4] for part in path)
+
+
+def cells(path):
+    ''' Return the (row, column) of every cell of the path in order '''
+
+    return tuple(
+        (row + drow * k, column + dcolumn * k)
+        for row, column, drow, dcolumn, count in path
+        for k in range(count)
+    )
+
+
+def inside(path, length, breadth):
+    ''' Check if every cell of the path is in a grid of the given size, only
+    the ends of the segments need to be looked at '''
+
+    for row, column, drow, dcolumn, count in path:
+        last_row = row + drow * (count - 1)
+        last_column = column + dcolumn * (count - 1)
+        if not (0 <= row < length and 0 <= last_row < length and
+                0 <= column < breadth and 0 <= last_column < breadth):
+            return False
+    return True
+
+
+def read_words(grid, paths):
+    ''' Return the word along each path, the segments of all the paths are
+    read from the Grid in one go '''
+
+    segments = []
+    for path in paths:
+        segments.extend(path)
+    parts = iter(grid.words(segments))
+
+    words = []
+    for path in paths:
+        if len(path) == 1:
+            words.append(next(parts))
+        else:
+            words.append(''.join(itertools.islice(parts, len(path))))
+    return words
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import sys
+import shutil
+
+import click
+
+# Escape sequences used when repainting only the changed cells
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+SAVE_CURSOR = '\x1b7'
+RESTORE_CURSOR = '\x1b8'
+RESET_SCROLL = '\x1b[r'
+
+# Lines kept free below the board for the prompt and the messages
+MIN_PROMPT_LINES = 4
+
+# Commands of the turn prompt moving the window of the board, see Viewport
+VIEW_COMMANDS = ('/up', '/down', '/left', '/right', '/last')
+
+
+def _supports_ansi(stream):
+    ''' Check if cursor movements can be written to the stream '''
+
+    if sys.platform.startswith('win'):
+        return False
+    if os.environ.get('TERM', 'dumb') == 'dumb':
+        return False
+    isatty = getattr(stream, 'isatty', None)
+    return bool(isatty and isatty())
+
+
+class Viewport(object):
+    ''' The window of a board too big for the terminal, only the cells in
+    it are drawn so a frame costs the same whatever the size of the board.
+    The window is as big as the terminal allows and can be scrolled '''
+
+    def __init__(self):
+        ''' Instantiate the viewport at the top left of the board '''
+        self.top = 0
+        self.left = 0
+        # size of the window, set from the terminal before each frame
+        self.rows = 0
+        self.columns = 0
+        self.length = 0
+        self.breadth = 0
+
+    def resize(self, board, lines, columns):
+        ''' Fit the window to the terminal, the board is shown above a
+        status line and the prompt '''
+        self.length, self.breadth = board.length, board.breadth
+        self.rows = max(1, min(board.length, lines - 3 - MIN_PROMPT_LINES))
+        self.columns = max(1, min(board.breadth, columns // 3))
+        self._clamp()
+
+    def _clamp(self):
+        ''' Keep the window inside the board '''
+        self.top = max(0, min(self.top, self.length - self.rows))
+        self.left = max(0, min(self.left, self.breadth - self.columns))
+
+    def scroll(self, rows, columns):
+        ''' Move the window by the given number of rows and columns '''
+        self.top += rows
+        self.left += columns
+        self._clamp()
+
+    def center(self, row, column):
+        ''' Move the window so the cell is in its middle '''
+        self.top = row - self.rows // 2
+        self.left = column - self.columns // 2
+        self._clamp()
+
+    def status(self):
+        ''' Return the line telling which part of the board is shown '''
+        return 'Rows %s-%s of %s, columns %s-%s of %s (%s)' % (
+            self.top, self.top + self.rows - 1, self.length,
+            self.left, self.left + self.columns - 1, self.breadth,
+            ' '.join(VIEW_COMMANDS))
+
+
+class Renderer(object):
+    ''' Draws the board on the terminal, each frame is built in one buffer
+    and written at once. On ANSI terminals the board is pinned to the top of
+    the screen and only the cells changed since the last frame are redrawn.
+    With a viewport a board bigger than the terminal is shown a window at a
+    time instead of printed whole '''
+
+    def __init__(self, stream=None, ansi=None, viewport=False):
+        ''' Instantiate the renderer '''
+        self.stream = stream or sys.stdout
+        if ansi is None:
+            ansi = _supports_ansi(self.stream)
+        self.ansi = ansi
+        self.viewport = Viewport() if viewport else None
+        # (letter, color) -> styled text of the cell
+        self._glyphs = {}
+        # glyphs of the last frame drawn in place, None when nothing is pinned
+        self._frame = None
+
+    def _glyph(self, letter, color):
+        ''' Return the styled text of a cell from the glyph table '''
+
+        key = (letter, color)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            glyph = click.style(' ' + letter + ' ', fg=color)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def _build(self, board, color, window=None):
+        ''' Return the glyphs of every cell of the board, row by row, or
+        only of the cells in the window if given '''
+
+        if window is not None:
+            # only the letters of the window are read from the grid
+            top, left, columns = window.top, window.left, window.columns
+            rows = board.grid.words([(i, left, 0, 1, columns) for i in
+                                     range(top, top + window.rows)])
+            return [
+                [self._glyph(row[j], color(top + i, left + j))
+                 for j in range(columns)]
+                for i, row in enumerate(rows)
+            ]
+
+        frame = []
+        for i in range(board.length):
+            row = board.grid[i]
+            frame.append([
+                self._glyph(row[j], color(i, j))
+                for j in range(board.breadth)
+            ])
+        return frame
+
+    def _fits(self, board):
+        ''' Check if the board can be pinned above the prompt '''
+
+        columns, lines = shutil.get_terminal_size()
+        return (board.breadth * 3 <= columns and
+                board.length + 2 + MIN_PROMPT_LINES <= lines)
+
+    def _write(self, text, raw=False):
+        ''' Write the frame in one call, raw text is written as it is with
+        the cursor movements in it '''
+
+        if raw:
+            self.stream.write(text)
+        else:
+            click.echo(text, file=self.stream, nl=False)
+        self.stream.flush()
+
+    def render(self, board, color, full=False):
+        ''' Draw the board, color(row, column) gives the color of a cell.
+        With full the whole board is printed inline, like on terminals which
+        do not understand cursor movements, or only its window with a
+        viewport '''
+
+        window = None
+        if self.viewport is not None and not self._fits(board):
+            columns, lines = shutil.get_terminal_size()
+            self.viewport.resize(board, lines, columns)
+            window = self.viewport
+        frame = self._build(board, color, window)
+        status = window.status() if window is not None else ''
+
+        if window is None and (full or not self.ansi or
+                               not self._fits(board)):
+            self.close()
+            self._write(
+                '\n' +
+                ''.join(''.join(row) + '\n' for row in frame) +
+                '\n'
+            )
+            return
+        if full or not self.ansi:
+            self.close()
+            self._write(
+                status + '\n' +
+                ''.join(''.join(row) + '\n' for row in frame) +
+                '\n'
+            )
+            return
+
+        if (self._frame is None or len(self._frame) != len(frame) or
+                len(self._frame[0]) != len(frame[0])):
+            # Pin the board at the top and scroll only the lines below it
+            _, lines = shutil.get_terminal_size()
+            bottom = len(frame) + 3
+            self._write(
+                CLEAR_SCREEN + status + '\n' +
+                ''.join(''.join(row) + '\n' for row in frame) +
+                '\x1b[%d;%dr' % (bottom, lines) +
+                '\x1b[%d;1H' % bottom,
+                raw=True
+            )
+            self._frame = frame
+            return
+
+        buf = []
+        for i, (old, new) in enumerate(zip(self._frame, frame)):
+            for j in range(len(new)):
+                if old[j] is not new[j]:
+                    # rows are 1 based and the board starts on the second
+                    buf.append('\x1b[%d;%dH' % (i + 2, j * 3 + 1))
+                    buf.append(new[j])
+        if status:
+            # the status line is the one above the board
+            buf.append('\x1b[1;1H\x1b[2K' + status)
+        if buf:
+            self._write(SAVE_CURSOR + ''.join(buf) + RESTORE_CURSOR, raw=True)
+        self._frame = frame
+
+    def close(self):
+        ''' Release the top of the screen held by the board '''
+
+        if self._frame is not None:
+            self._write(RESET_SCROLL + '\x1b[%d;1H' %
+                        shutil.get_terminal_size()[1], raw=True)
+            self._frame = None
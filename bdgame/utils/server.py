@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import asyncio
+import itertools
+
+from bdgame.exceptions import BDException
+from bdgame.utils import build_game_conf, parse_puzzle
+from bdgame.utils.game import fresh_conf, prepare_game
+
+# Longest line a client can send
+MAX_LINE = 4096
+# Connections waiting to be accepted, players of many games connect at once
+BACKLOG = 1024
+# Bytes queued to a client not reading them before it is dropped, the lines
+# sent to the others of its room are never waited for
+MAX_BUFFER = 1024 * 1024
+
+HELP = ('Commands: PUZZLES, NEW <puzzle> <nplayers>, JOIN <game> <name>, '
+        'GUESS <word>, PASS, BOARD, SCORES, HELP, QUIT')
+
+
+def load_puzzles(paths):
+    ''' Compile the puzzle files once, games copy them. Returns a dict of
+    puzzle name (file name without extension) -> game configurations '''
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name)
+                         for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+
+    puzzles = {}
+    for path in files:
+        with open(path) as stream:
+            puzzle = parse_puzzle(stream.readlines())
+        glen, gbred = [int(i) for i in puzzle['gsize'].split()]
+        name = os.path.splitext(os.path.basename(path))[0]
+        puzzles[name] = build_game_conf(
+            nplayers=puzzle['nplayers'],
+            players=[],
+            glen=glen,
+            gbred=gbred,
+            grid=puzzle['grid'],
+            wcount=puzzle['wcount'],
+            locations=','.join(puzzle['locations']),
+        )
+    return puzzles
+
+
+class Session(object):
+    ''' A client connected to the server '''
+
+    def __init__(self, writer):
+        ''' Instantiate the session '''
+        self.writer = writer
+        self.room = None
+        self.name = None
+        # index of the player in the game of the room, set when it starts
+        self.seat = None
+        self.dropped = False
+
+    def send(self, line):
+        ''' Queue a line to the client, the room never waits for it. A
+        client letting more than MAX_BUFFER bytes pile up is dropped, it
+        leaves its room like on a disconnect '''
+
+        if self.dropped:
+            return
+        self.writer.write(line.encode('utf-8') + b'\n')
+        transport = self.writer.transport
+        if transport.get_write_buffer_size() > MAX_BUFFER:
+            self.dropped = True
+            transport.abort()
+
+
+class Room(object):
+    ''' One game hosted by the server, with its own copy of the puzzle '''
+
+    def __init__(self, gid, puzzle, conf, nplayers):
+        ''' Instantiate the room '''
+        self.gid = gid
+        self.puzzle = puzzle
+        self.conf = fresh_conf(conf)
+        self.nplayers = nplayers
+        self.sessions = []
+        self.game = None
+        self.result = None
+
+    @property
+    def over(self):
+        ''' Check if the game was played till the end '''
+        return self.result is not None
+
+    def broadcast(self, line):
+        ''' Send the line to everybody in the room '''
+        for session in self.sessions:
+            session.send(line)
+
+    def join(self, session, name):
+        ''' Add the player, the game starts when the room is full '''
+
+        session.room = self
+        session.name = name
+        self.sessions.append(session)
+        session.send('OK JOINED %s %s' % (self.gid, len(self.sessions) - 1))
+        self.broadcast('JOIN %s' % name)
+
+        if len(self.sessions) == self.nplayers:
+            for seat, player in enumerate(self.sessions):
+                player.seat = seat
+            self.conf['players'] = [i.name for i in self.sessions]
+            self.conf['nplayers'] = self.nplayers
+            self.game = prepare_game(
+                self.conf,
+                output=lambda message: self.broadcast('MSG %s' % message),
+            )
+            self.broadcast('START %s' % self.gid)
+            self.broadcast('TURN %s' % self.game.current_player().name)
+
+    def play(self, session, user_input):
+        ''' Play the answer of the player if it is his turn '''
+
+        if self.game is None:
+            session.send('ERR the game has not started')
+            return
+        if self.over:
+            session.send('ERR the game is over')
+            return
+
+        player = self.game.current_player()
+        if self.game.players[session.seat] is not player:
+            session.send('ERR not your turn, %s plays' % player.name)
+            return
+
+        self.result = self.game.play_turn(player, user_input)
+        if self.over:
+            self.broadcast('OVER %s' % self._result_name())
+        else:
+            self.broadcast('TURN %s' % self.game.current_player().name)
+
+    def _result_name(self):
+        ''' Return the name of the winner or draw '''
+        if isinstance(self.result, str):
+            return self.result
+        return self.result.name
+
+    def leave(self, session):
+        ''' Remove the player. He is taken out of the turns of a started
+        game which goes on with the others, the last one left wins it '''
+
+        self.sessions.remove(session)
+        session.room = None
+        if self.game is None or self.over:
+            return
+
+        player = self.game.players[session.seat]
+        playing = self.game.current_player() is player
+        self.game.eliminate(player)
+        self.broadcast('LEFT %s' % session.name)
+        if self.game.order.active == 1:
+            self.result = self.game.current_player()
+            self.broadcast('OVER %s' % self._result_name())
+        elif playing:
+            self.broadcast('TURN %s' % self.game.current_player().name)
+
+    def board_lines(self):
+        ''' Return the rows of the board, found letters are in lower case '''
+
+        board = self.game.board
+        lines = []
+        for i in range(board.length):
+            row = board.grid[i]
+            lines.append(' '.join(
+                row[j].lower() if board.owner(i, j) else row[j]
+                for j in range(board.breadth)
+            ))
+        return lines
+
+
+class GameServer(object):
+    ''' Hosts many games in one process. Clients talk a line based protocol,
+    see HELP. Every game has its own state, nothing is read from or written
+    to the config of the user '''
+
+    def __init__(self, puzzles):
+        ''' Instantiate the server
+        :args puzzles: A dict of puzzle name -> game configurations
+        '''
+        self.puzzles = puzzles
+        self.rooms = {}
+        self._ids = itertools.count(1)
+
+    def _new(self, session, args):
+        ''' NEW <puzzle> <nplayers> '''
+
+        if len(args) != 2 or not args[1].isdigit() or int(args[1]) < 2:
+            session.send('ERR usage: NEW <puzzle> <nplayers>')
+            return
+        if args[0] not in self.puzzles:
+            session.send('ERR no puzzle %s' % args[0])
+            return
+        gid = str(next(self._ids))
+        self.rooms[gid] = Room(gid, args[0], self.puzzles[args[0]],
+                               int(args[1]))
+        session.send('OK GAME %s' % gid)
+
+    def _join(self, session, args):
+        ''' JOIN <game> <name> '''
+
+        if len(args) < 2:
+            session.send('ERR usage: JOIN <game> <name>')
+            return
+        if session.room is not None:
+            session.send('ERR already in game %s' % session.room.gid)
+            return
+        room = self.rooms.get(args[0])
+        if room is None:
+            session.send('ERR no game %s' % args[0])
+            return
+        if room.game is not None:
+            session.send('ERR game %s has started' % room.gid)
+            return
+        name = ' '.join(args[1:])
+        if ',' in name:
+            session.send('ERR , cannot be in a name')
+            return
+        if name in [i.name for i in room.sessions]:
+            session.send('ERR %s is taken in game %s' % (name, room.gid))
+            return
+        room.join(session, name)
+
+    def _forget(self, room):
+        ''' Drop the room once its game is done and everybody left '''
+        if not room.sessions and (room.over or room.game is None):
+            self.rooms.pop(room.gid, None)
+
+    def dispatch(self, session, line):
+        ''' Run one command of the client. Returns False to disconnect '''
+
+        parts = line.split()
+        if not parts:
+            return True
+        command, args = parts[0].upper(), parts[1:]
+        room = session.room
+
+        if command == 'QUIT':
+            return False
+        elif command == 'HELP':
+            session.send('OK %s' % HELP)
+        elif command == 'PUZZLES':
+            session.send('OK %s' % ' '.join(sorted(self.puzzles)))
+        elif command == 'NEW':
+            self._new(session, args)
+        elif command == 'JOIN':
+            self._join(session, args)
+        elif room is None:
+            session.send('ERR join a game first')
+        elif command == 'GUESS' and args:
+            room.play(session, ' '.join(args))
+        elif command == 'PASS':
+            room.play(session, 'PASS')
+        elif command == 'BOARD' and room.game is not None:
+            lines = room.board_lines()
+            session.send('OK BOARD %s' % len(lines))
+            for row in lines:
+                session.send(row)
+        elif command == 'SCORES' and room.game is not None:
+            session.send('OK %s' % ' '.join(
+                '%s:%s' % (player.name.replace(' ', '_'), player.score)
+                for player in room.game.players))
+        else:
+            session.send('ERR unknown command, %s' % HELP)
+        return True
+
+    async def handle(self, reader, writer):
+        ''' Serve one client until it quits or disconnects '''
+
+        session = Session(writer)
+        session.send('OK bdgame %s' % HELP)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # line longer than the limit or a broken connection
+                    break
+                if not line:
+                    break
+                if not self.dispatch(session, line.decode('utf-8', 'replace')):
+                    break
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+        finally:
+            room = session.room
+            if room is not None:
+                room.leave(session)
+                self._forget(room)
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        ''' Start listening, returns the asyncio server '''
+        return await asyncio.start_server(
+            self.handle, host, port, limit=MAX_LINE, backlog=BACKLOG)
+
+    async def serve_forever(self, host='127.0.0.1', port=8765):
+        ''' Serve until cancelled '''
+
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def serve(paths, host='127.0.0.1', port=8765):
+    ''' Load the puzzles and run the server '''
+
+    puzzles = load_puzzles(paths)
+    if not puzzles:
+        raise BDException('No puzzle to serve')
+    asyncio.run(GameServer(puzzles).serve_forever(host, port))
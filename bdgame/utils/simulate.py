@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import time
+import multiprocessing
+
+from bdgame.utils import journal
+from bdgame.utils.bots import make_bot
+from bdgame.utils.game import fresh_conf, prepare_game
+
+# Game conf and bot names of the worker processes, set by _init_worker
+_CONF = None
+_BOTS = None
+
+
+def play_one(conf, bots, seed, max_turns=None, journal_dir=None):
+    ''' Play one headless game between the bots. Returns the index of the
+    winner, or None for a draw, and the number of turns played. The game is
+    journaled in journal_dir if given '''
+
+    conf = fresh_conf(conf)
+    conf['players'] = ['%s %s' % (bot, i + 1) for i, bot in enumerate(bots)]
+    conf['nplayers'] = len(bots)
+
+    game = prepare_game(conf, headless=True)
+    for i, player in enumerate(game.players):
+        player.agent = make_bot(bots[i], seed='%s:%s' % (seed, i))
+    if journal_dir:
+        journal.start(game, journal_dir)
+    try:
+        result = game.play_game(max_turns=max_turns)
+    finally:
+        if game.journal is not None:
+            game.journal.close()
+
+    winner = None
+    for i, player in enumerate(game.players):
+        if player is result:
+            winner = i
+    return winner, game.turns
+
+
+def _init_worker(conf, bots):
+    ''' Keep the conf and the bots in the worker, sent once per process '''
+    global _CONF, _BOTS
+    _CONF = conf
+    _BOTS = bots
+
+
+def _play_task(task):
+    ''' Run play_one in a worker process '''
+    seed, max_turns, journal_dir = task
+    return play_one(_CONF, _BOTS, seed, max_turns, journal_dir)
+
+
+def simulate(conf, bots, games, seed=0, max_turns=None, processes=None,
+             journal_dir=None):
+    ''' Play many games between the bots across a pool of processes and
+    return the aggregated results '''
+
+    if journal_dir and not os.path.isdir(journal_dir):
+        os.makedirs(journal_dir)
+    tasks = [('%s:%s' % (seed, i), max_turns, journal_dir)
+             for i in range(games)]
+    start = time.time()
+    if processes == 1:
+        results = [play_one(conf, bots, *task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(
+            processes, initializer=_init_worker, initargs=(conf, bots))
+        try:
+            chunksize = max(
+                1, games // ((processes or os.cpu_count() or 1) * 4))
+            results = pool.map(_play_task, tasks, chunksize=chunksize)
+        finally:
+            pool.close()
+            pool.join()
+    elapsed = time.time() - start
+
+    wins = [0] * len(bots)
+    draws = 0
+    turns = []
+    for winner, count in results:
+        if winner is None:
+            draws += 1
+        else:
+            wins[winner] += 1
+        turns.append(count)
+
+    return {
+        'games': games,
+        'bots': list(bots),
+        'wins': wins,
+        'win_rates': [float(win) / games if games else 0 for win in wins],
+        'draws': draws,
+        'draw_rate': float(draws) / games if games else 0,
+        'turns_mean': float(sum(turns)) / games if games else 0,
+        'turns_min': min(turns) if turns else 0,
+        'turns_max': max(turns) if turns else 0,
+        'seconds': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0,
+    }
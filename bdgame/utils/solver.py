@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from bdgame.utils.path import DIRECTIONS
+
+# Marks the end of a word in a trie node, the value is the word
+END = None
+
+# (row step, column step) of the eight directions a word can run in
+ALL_DIRECTIONS = DIRECTIONS
+
+# Letter put around the grid, it is in no word so walks stop on it
+BORDER = '#'
+
+
+def build_trie(words, min_length=2, max_length=None):
+    ''' Build a prefix trie of nested dicts from the words, each word is
+    upper cased and words which are not made of letters are skipped '''
+
+    trie = {}
+    for word in words:
+        word = word.strip().upper()
+        if len(word) < min_length or not word.isalpha():
+            continue
+        if max_length is not None and len(word) > max_length:
+            continue
+        node = trie
+        for letter in word:
+            child = node.get(letter)
+            if child is None:
+                child = node[letter] = {}
+            node = child
+        node[END] = word
+    return trie
+
+
+def solve(grid, length, breadth, trie, directions=None):
+    ''' Find every word of the trie in the grid. Yields (word, r1, c1, r2, c2)
+    where (r1, c1) is the first letter and (r2, c2) the last one. A walk stops
+    as soon as the letters read so far are not the prefix of any word '''
+
+    directions = directions or ALL_DIRECTIONS
+
+    # The grid is laid out flat with a border, a step in any direction is a
+    # fixed offset and the walk stops on the border without bounds checks
+    stride = breadth + 2
+    text = [BORDER * stride]
+    for i in range(length):
+        text.append(BORDER + ''.join(grid[i]) + BORDER)
+    text.append(BORDER * stride)
+    text = ''.join(text)
+
+    steps = [(drow, dcolumn, drow * stride + dcolumn)
+             for drow, dcolumn in directions]
+    seen = set()
+    for i in range(length):
+        start = (i + 1) * stride + 1
+        for j in range(breadth):
+            first = trie.get(text[start + j])
+            if first is None:
+                continue
+            if END in first:
+                # one letter words read the same in every direction
+                yield first[END], i, j, i, j
+            for drow, dcolumn, step in steps:
+                node = first
+                pos = start + j + step
+                count = 1
+                while True:
+                    node = node.get(text[pos])
+                    if node is None:
+                        break
+                    if END in node:
+                        ei = i + drow * count
+                        ej = j + dcolumn * count
+                        # palindromes are found again from their other end
+                        key = (node[END], min((i, j), (ei, ej)),
+                               max((i, j), (ei, ej)))
+                        if key not in seen:
+                            seen.add(key)
+                            yield node[END], i, j, ei, ej
+                    pos += step
+                    count += 1
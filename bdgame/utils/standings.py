@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import bisect
+
+
+class _Counts(object):
+    ''' Fenwick tree of the number of players at each score '''
+
+    def __init__(self, size):
+        ''' Instantiate the tree for the scores 0 to size - 1 '''
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, score, delta):
+        ''' Add delta players at the score '''
+        i = score + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def below(self, score):
+        ''' Return the number of players with a score lower than score '''
+        total = 0
+        i = min(score, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class Standings(object):
+    ''' Players by score, kept up to date as the scores change instead of
+    sorted when asked. Players are known by their index, the ones with the
+    same score are in the order they got to it '''
+
+    def __init__(self, count, max_score=0):
+        ''' Instantiate the standings, every player has 0
+        :args count: Number of players
+        :args max_score: Highest score expected, higher ones still work
+        '''
+        self.count = count
+        self.scores = [0] * count
+        # score -> {index: None} of the players having it, in order
+        self._buckets = {0: dict.fromkeys(range(count))} if count else {}
+        # the scores somebody has, lowest first
+        self._distinct = [0] if count else []
+        self._counts = _Counts(max(max_score, 0) + 1)
+        self._counts.add(0, count)
+
+    def _grow(self, score):
+        ''' Make room in the counts for the score '''
+
+        counts = _Counts(max(score + 1, self._counts.size * 2))
+        for value, bucket in self._buckets.items():
+            counts.add(value, len(bucket))
+        self._counts = counts
+
+    def set(self, index, score):
+        ''' Change the score of the player at index '''
+
+        if score < 0:
+            raise ValueError('Scores can not be negative')
+        old = self.scores[index]
+        if old == score:
+            return
+        if score >= self._counts.size:
+            self._grow(score)
+
+        bucket = self._buckets[old]
+        del bucket[index]
+        if not bucket:
+            del self._buckets[old]
+            del self._distinct[bisect.bisect_left(self._distinct, old)]
+        self._counts.add(old, -1)
+
+        bucket = self._buckets.get(score)
+        if bucket is None:
+            bucket = self._buckets[score] = {}
+            bisect.insort(self._distinct, score)
+        bucket[index] = None
+        self._counts.add(score, 1)
+        self.scores[index] = score
+
+    def add(self, index, points=1):
+        ''' Add points to the score of the player at index '''
+        self.set(index, self.scores[index] + points)
+
+    def leaders(self):
+        ''' Return the indexes of all the players tied for first '''
+        if not self._distinct:
+            return []
+        return list(self._buckets[self._distinct[-1]])
+
+    def rank(self, index):
+        ''' Return the rank of the player at index, players with the same
+        score have the same rank '''
+        score = self.scores[index]
+        return self.count - self._counts.below(score + 1) + 1
+
+    def top(self, k):
+        ''' Return the (index, score) of the k first players '''
+
+        top = []
+        for score in reversed(self._distinct):
+            for index in self._buckets[score]:
+                if len(top) == k:
+                    return top
+                top.append((index, score))
+        return top
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import json
+import multiprocessing
+
+from bdgame.utils.journal import JOURNAL_EXT
+
+# Bytes of journal read by one task, big journals are split in chunks
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def _new_puzzle():
+    ''' Return the empty aggregates of one puzzle '''
+    return {
+        'started': 0,
+        'finished': 0,
+        'draws': 0,
+        # value -> number of times it was seen
+        'turns': {},
+        'scores': {},
+        'outcomes': {},
+        # word -> [times found, sum of the turns it was found at, games it
+        # was left in]
+        'words': {},
+    }
+
+
+def _add_counts(into, counts):
+    ''' Add the counts of a value -> count dict into another '''
+    for key, count in counts.items():
+        into[key] = into.get(key, 0) + count
+
+
+class Stats(object):
+    ''' Aggregates of game journals. Any part of the journals can be read
+    into its own Stats, merging them gives the same result as reading all
+    the records in one go '''
+
+    def __init__(self):
+        ''' Instantiate the stats '''
+        self.records = 0
+        self.bad_records = 0
+        # game -> [puzzle, first timestamp, last timestamp, ended,
+        #          turn of the first word found, first word found]
+        self.games = {}
+        # puzzle -> aggregates, see _new_puzzle
+        self.puzzles = {}
+
+    def _puzzle(self, puzzle):
+        ''' Return the aggregates of the puzzle '''
+        stats = self.puzzles.get(puzzle)
+        if stats is None:
+            stats = self.puzzles[puzzle] = _new_puzzle()
+        return stats
+
+    def add_line(self, line):
+        ''' Add one line of a journal '''
+        try:
+            record = json.loads(line)
+            self.add(record)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.bad_records += 1
+
+    def add(self, record):
+        ''' Add one record of a journal '''
+
+        kind = record['t']
+        puzzle = self._puzzle(record['puzzle'])
+        ts = record['ts']
+        game = self.games.get(record['game'])
+        if game is None:
+            game = self.games[record['game']] = [
+                record['puzzle'], ts, ts, False, None, None]
+        else:
+            game[1] = min(game[1], ts)
+            game[2] = max(game[2], ts)
+
+        if kind == 'move':
+            outcomes = puzzle['outcomes']
+            outcome = record['outcome']
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            if outcome == 'correct':
+                word, turn = record['input'], record['turn']
+                found = puzzle['words'].get(word)
+                if found is None:
+                    found = puzzle['words'][word] = [0, 0, 0]
+                found[0] += 1
+                found[1] += turn
+                if game[4] is None or turn < game[4]:
+                    game[4] = turn
+                    game[5] = word
+        elif kind == 'start':
+            puzzle['started'] += 1
+        elif kind == 'end':
+            game[3] = True
+            puzzle['finished'] += 1
+            if record['winner'] == 'draw':
+                puzzle['draws'] += 1
+            _add_counts(puzzle['turns'], {record['turns']: 1})
+            for score in record['scores'].values():
+                _add_counts(puzzle['scores'], {score: 1})
+            for word in record['left']:
+                left = puzzle['words'].get(word)
+                if left is None:
+                    left = puzzle['words'][word] = [0, 0, 0]
+                left[2] += 1
+        self.records += 1
+
+    def merge(self, other):
+        ''' Add the aggregates of other Stats into these '''
+
+        self.records += other.records
+        self.bad_records += other.bad_records
+
+        for game_id, other_game in other.games.items():
+            game = self.games.get(game_id)
+            if game is None:
+                self.games[game_id] = list(other_game)
+                continue
+            game[1] = min(game[1], other_game[1])
+            game[2] = max(game[2], other_game[2])
+            game[3] = game[3] or other_game[3]
+            if other_game[4] is not None and (
+                    game[4] is None or other_game[4] < game[4]):
+                game[4], game[5] = other_game[4], other_game[5]
+
+        for puzzle_id, other_puzzle in other.puzzles.items():
+            puzzle = self._puzzle(puzzle_id)
+            for key in ('started', 'finished', 'draws'):
+                puzzle[key] += other_puzzle[key]
+            for key in ('turns', 'scores', 'outcomes'):
+                _add_counts(puzzle[key], other_puzzle[key])
+            for word, other_word in other_puzzle['words'].items():
+                found = puzzle['words'].get(word)
+                if found is None:
+                    puzzle['words'][word] = list(other_word)
+                else:
+                    for i in range(3):
+                        found[i] += other_word[i]
+        return self
+
+    def report(self, top=10):
+        ''' Return the per puzzle and per word report as plain data, top is
+        the length of the lists of words found first and never found '''
+
+        firsts = {}
+        seconds = {}
+        for puzzle, start, last, ended, _, word in self.games.values():
+            if word is not None:
+                counts = firsts.setdefault(puzzle, {})
+                counts[word] = counts.get(word, 0) + 1
+            if ended:
+                seconds.setdefault(puzzle, []).append(last - start)
+
+        puzzles = {}
+        for puzzle_id, puzzle in sorted(self.puzzles.items()):
+            turns = puzzle['turns']
+            finished = puzzle['finished']
+            durations = seconds.get(puzzle_id, [])
+            first_counts = firsts.get(puzzle_id, {})
+
+            words = {}
+            for word, (found, turn_sum, left) in sorted(
+                    puzzle['words'].items()):
+                words[word] = {
+                    'found': found,
+                    'found_first': first_counts.get(word, 0),
+                    'mean_turn_found': float(turn_sum) / found if found
+                    else None,
+                    'left': left,
+                }
+
+            puzzles[puzzle_id] = {
+                'games': puzzle['started'],
+                'finished': finished,
+                'draws': puzzle['draws'],
+                'turns_mean': float(sum(k * v for k, v in turns.items())) /
+                finished if finished else 0,
+                'turns_min': min(turns) if turns else 0,
+                'turns_max': max(turns) if turns else 0,
+                'seconds_mean': sum(durations) / len(durations)
+                if durations else 0,
+                'seconds_max': max(durations) if durations else 0,
+                'scores': dict((str(k), v) for k, v in sorted(
+                    puzzle['scores'].items())),
+                'outcomes': puzzle['outcomes'],
+                'found_first': sorted(
+                    first_counts, key=lambda w: (-first_counts[w], w))[:top],
+                'never_found': sorted(
+                    word for word, value in words.items()
+                    if not value['found'] and value['left'])[:top],
+                'words': words,
+            }
+
+        return {
+            'records': self.records,
+            'bad_records': self.bad_records,
+            'games': len(self.games),
+            'puzzles': puzzles,
+        }
+
+
+def journal_files(paths):
+    ''' Return the journals in the paths, directories are walked '''
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(JOURNAL_EXT))
+        else:
+            files.append(path)
+    return files
+
+
+def chunks(files, chunk_size=CHUNK_SIZE):
+    ''' Return lists of (path, start, end) byte ranges covering the files,
+    each list is about chunk_size bytes. Big files are split, small ones
+    are read together '''
+
+    tasks = []
+    batch = []
+    batch_size = 0
+    for path in files:
+        size = os.path.getsize(path)
+        for start in range(0, size, chunk_size):
+            end = min(size, start + chunk_size)
+            batch.append((path, start, end))
+            batch_size += end - start
+            if batch_size >= chunk_size:
+                tasks.append(batch)
+                batch = []
+                batch_size = 0
+    if batch:
+        tasks.append(batch)
+    return tasks
+
+
+def read_chunk(task, stats=None):
+    ''' Return the Stats of the lines starting inside the byte range. A line
+    crossing the start belongs to the chunk before '''
+
+    path, start, end = task
+    if stats is None:
+        stats = Stats()
+    with open(path, 'rb') as stream:
+        if start:
+            stream.seek(start - 1)
+            if stream.read(1) != b'\n':
+                stream.readline()
+        position = stream.tell()
+        while position < end:
+            line = stream.readline()
+            if not line:
+                break
+            position += len(line)
+            if not line.endswith(b'\n'):
+                # the last record of a game which was killed
+                stats.bad_records += 1
+                break
+            stats.add_line(line)
+    return stats
+
+
+def read_chunks(tasks):
+    ''' Return the Stats of the byte ranges '''
+
+    stats = Stats()
+    for task in tasks:
+        read_chunk(task, stats)
+    return stats
+
+
+def stats(paths, processes=None, chunk_size=CHUNK_SIZE):
+    ''' Read the journals in the paths across a pool of processes and
+    return the merged Stats. Only the aggregates of a chunk are kept in
+    memory, never its records '''
+
+    tasks = chunks(journal_files(paths), chunk_size)
+    total = Stats()
+    if processes == 1 or len(tasks) <= 1:
+        for task in tasks:
+            total.merge(read_chunks(task))
+        return total
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for part in pool.imap_unordered(read_chunks, tasks):
+            total.merge(part)
+    finally:
+        pool.close()
+        pool.join()
+    return total
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from bdgame.exceptions import BDException, ItemNotFound
+from bdgame.utils import grid as grids
+from bdgame.utils.location import Location, split_locations
+from bdgame.utils.words import WordIndex
+
+# Environment variable holding the path of the database
+STORE_ENV = 'BDGAME_STORE'
+
+# Seconds a writer waits for another one before giving up
+BUSY_TIMEOUT = 10
+
+# Kept in the user_version of the database, the tables are made when it is
+# lower
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    length INTEGER NOT NULL,
+    breadth INTEGER NOT NULL,
+    grid BLOB NOT NULL,
+    words TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS locations (
+    puzzle_id INTEGER NOT NULL REFERENCES puzzles (id),
+    idx INTEGER NOT NULL,
+    points TEXT NOT NULL,
+    PRIMARY KEY (puzzle_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    puzzle_id INTEGER NOT NULL REFERENCES puzzles (id),
+    wcount INTEGER NOT NULL,
+    created REAL NOT NULL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS games_puzzle ON games (puzzle_id);
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL REFERENCES games (id),
+    seat INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (game_id, seat)
+) WITHOUT ROWID;
+'''
+
+
+def store_path():
+    ''' Return the path of the database, from the environment or next to
+    the config file '''
+
+    from bdgame.utils import cfg_path
+    return os.environ.get(STORE_ENV) or cfg_path() + '.db'
+
+
+def connect(path=None):
+    ''' Open the database, creating the tables if needed. The database is
+    in WAL mode so readers never wait for each other or for a writer '''
+
+    conn = sqlite3.connect(path or store_path(), timeout=BUSY_TIMEOUT)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version < SCHEMA_VERSION:
+        _create(conn)
+    return conn
+
+
+def _create(conn):
+    ''' Make the tables. The version is read again once no other writer can
+    change it, two games opening a new database do not both make them '''
+
+    isolation_level = conn.isolation_level
+    # executescript would commit the transaction, the statements are run
+    # one by one inside it instead
+    conn.isolation_level = None
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < SCHEMA_VERSION:
+                for statement in SCHEMA.split(';'):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+    finally:
+        conn.isolation_level = isolation_level
+
+
+def game_exists(game_id, path=None):
+    ''' Check if the game is in the store '''
+
+    conn = connect(path)
+    try:
+        row = conn.execute('SELECT 1 FROM games WHERE id = ?',
+                           (game_id,)).fetchone()
+    finally:
+        conn.close()
+    return row is not None
+
+
+def _puzzle_key(grid, locations):
+    ''' Return the key of a puzzle, the same grid and locations are stored
+    once '''
+
+    digest = hashlib.sha256(b'%d %d ' % (grid.length, grid.breadth))
+    digest.update(grid.tobytes())
+    for location in locations:
+        digest.update(str(location).encode('ascii') + b',')
+    return digest.hexdigest()
+
+
+def _compile_words(grid, locations):
+    ''' Return the words of the puzzle as json, each word with the indexes
+    of its locations, read once when the puzzle is stored '''
+
+    from bdgame.utils import _get_words
+
+    words = _get_words(grid, locations)
+    indexes = dict((location, i) for i, location in enumerate(locations))
+    return json.dumps(dict(
+        (word, [indexes[i] for i in words.locations(word)])
+        for word in words
+    ), separators=(',', ':'))
+
+
+def _load_words(text, locations):
+    ''' Return the WordIndex of the words returned by _compile_words '''
+
+    words = WordIndex()
+    for word, indexes in json.loads(text).items():
+        words.extend(word, [locations[i] for i in indexes])
+    return words
+
+
+def save_game(game_id, nplayers, players, gsize, grid, wcount, locations,
+              path=None):
+    ''' Store the game under the id, it replaces a game of the same id. The
+    arguments are the ones of create_config, the grid and locations are
+    checked and stored parsed. The grid may be a Grid already parsed '''
+
+    if not game_id:
+        raise BDException('The game needs an id')
+    if isinstance(players, str):
+        players = players.split(',')
+    if len(players) != int(nplayers):
+        raise BDException('Names of all the players are not given')
+
+    if not isinstance(grid, grids.Grid):
+        grid = grids.read_grid(grid.splitlines())
+    if gsize.split() != [str(grid.length), str(grid.breadth)]:
+        raise BDException('Grid does not match with grid size %s' % gsize)
+    locations = split_locations(locations)
+    for location in locations:
+        if not location.shape:
+            raise BDException('Location %s is not fitting any shape' % (
+                location,))
+        location.check_bounds(grid.length, grid.breadth)
+
+    key = _puzzle_key(grid, locations)
+    conn = connect(path)
+    try:
+        with conn:
+            row = conn.execute('SELECT id FROM puzzles WHERE key = ?',
+                               (key,)).fetchone()
+            if row is None:
+                puzzle_id = conn.execute(
+                    'INSERT INTO puzzles (key, length, breadth, grid, words) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, grid.length, grid.breadth,
+                     sqlite3.Binary(grid.tobytes()),
+                     _compile_words(grid, locations)),
+                ).lastrowid
+                conn.executemany(
+                    'INSERT INTO locations (puzzle_id, idx, points) '
+                    'VALUES (?, ?, ?)',
+                    [(puzzle_id, i, str(location))
+                     for i, location in enumerate(locations)],
+                )
+            else:
+                puzzle_id = row[0]
+
+            conn.execute('DELETE FROM players WHERE game_id = ?', (game_id,))
+            conn.execute('DELETE FROM games WHERE id = ?', (game_id,))
+            conn.execute(
+                'INSERT INTO games (id, puzzle_id, wcount, created) '
+                'VALUES (?, ?, ?, ?)',
+                (game_id, puzzle_id, int(wcount), time.time()),
+            )
+            conn.executemany(
+                'INSERT INTO players (game_id, seat, name) VALUES (?, ?, ?)',
+                [(game_id, i, name) for i, name in enumerate(players)],
+            )
+    finally:
+        conn.close()
+
+
+def load_game(game_id, path=None, backend=None):
+    ''' Return the game configurations of the stored game, like
+    load_game_conf does for the config file. Only the rows of the game are
+    read, through the primary keys, the words are the ones compiled when
+    the puzzle was stored '''
+
+    conn = connect(path)
+    try:
+        row = conn.execute(
+            'SELECT games.wcount, puzzles.id, puzzles.length, '
+            'puzzles.breadth, puzzles.grid, puzzles.words FROM games '
+            'JOIN puzzles ON puzzles.id = games.puzzle_id '
+            'WHERE games.id = ?', (game_id,)).fetchone()
+        if row is None:
+            raise ItemNotFound('No game %s in %s' % (
+                game_id, path or store_path()))
+        wcount, puzzle_id, length, breadth, data, words = row
+        players = [name for name, in conn.execute(
+            'SELECT name FROM players WHERE game_id = ? ORDER BY seat',
+            (game_id,))]
+        locations = [Location(points.split()) for points, in conn.execute(
+            'SELECT points FROM locations WHERE puzzle_id = ? ORDER BY idx',
+            (puzzle_id,))]
+    finally:
+        conn.close()
+
+    return {
+        'nplayers': len(players),
+        'players': players,
+        'grid': grids.from_bytes(data, length, breadth, backend=backend),
+        'glen': length,
+        'gbred': breadth,
+        'wcount': wcount,
+        'words': _load_words(words, locations),
+        'locations': locations,
+    }
+
+
+def save_result(game_id, players, result, path=None):
+    ''' Store the scores of the players and the result of the game '''
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                'UPDATE players SET score = ? WHERE game_id = ? AND seat = ?',
+                [(player.score, game_id, i)
+                 for i, player in enumerate(players)],
+            )
+            conn.execute(
+                'UPDATE games SET result = ? WHERE id = ?',
+                (result if isinstance(result, str) else result.name,
+                 game_id),
+            )
+    finally:
+        conn.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import random
+
+ORDERS = ('round-robin', 'random-start')
+
+
+class TurnOrder(object):
+    ''' Decides who plays next by the index of the player. The players
+    still in the game form a ring, moving to the next one or taking a
+    player out are O(1) '''
+
+    def __init__(self, count):
+        ''' Instantiate the order
+        :args count: Number of players
+        '''
+        self.count = count
+        self.active = count
+        self._first = 0
+        self._next = [(i + 1) % count for i in range(count)]
+        self._previous = [(i - 1) % count for i in range(count)]
+        self._eliminated = [False] * count
+
+    def first(self):
+        ''' Return the index of the player starting the game, the one after
+        if he left before playing '''
+        if self._eliminated[self._first]:
+            return self._next[self._first]
+        return self._first
+
+    def start_with(self, index):
+        ''' Make the player at index start the game, a resumed game starts
+        with the player the journal has '''
+        self._first = index
+
+    def next(self, index):
+        ''' Return the index of the player playing after the one at index,
+        which may have just been eliminated '''
+        return self._next[index]
+
+    def is_eliminated(self, index):
+        ''' Check if the player at index is out of the game '''
+        return self._eliminated[index]
+
+    def eliminate(self, index):
+        ''' Take the player at index out of the turns, the last player can
+        not be taken out '''
+
+        if self._eliminated[index] or self.active == 1:
+            return
+        previous, following = self._previous[index], self._next[index]
+        self._next[previous] = following
+        self._previous[following] = previous
+        self._eliminated[index] = True
+        self.active -= 1
+
+
+class RoundRobin(TurnOrder):
+    ''' The players play one after the other, the first one starts '''
+
+
+class RandomStart(TurnOrder):
+    ''' The players play one after the other, a random one starts '''
+
+    def __init__(self, count, seed=None):
+        ''' Instantiate the order '''
+        super(RandomStart, self).__init__(count)
+        self.start_with(random.Random(seed).randrange(count))
+
+
+def make_order(name, count, seed=None):
+    ''' Make the turn order from its name, see ORDERS '''
+
+    if name == 'round-robin':
+        return RoundRobin(count)
+    if name == 'random-start':
+        return RandomStart(count, seed=seed)
+    raise ValueError('Unknown turn order %s, use one of %s' % (
+        name, ', '.join(ORDERS)))
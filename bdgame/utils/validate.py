@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import multiprocessing
+
+from bdgame.exceptions import BDException
+from bdgame.utils import BLACKLISTED_WORDS, parse_puzzle
+from bdgame.utils import grid as grids
+from bdgame.utils.location import Location
+from bdgame.utils.path import read_words
+
+# Files of the directories which are taken as puzzles
+PUZZLE_EXT = '.txt'
+
+# Most files a worker checks at a time, the results come out in order so
+# small batches keep them flowing
+CHUNK_FILES = 32
+
+
+def puzzle_files(paths):
+    ''' Return the puzzles in the paths, directories are walked and only
+    their files ending in PUZZLE_EXT are taken '''
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(PUZZLE_EXT))
+        else:
+            files.append(path)
+    return files
+
+
+def _error(check, message, location=None):
+    ''' Return one problem of a puzzle, location is the index of the
+    location it is about '''
+
+    error = {'check': check, 'message': message}
+    if location is not None:
+        error['location'] = location
+    return error
+
+
+def _overlaps(locations):
+    ''' Return the problems of the locations covering the same cells. Words
+    may cross on one cell, a location sharing more with another one hides
+    part of it '''
+
+    errors = []
+    # (row, column) -> indexes of the locations covering the cell
+    owners = {}
+    for index, location in enumerate(locations):
+        if location is None:
+            continue
+        shared = {}
+        for cell in location.coordinates:
+            for other in owners.get(cell, ()):
+                shared[other] = shared.get(other, 0) + 1
+            owners.setdefault(cell, []).append(index)
+        for other, count in sorted(shared.items()):
+            if locations[other] == location:
+                errors.append(_error(
+                    'overlap', 'Location %s is the same as location %s' % (
+                        index, other), index))
+            elif count > 1:
+                errors.append(_error(
+                    'overlap', 'Location %s shares %s cells with location %s'
+                    % (index, count, other), index))
+    return errors
+
+
+def check_puzzle(lines):
+    ''' Check the lines of a puzzle in the play_input.txt format. Returns
+    the list of its problems, each one a dict with the check that failed
+    and a message, empty if the puzzle is good '''
+
+    try:
+        puzzle = parse_puzzle(lines)
+    except (BDException, ValueError) as err:
+        return [_error('format', getattr(err, 'msg', str(err)))]
+
+    errors = []
+    if puzzle['nplayers'] < 1:
+        errors.append(_error('format', 'The puzzle needs at least a player'))
+
+    grid = None
+    try:
+        grid = grids.read_grid(puzzle['grid'].splitlines(True))
+    except BDException as err:
+        errors.append(_error('grid', err.msg))
+
+    # the locations which are sound enough for the words to be read
+    locations = []
+    for index, text in enumerate(puzzle['locations']):
+        try:
+            location = Location(text.split())
+        except BDException as err:
+            errors.append(_error('location', err.msg, index))
+            locations.append(None)
+            continue
+        if not location.shape:
+            errors.append(_error(
+                'shape', 'Location %s is not fitting any shape' % (
+                    location,), index))
+            location = None
+        elif grid is not None:
+            try:
+                location.check_bounds(grid.length, grid.breadth)
+            except BDException as err:
+                errors.append(_error('bounds', err.msg, index))
+                location = None
+        locations.append(location)
+
+    errors.extend(_overlaps(locations))
+
+    if grid is not None:
+        readable = [(index, location) for index, location in
+                    enumerate(locations) if location is not None]
+        words = read_words(grid, [i.path for _, i in readable])
+        for (index, _), word in zip(readable, words):
+            if word in BLACKLISTED_WORDS:
+                errors.append(_error(
+                    'blacklisted', '%s is blacklisted' % word, index))
+    return errors
+
+
+def validate_file(path):
+    ''' Check the puzzle in the file. Returns the result line of the file:
+    its path, if it is valid and its problems '''
+
+    try:
+        with open(path) as stream:
+            errors = check_puzzle(stream.readlines())
+    except (OSError, UnicodeDecodeError) as err:
+        errors = [_error('file', str(err))]
+    return {'path': path, 'valid': not errors, 'errors': errors}
+
+
+def validate(files, processes=None):
+    ''' Check the puzzle files across a pool of processes. Yields the result
+    of each file, see validate_file, in the order of the files '''
+
+    if processes == 1 or len(files) <= 1:
+        for path in files:
+            yield validate_file(path)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        chunksize = max(1, min(CHUNK_FILES, len(files) // (
+            (processes or os.cpu_count() or 1) * 4)))
+        for result in pool.imap(validate_file, files, chunksize=chunksize):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+class WordIndex(object):
+    ''' The words of a puzzle and the locations they occur at. An
+    occurrence is claimed when a player finds the word, claiming one and
+    counting the words left are O(1) however many words there are '''
+
+    __slots__ = ('_words', 'remaining', 'total')
+
+    def __init__(self):
+        ''' Instantiate the empty index '''
+        # word -> [locations of every occurrence, number of them not claimed
+        #          yet, occurrences not claimed yet with the next one to
+        #          claim last, position of each occurrence in that list or
+        #          None once claimed]. The last two are only made when an
+        #          occurrence is claimed out of turn, until then the ones not
+        #          claimed are the first ones of the locations
+        self._words = {}
+        # occurrences not claimed yet, of all the words
+        self.remaining = 0
+        self.total = 0
+
+    def __contains__(self, word):
+        ''' Check if the word is in the puzzle, claimed or not '''
+        return word in self._words
+
+    def __iter__(self):
+        ''' Iterate over the words, in the order they were added '''
+        return iter(self._words)
+
+    def __len__(self):
+        ''' Return the number of different words '''
+        return len(self._words)
+
+    def add(self, word, location):
+        ''' Add an occurrence of the word at the location, the last one
+        added is claimed first '''
+        self.extend(word, [location])
+
+    def extend(self, word, locations):
+        ''' Add occurrences of the word at each of the locations '''
+
+        entry = self._words.get(word)
+        if entry is None:
+            self._words[word] = [list(locations), len(locations), None, None]
+        else:
+            if entry[2] is None and entry[1] != len(entry[0]):
+                self._split(entry)
+            for location in locations:
+                if entry[2] is not None:
+                    entry[3].append(len(entry[2]))
+                    entry[2].append(len(entry[0]))
+                entry[0].append(location)
+            entry[1] += len(locations)
+        self.remaining += len(locations)
+        self.total += len(locations)
+
+    def remove(self, word):
+        ''' Take the word and all its occurrences out of the index '''
+        entry = self._words.pop(word)
+        self.remaining -= entry[1]
+        self.total -= len(entry[0])
+
+    @staticmethod
+    def _split(entry):
+        ''' Make the list of occurrences not claimed of the entry and their
+        positions in it '''
+        count = entry[1]
+        entry[2] = list(range(count))
+        entry[3] = list(range(count)) + [None] * (len(entry[0]) - count)
+
+    def locations(self, word):
+        ''' Return the locations of every occurrence of the word '''
+        return self._words[word][0]
+
+    def count(self, word):
+        ''' Return the number of occurrences of the word not claimed yet, 0
+        if it is not in the puzzle '''
+        entry = self._words.get(word)
+        return entry[1] if entry is not None else 0
+
+    def unclaimed(self, word):
+        ''' Return the locations of the word not claimed yet, the next one
+        to be claimed last '''
+        locations, count, unclaimed, _ = self._words[word]
+        if unclaimed is None:
+            return locations[:count]
+        return [locations[i] for i in unclaimed]
+
+    def claimed(self, word):
+        ''' Return the locations of the word claimed already '''
+        locations, count, unclaimed, positions = self._words[word]
+        if unclaimed is None:
+            return locations[count:]
+        return [location for location, position in zip(locations, positions)
+                if position is None]
+
+    def claim(self, word, occurrence=None):
+        ''' Claim an occurrence of the word, the next one if not given, and
+        return its location. Returns None if the word is not in the puzzle
+        or the occurrence is claimed already '''
+
+        entry = self._words.get(word)
+        if entry is None or not entry[1]:
+            return None
+        locations, count, unclaimed, positions = entry
+        if unclaimed is None:
+            if occurrence is None or occurrence == count - 1:
+                occurrence = count - 1
+            elif occurrence >= count:
+                return None
+            else:
+                self._split(entry)
+                locations, count, unclaimed, positions = entry
+
+        if unclaimed is not None:
+            if occurrence is None:
+                occurrence = unclaimed.pop()
+            else:
+                position = positions[occurrence]
+                if position is None:
+                    return None
+                # the last one takes the place of the claimed one
+                last = unclaimed.pop()
+                if last != occurrence:
+                    unclaimed[position] = last
+                    positions[last] = position
+            positions[occurrence] = None
+
+        entry[1] = count - 1
+        self.remaining -= 1
+        return locations[occurrence]
+
+    def restore(self, word, unclaimed):
+        ''' Set the locations of the word not claimed yet, as returned by
+        unclaimed. A location there twice stands for two occurrences at it '''
+
+        entry = self._words[word]
+        # location -> its occurrences, the first one last
+        occurrences = {}
+        for i in reversed(range(len(entry[0]))):
+            occurrences.setdefault(entry[0][i], []).append(i)
+        new = [occurrences[location].pop() for location in unclaimed]
+        self.remaining += len(new) - entry[1]
+        entry[1] = len(new)
+        if new == list(range(len(new))):
+            entry[2] = entry[3] = None
+            return
+        positions = [None] * len(entry[0])
+        for position, occurrence in enumerate(new):
+            positions[occurrence] = position
+        entry[2] = new
+        entry[3] = positions
+
+    def copy(self):
+        ''' Return a copy of the index which can be claimed and extended on
+        its own, only the Location objects are shared '''
+
+        index = WordIndex()
+        index._words = dict(
+            (word, [list(locations), count, unclaimed, positions]
+             if unclaimed is None else
+             [list(locations), count, list(unclaimed), list(positions)])
+            for word, (locations, count, unclaimed, positions)
+            in self._words.items()
+        )
+        index.remaining = self.remaining
+        index.total = self.total
+        return index
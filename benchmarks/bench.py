@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+''' Benchmarks of the hot paths of bdgame over synthetic puzzles.
+
+    python benchmarks/bench.py run --out results.json
+    python benchmarks/bench.py compare base.json results.json --threshold 0.2
+'''
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import subprocess
+
+import click
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+
+import bdgame.utils as utils  # noqa: E402
+from bdgame.utils import cache, config  # noqa: E402
+from bdgame.utils.bots import PlayerInput  # noqa: E402
+from bdgame.utils.game import fresh_conf, prepare_game  # noqa: E402
+from bdgame.utils.render import Renderer  # noqa: E402
+
+# (grid size, number of answers) of the synthetic puzzles
+SIZES = [
+    (15, 4),
+    (60, 200),
+    (300, 2000),
+    (1000, 10000),
+    (2000, 50000),
+]
+QUICK_SIZES = SIZES[:3]
+
+# Turns played by the scripted game, every turn renders the whole board
+SCRIPTED_TURNS = 10
+# Most runs of the scripted game, it is the slowest benchmark by far
+SCRIPTED_REPEAT = 3
+
+
+def synthetic_puzzle(size, answers, seed=0):
+    ''' Return the grid text and the locations of a random puzzle, every
+    location is a playable shape inside the grid '''
+
+    rng = random.Random('%s:%s:%s' % (seed, size, answers))
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    grid = '\n'.join(
+        ' '.join(rng.choice(letters) for _ in range(size))
+        for _ in range(size)
+    ) + '\n'
+
+    locations = set()
+    longest = min(size, 10)
+    while len(locations) < answers:
+        count = rng.randint(2, longest)
+        row = rng.randrange(size - count + 1)
+        column = rng.randrange(size - count + 1)
+        shape = rng.randrange(3)
+        if shape == 0:
+            location = (row, column, row, column + count - 1)
+        elif shape == 1:
+            location = (row, column, row + count - 1, column)
+        else:
+            location = (row, column, row + count - 1, column + count - 1)
+        locations.add('%s %s %s %s' % location)
+    return grid, sorted(locations)
+
+
+def write_config(path, size, grid, locations):
+    ''' Write the puzzle as a .bdgame file '''
+
+    config.write(path, {
+        'nplayers': 2,
+        'players': 'player 1,player 2',
+        'wcount': len(locations),
+        'locations': ','.join(locations),
+        'gsize': '%s %s' % (size, size),
+        'grid': grid,
+    })
+
+
+class ScriptedInput(PlayerInput):
+    ''' Answers from a fixed list, then passes '''
+
+    def __init__(self, answers):
+        ''' Instantiate the input '''
+        self.answers = list(answers)
+
+    def get_input(self, game, player):
+        ''' Return the next answer of the script '''
+        if self.answers:
+            return self.answers.pop(0)
+        return 'PASS'
+
+
+def timeit(func, repeat, setup=None):
+    ''' Run func repeat times and return the min and median seconds '''
+
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'min': times[0], 'median': times[len(times) // 2],
+            'repeat': repeat}
+
+
+def bench_size(workdir, size, answers, repeat):
+    ''' Run every benchmark on one synthetic puzzle '''
+
+    grid_text, location_text = synthetic_puzzle(size, answers)
+    path = os.path.join(workdir, '.bdgame-%s-%s' % (size, answers))
+    write_config(path, size, grid_text, location_text)
+    compiled = cache.cache_path(path)
+
+    def drop_cache():
+        ''' Make the next load compile the puzzle again '''
+        config.forget(path)
+        if os.path.exists(compiled):
+            os.remove(compiled)
+
+    results = {}
+    results['load_game_conf.cold'] = timeit(
+        lambda _: utils.load_game_conf(path), repeat, setup=drop_cache)
+    conf = utils.load_game_conf(path)
+    results['load_game_conf.warm'] = timeit(
+        lambda _: utils.load_game_conf(path), repeat)
+
+    grid = conf['grid']
+    locations = conf['locations']
+    results['_get_words'] = timeit(
+        lambda _: utils._get_words(grid, locations), repeat)
+    results['recognize_shape'] = timeit(
+        lambda _: [utils.recognize_shape(i) for i in locations], repeat)
+    shapes = [utils.recognize_shape(i) for i in locations]
+    results['trav_grid'] = timeit(
+        lambda _: [utils.trav_grid(grid, i, shape=j, select='word')
+                   for i, j in zip(locations, shapes)], repeat)
+
+    devnull = open(os.devnull, 'w')
+    try:
+        def new_game():
+            ''' A game with a tenth of the words found, drawn to nowhere '''
+            game = prepare_game(fresh_conf(conf))
+            game.renderer = Renderer(stream=devnull, ansi=False)
+            words = sorted(game.conf['words'])
+            for word in words[:len(words) // 10]:
+                game._process_correct_input(word, game.players[0])
+            return game
+
+        results['display_board'] = timeit(
+            lambda game: game.display_board(), repeat, setup=new_game)
+
+        def scripted_game():
+            ''' A game whose players answer from a script '''
+            game = prepare_game(fresh_conf(conf))
+            game.renderer = Renderer(stream=devnull, ansi=False)
+            game.output = lambda message: None
+            words = sorted(game.conf['words'])
+            script = []
+            for i, word in enumerate(words[:SCRIPTED_TURNS]):
+                script.append(word if i % 3 else 'WRONG')
+            game.player_input = ScriptedInput(script)
+            return game
+
+        results['play_game'] = timeit(
+            lambda game: game.play_game(max_turns=SCRIPTED_TURNS),
+            min(repeat, SCRIPTED_REPEAT), setup=scripted_game)
+    finally:
+        devnull.close()
+
+    return results
+
+
+def _commit():
+    ''' Return the git commit of the tree, if any '''
+
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.group()
+def bench():
+    ''' Benchmarks of bdgame '''
+    pass
+
+
+@bench.command()
+@click.option('--out', default='-', help="File to write the json results to")
+@click.option('--quick', is_flag=True, default=False,
+              help="Only run the small puzzles")
+@click.option('--size', 'sizes', multiple=True,
+              help="Grid size and answers like 300:2000, can be repeated")
+@click.option('--repeat', default=5, type=int,
+              help="Runs of every benchmark, the fastest one counts")
+def run(out, quick, sizes, repeat):
+    ''' Run the benchmarks and write the results as json '''
+
+    if sizes:
+        sizes = [tuple(int(i) for i in size.split(':')) for size in sizes]
+    else:
+        sizes = QUICK_SIZES if quick else SIZES
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bdgame-bench-')
+    try:
+        for size, answers in sizes:
+            click.echo('%sx%s with %s answers' % (size, size, answers),
+                       err=True)
+            for name, timing in bench_size(
+                    workdir, size, answers, repeat).items():
+                key = '%s[%sx%s/%s]' % (name, size, size, answers)
+                results[key] = timing
+                click.echo('  %-24s %.6fs' % (name, timing['min']), err=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with click.open_file(out, 'w') as stream:
+        json.dump(report, stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+
+@bench.command()
+@click.argument('baseline', type=click.File('r'))
+@click.argument('current', type=click.File('r'))
+@click.option('--threshold', default=0.2, type=float,
+              help="Allowed slowdown, 0.2 fails past 20% slower")
+def compare(baseline, current, threshold):
+    ''' Compare two result files, fail if a benchmark regressed '''
+
+    baseline = json.load(baseline)['results']
+    current = json.load(current)['results']
+
+    regressed = []
+    for key in sorted(set(baseline) & set(current)):
+        before, after = baseline[key]['min'], current[key]['min']
+        ratio = after / before if before else 1.0
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  REGRESSED'
+            regressed.append(key)
+        click.echo('%-48s %.6fs -> %.6fs  x%.2f%s' % (
+            key, before, after, ratio, mark))
+
+    if regressed:
+        click.echo('%s benchmarks regressed past %d%%' % (
+            len(regressed), threshold * 100))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    bench()
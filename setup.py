@@ -33,5 +33,8 @@ setup(
     },
     include_package_data=True,
     install_requires=read('requirements.txt'),
+    extras_require={
+        'numpy': ['numpy'],
+    },
     zip_safe=True,
 )
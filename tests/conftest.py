@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import pytest
+
+from bdgame.utils import build_game_conf, parse_puzzle
+
+# A puzzle in the play_input.txt format, COW and CAT share their first cell
+# and WEB is there twice
+PUZZLE = '''C A T W
+O X W E
+W E B B
+S X X X
+4
+0 0 0 2
+0 0 2 0
+2 0 2 2
+0 3 2 3
+2
+'''
+
+PUZZLE_WORDS = ['CAT', 'COW', 'WEB']
+
+
+def puzzle_conf(text=PUZZLE, players=('alice', 'bob'), grid=None):
+    ''' Return the game configurations of the puzzle, grid replaces the text
+    of its grid if given '''
+
+    puzzle = parse_puzzle(text.splitlines(True))
+    glen, gbred = [int(i) for i in puzzle['gsize'].split()]
+    return build_game_conf(
+        nplayers=len(players),
+        players=list(players),
+        glen=glen,
+        gbred=gbred,
+        grid=puzzle['grid'] if grid is None else grid,
+        wcount=puzzle['wcount'],
+        locations=','.join(puzzle['locations']),
+    )
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    ''' Run with $HOME in a temporary directory '''
+    monkeypatch.setenv('HOME', str(tmp_path))
+    return tmp_path
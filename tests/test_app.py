@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sys
+import subprocess
+
+from click.testing import CliRunner
+
+from bdgame.app import COMMANDS, _short_help, app
+
+
+def test_short_help():
+    assert _short_help('Play the game. Then more.\n\nDetails', 80) == \
+        'Play the game.'
+    assert _short_help('Check puzzle files in the format play reads', 20) == \
+        'Check puzzle...'
+
+
+def test_help_lists_every_command():
+    result = CliRunner().invoke(app, ['--help'])
+    assert result.exit_code == 0
+    for name in COMMANDS:
+        assert '  %s ' % name in result.output
+    assert 'Find all the words of a dictionary in a grid' in result.output
+
+
+def test_help_does_not_load_the_commands():
+    code = ('import sys\n'
+            'from bdgame.app import app\n'
+            'try:\n'
+            '    app(["--help"])\n'
+            'except SystemExit:\n'
+            '    pass\n'
+            'print(sorted(name for name in sys.modules\n'
+            '             if name.startswith("bdgame.commands.")))\n')
+    output = subprocess.check_output([sys.executable, '-c', code],
+                                     universal_newlines=True)
+    assert output.splitlines()[-1] == '[]'
+
+
+def test_help_without_the_sources(monkeypatch):
+    monkeypatch.setattr('importlib.machinery.SourceFileLoader.get_source',
+                        lambda self, name: None)
+    result = CliRunner().invoke(app, ['--help'])
+    assert result.exit_code == 0
+    for name in COMMANDS:
+        assert '  %s ' % name in result.output
+    assert 'Find all the words of a dictionary in a grid' in result.output
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import bdgame.utils
+from bdgame.utils import cache, cfg_path, create_config, load_game_conf
+
+GRID = 'C A T\nO X O\nW E B'
+
+
+def test_puzzle_key(monkeypatch):
+    key = cache.puzzle_key(3, 3, GRID, '0 0 0 2')
+    assert key == cache.puzzle_key('3', 3, iter(GRID.splitlines(True)),
+                                   '0 0 0 2')
+    assert key != cache.puzzle_key(3, 3, GRID, '0 0 2 0')
+    assert cache.puzzle_key('ab', 'c') != cache.puzzle_key('a', 'bc')
+    # a big text is hashed in pieces like the iterable of its pieces
+    monkeypatch.setattr(cache, 'HASH_CHUNK', 4)
+    assert cache.puzzle_key(3, 3, GRID, '0 0 0 2') == key
+
+
+def test_load_and_dump(tmp_path):
+    path = str(tmp_path / '.bdgamec')
+    key = cache.puzzle_key('puzzle')
+    assert cache.load(path, key) is None
+    cache.dump(path, key, {'words': [1, 2]})
+    assert cache.load(path, key) == {'words': [1, 2]}
+    assert cache.load(path, cache.puzzle_key('other')) is None
+    with open(path, 'r+b') as stream:
+        stream.truncate(len(cache.MAGIC) + len(key) + 2)
+    assert cache.load(path, key) is None
+    # nothing is raised, the puzzle is compiled again next time
+    cache.dump(str(tmp_path / 'missing' / '.bdgamec'), key, {})
+    assert sorted(i.name for i in tmp_path.iterdir()) == ['.bdgamec']
+
+
+def test_config_puzzle_is_compiled_once(home, monkeypatch):
+    create_config(nplayers=2, gsize='3 3', grid=GRID, players='a,b',
+                  wcount=1, locations='0 0 0 2')
+    assert list(load_game_conf()['words']) == ['CAT']
+
+    compiled = []
+    compile_puzzle = bdgame.utils._compile_puzzle
+
+    def counted(*args, **kwargs):
+        compiled.append(args)
+        return compile_puzzle(*args, **kwargs)
+    monkeypatch.setattr(bdgame.utils, '_compile_puzzle', counted)
+    assert list(load_game_conf()['words']) == ['CAT']
+    assert compiled == []
+
+    with open(cfg_path()) as stream:
+        text = stream.read()
+    with open(cfg_path(), 'w') as stream:
+        stream.write(text.replace('0 0 0 2', '2 0 2 2'))
+    assert list(load_game_conf()['words']) == ['WEB']
+    assert len(compiled) == 1
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+
+import pytest
+
+from bdgame.exceptions import BDException
+from bdgame.utils import config
+
+
+def test_write_and_load(tmp_path):
+    path = str(tmp_path / '.bdgame')
+    config.write(path, {
+        'nplayers': 2,
+        'players': 'alice,bob',
+        'grid': iter(['C A T\n', 'O X O\n', 'W E B']),
+    })
+    snapshot = config.load(path)
+    assert snapshot.get_int('nplayers') == 2
+    assert snapshot.get_list('players') == ['alice', 'bob']
+    assert snapshot.get('grid') == 'C A T\nO X O\nW E B'
+    assert 'wcount' not in snapshot
+    assert snapshot.get_list('locations') == []
+    assert config.load(path) is snapshot
+
+    with pytest.raises(AttributeError):
+        snapshot.path = 'other'
+
+
+def test_changed_file_is_read_again(tmp_path):
+    path = str(tmp_path / '.bdgame')
+    config.write(path, {'wcount': 'four'})
+    snapshot = config.load(path)
+    with pytest.raises(BDException):
+        snapshot.get_int('wcount')
+
+    with open(path, 'a') as stream:
+        stream.write('[nplayers]\nnplayers = 3\n')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert config.load(path).get_int('nplayers') == 3
+    assert snapshot.get('nplayers') is None
+
+
+def test_missing_file(tmp_path):
+    snapshot = config.load(str(tmp_path / 'missing'))
+    assert snapshot.get('grid') is None
+    assert snapshot.stamp is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import random
+
+import pytest
+
+from bdgame.exceptions import BDException
+from bdgame.utils import generator
+from bdgame.utils.validate import check_puzzle
+
+WORDS = ['cat', 'cow', 'web', 'dog', 'bird', 'fish', 'pass', 'x', 'a-b']
+
+
+def test_clean_words():
+    assert generator.clean_words(WORDS, 3) == ['CAT', 'COW', 'WEB', 'DOG']
+
+
+def test_make_puzzle():
+    words = generator.clean_words(WORDS, 5)
+    puzzle = generator.make_puzzle(words, 5, 5, 4, seed='s')
+    assert puzzle == generator.make_puzzle(words, 5, 5, 4, seed='s')
+    assert len(puzzle['grid']) == 5
+    assert all(len(row) == 5 for row in puzzle['grid'])
+    assert len(puzzle['locations']) == len(puzzle['words']) == 4
+    generator.check_puzzle(puzzle)
+    text = generator.format_puzzle(puzzle, 3)
+    assert check_puzzle(text.splitlines(True)) == []
+    assert text.endswith('\n3\n')
+
+    with pytest.raises(BDException):
+        generator.make_puzzle(['CAT'], 2, 2, 1, seed='s')
+
+
+def test_place_shares_one_cell():
+    cells = [[None] * 4 for _ in range(4)]
+    owners = {}
+    rng = random.Random('s')
+    assert generator._place(rng, cells, owners, 0, 'CAT', 1, 4,
+                            [(0, 1)]) is not None
+    # TAC fits on the letters of CAT but would hide it
+    assert generator._place(rng, cells, owners, 1, 'TAC', 1, 4,
+                            [(0, -1)]) is None
+    assert [i for i in cells[0] if i is not None] == list('CAT')
+
+
+def test_made_puzzles_validate():
+    words = generator.clean_words(
+        ['cat', 'act', 'tac', 'ata', 'taco', 'coat', 'at', 'ta'], 4)
+    for index in range(200):
+        try:
+            puzzle = generator.make_puzzle(words, 4, 4, 4, seed=index)
+        except BDException:
+            continue
+        generator.check_puzzle(puzzle)
+        text = generator.format_puzzle(puzzle, 2)
+        assert check_puzzle(text.splitlines(True)) == []
+
+
+def test_generate(tmp_path):
+    first = sorted(generator.generate(WORDS, 6, 6, 3, 4, str(tmp_path / 'a'),
+                                      seed=7, processes=1))
+    again = sorted(generator.generate(WORDS, 6, 6, 3, 4, str(tmp_path / 'b'),
+                                      seed=7, processes=2))
+    assert [error for _, _, error in first] == [None] * 4
+    for (_, path, _), (_, other, _) in zip(first, again):
+        assert os.path.basename(path) == os.path.basename(other)
+        with open(path) as stream, open(other) as other_stream:
+            assert stream.read() == other_stream.read()
+
+    with pytest.raises(BDException):
+        list(generator.generate(['cat'], 6, 6, 3, 1, str(tmp_path / 'c')))
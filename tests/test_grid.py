@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import pickle
+
+import pytest
+
+import bdgame.utils
+from bdgame.exceptions import BDException
+from bdgame.utils import grid as grids
+from bdgame.utils import grid_dir, load_game_conf, override_conf
+
+from tests.conftest import PUZZLE, PUZZLE_WORDS
+
+ROWS = ['c a t w', 'o x w e', '', 'w e b b', 's x x x']
+
+
+def test_write_grid(tmp_path):
+    grid = grids.write_grid(ROWS, str(tmp_path))
+    assert isinstance(grid, grids.MmapGrid)
+    assert (grid.length, grid.breadth) == (4, 4)
+    assert grid.text() == 'C A T W\nO X W E\nW E B B\nS X X X'
+    assert grid.tobytes() == b'CATWOXWEWEBBSXXX'
+    assert grid.digest + grids.GRID_EXT == os.path.basename(grid.path)
+    # the same letters make the same file
+    assert grids.write_grid(iter(ROWS), str(tmp_path)).path == grid.path
+    assert os.listdir(str(tmp_path)) == [os.path.basename(grid.path)]
+
+    copy = pickle.loads(pickle.dumps(grid))
+    assert copy.path == grid.path and copy.text() == grid.text()
+    assert grids.load_grid(grid.dump()).text() == grid.text()
+
+
+def test_bad_grid_files(tmp_path):
+    with pytest.raises(BDException):
+        grids.write_grid(['c a', 'c a t'], str(tmp_path))
+    with pytest.raises(BDException):
+        grids.write_grid(['', ' '], str(tmp_path))
+    assert os.listdir(str(tmp_path)) == []
+
+    path = str(tmp_path / 'bad.grid')
+    with open(path, 'wb') as stream:
+        stream.write(b'CATW' + grids.GRID_TRAILER.pack(b'BDGRID1\0', 2, 4))
+    with pytest.raises(BDException):
+        grids.MmapGrid(path)
+    with open(path, 'wb') as stream:
+        stream.write(b'CA')
+    with pytest.raises(BDException):
+        grids.MmapGrid(path)
+
+
+def test_remove_grids(tmp_path):
+    kept = grids.write_grid(ROWS, str(tmp_path)).path
+    old = grids.write_grid(['a b', 'c d'], str(tmp_path)).path
+    (tmp_path / '.grid-writing').write_bytes(b'')
+    grids.remove_grids(str(tmp_path), keep=kept)
+    assert sorted(os.listdir(str(tmp_path))) == [
+        '.grid-writing', os.path.basename(kept)]
+    assert not os.path.exists(old)
+    grids.remove_grids(str(tmp_path / 'missing'))
+
+
+@pytest.fixture
+def mapped(home, monkeypatch):
+    monkeypatch.setenv(grids.BACKEND_ENV, 'mmap')
+    monkeypatch.setattr('click.prompt', lambda text, default: default)
+    monkeypatch.setattr('click.confirm', lambda text: True)
+    return home
+
+
+def test_play_input_goes_to_a_grid_file(mapped, monkeypatch):
+    lines = iter(PUZZLE.splitlines(True))
+    override_conf(lines, game=None)
+    with open(bdgame.utils.cfg_path()) as stream:
+        config = stream.read()
+    assert 'C A T' not in config
+    names = os.listdir(grid_dir())
+    assert 'grid_file = %s\n' % names[0] in config
+
+    # the compiled puzzle was kept, the grid is not read again
+    def fail(*args, **kwargs):
+        raise AssertionError('puzzle compiled again')
+    monkeypatch.setattr(bdgame.utils, '_compile_puzzle', fail)
+    conf = load_game_conf()
+    assert isinstance(conf['grid'], grids.MmapGrid)
+    assert sorted(conf['words']) == PUZZLE_WORDS
+
+
+def test_replaced_config_removes_its_grid_file(mapped, monkeypatch):
+    override_conf(PUZZLE.splitlines(True))
+    first = os.listdir(grid_dir())
+    override_conf(PUZZLE.replace('S X X X', 'S Y Y Y').splitlines(True))
+    second = os.listdir(grid_dir())
+    assert len(second) == 1 and second != first
+
+    monkeypatch.setenv(grids.BACKEND_ENV, 'bytes')
+    override_conf(PUZZLE.splitlines(True))
+    assert os.listdir(grid_dir()) == []
+
+
+def test_moved_home_still_loads(mapped, monkeypatch, tmp_path_factory):
+    override_conf(PUZZLE.splitlines(True))
+    assert sorted(load_game_conf()['words']) == PUZZLE_WORDS
+
+    moved = tmp_path_factory.mktemp('moved') / 'home'
+    os.rename(str(mapped), str(moved))
+    monkeypatch.setenv('HOME', str(moved))
+    conf = load_game_conf()
+    assert conf['grid'].path.startswith(str(moved))
+    assert conf['grid'].text() == 'C A T W\nO X W E\nW E B B\nS X X X'
+    assert sorted(conf['words']) == PUZZLE_WORDS
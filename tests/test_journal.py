@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+
+import pytest
+
+from bdgame.exceptions import BDException
+from bdgame.utils import grid as grids
+from bdgame.utils import journal
+from bdgame.utils.bots import PlayerInput
+from bdgame.utils.game import fresh_conf, prepare_game
+from tests.conftest import puzzle_conf
+
+MOVES = ['dog', 'cat', 'PASS', 'web', 'cat', 'cow']
+
+
+class Script(PlayerInput):
+    ''' Answers the moves in order, whoever plays '''
+
+    def __init__(self, moves):
+        self.moves = iter(moves)
+
+    def get_input(self, game, player):
+        return next(self.moves)
+
+
+def new_game(conf):
+    return prepare_game(fresh_conf(conf), headless=True)
+
+
+def play(game, moves):
+    game.player_input = Script(moves)
+    return game.play_game(max_turns=game.turns + len(moves))
+
+
+@pytest.fixture
+def conf():
+    return puzzle_conf()
+
+
+def test_resume_gives_the_same_game(conf, tmp_path):
+    game = new_game(conf)
+    started = journal.start(game, str(tmp_path))
+    play(game, MOVES)
+    started.close()
+    # a crash in the middle of a record
+    with open(started.path, 'ab') as stream:
+        stream.write(b'{"t":"move","tu')
+
+    path = journal.find_unfinished(str(tmp_path), journal.puzzle_id(conf))
+    assert path == started.path
+    resumed = new_game(conf)
+    assert journal.resume(resumed, path) is None
+    assert journal.game_state(resumed) == journal.game_state(game)
+    assert resumed.current_player() is resumed.players[0]
+    assert list(resumed.players[1].history()) == [
+        ('CAT', 'correct'), ('WEB', 'correct'), ('COW', 'correct')]
+
+    # the record cut short is gone, the game goes on in the same journal
+    result = play(resumed, ['web'])
+    assert result is resumed.players[1]
+    assert resumed.journal.path.endswith(journal.FINISHED_EXT)
+    assert not os.path.exists(path)
+    records = [record for _, record in
+               journal.read_records(resumed.journal.path)]
+    assert [i['t'] for i in records] == ['start'] + ['move'] * 7 + ['end']
+    assert records[-1]['scores'] == {'alice': 1, 'bob': 3}
+
+
+def test_resume_from_a_snapshot(conf, tmp_path):
+    game = new_game(conf)
+    started = journal.start(game, str(tmp_path))
+    started.snapshot_every = 4
+    play(game, MOVES)
+    started.close()
+    assert os.path.exists(journal.snapshot_path(started.path))
+
+    resumed = new_game(conf)
+    journal.resume(resumed, started.path)
+    assert journal.game_state(resumed) == journal.game_state(game)
+
+
+def test_resume_checks_the_puzzle_and_players(conf, tmp_path):
+    game = new_game(conf)
+    started = journal.start(game, str(tmp_path))
+    started.close()
+    with pytest.raises(BDException):
+        journal.resume(new_game(puzzle_conf(players=('bob', 'alice'))),
+                       started.path)
+    other = puzzle_conf(grid='C A T W\nO X W E\nW E B B\nS X X Y')
+    with pytest.raises(BDException):
+        journal.resume(new_game(other), started.path)
+
+
+def test_puzzle_id_is_the_same_for_every_backend(conf, tmp_path):
+    ids = set([journal.puzzle_id(conf)])
+    rows = [row.split() for row in conf['grid'].text().split('\n')]
+    for backend in ['bytes', 'list']:
+        ids.add(journal.puzzle_id(dict(
+            conf, grid=grids.from_rows(rows, backend=backend))))
+    mapped = grids.write_grid(conf['grid'].text().splitlines(),
+                              str(tmp_path))
+    ids.add(journal.puzzle_id(dict(conf, grid=mapped)))
+    assert len(ids) == 1
+
+
+def test_non_ascii_grid_is_journaled(tmp_path):
+    conf = puzzle_conf(grid='É A T W\nO X W E\nW E B B\nS X X X')
+    assert conf['grid'].backend == 'list'
+    game = new_game(conf)
+    started = journal.start(game, str(tmp_path))
+    play(game, ['éat', 'cow'])
+    started.close()
+    resumed = new_game(conf)
+    journal.resume(resumed, started.path)
+    assert journal.game_state(resumed) == journal.game_state(game)
+    assert resumed.players[0].correct_answers == ['ÉAT']
+
+
+def test_rotate_keeps_the_newest_finished_journals(tmp_path):
+    for i in range(12):
+        path = tmp_path / ('%02d%s' % (i, journal.FINISHED_EXT))
+        path.write_text('')
+        os.utime(str(path), (i, i))
+    (tmp_path / ('old' + journal.JOURNAL_EXT)).write_text('')
+
+    journal.rotate(str(tmp_path), 11)
+    assert len(os.listdir(str(tmp_path))) == 13
+    journal.rotate(str(tmp_path), 10)
+    assert sorted(os.listdir(str(tmp_path))) == [
+        '%02d%s' % (i, journal.FINISHED_EXT) for i in range(2, 12)
+    ] + ['old' + journal.JOURNAL_EXT]
+
+
+def test_resume_starts_with_the_same_player(conf, tmp_path):
+    seed = next(i for i in range(100)
+                if prepare_game(fresh_conf(conf), headless=True,
+                                order='random-start',
+                                seed=i).order.first() == 1)
+    game = prepare_game(fresh_conf(conf), headless=True,
+                        order='random-start', seed=seed)
+    started = journal.start(game, str(tmp_path))
+    started.close()
+
+    resumed = new_game(conf)
+    journal.resume(resumed, started.path)
+    assert resumed.current_player() is resumed.players[1]
+
+
+def test_resume_replays_eliminations(tmp_path):
+    conf = puzzle_conf(players=('alice', 'bob', 'carol'))
+    game = new_game(conf)
+    started = journal.start(game, str(tmp_path))
+    play(game, ['dog'])
+    game.eliminate(game.players[1])
+    play(game, ['cat'])
+    started.close()
+
+    resumed = new_game(conf)
+    journal.resume(resumed, started.path)
+    assert resumed.order.is_eliminated(1)
+    assert resumed.current_player() is resumed.players[0]
+    assert journal.game_state(resumed) == journal.game_state(game)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import pytest
+
+from bdgame.exceptions import BDException
+from bdgame.utils import grid as grids
+from bdgame.utils import path as paths
+from bdgame.utils.location import Location, parse_location, split_locations
+
+ROWS = ['CATS', 'OXOX', 'WEBX', 'SXXX']
+
+
+@pytest.fixture(params=['bytes', 'numpy', 'list'])
+def grid(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    return grids.from_rows([list(row) for row in ROWS],
+                           backend=request.param)
+
+
+def test_segments_run_in_eight_directions():
+    assert paths.segment(0, 0, 0, 3) == (0, 0, 0, 1, 4)
+    assert paths.segment(3, 3, 0, 0) == (3, 3, -1, -1, 4)
+    assert paths.segment(2, 0, 0, 2) == (2, 0, -1, 1, 3)
+    assert paths.segment(0, 0, 1, 2) is None
+
+
+def test_path_corners_belong_to_the_first_segment():
+    path = paths.make_path((0, 0, 0, 2, 2, 2))
+    assert path == ((0, 0, 0, 1, 3), (1, 2, 1, 0, 2))
+    assert paths.cells(path) == ((0, 0), (0, 1), (0, 2), (1, 2), (2, 2))
+    assert paths.cell_count(path) == 5
+
+
+def test_bad_paths():
+    assert paths.make_path((0, 0, 0)) is None
+    assert paths.make_path((0, 0, 1, 2)) is None
+    # a corner given twice
+    assert paths.make_path((0, 0, 0, 2, 0, 2, 2, 2)) is None
+
+
+@pytest.mark.parametrize('points, shape', [
+    ('1 1', 'oneletter'),
+    ('0 0 0 3', 'horizontal'),
+    ('3 0 0 0', 'vertical'),
+    ('3 0 0 3', 'diagonal'),
+    ('0 0 0 2 2 2', 'L'),
+    ('0 0 0 2 2 2 2 0', 'path'),
+    ('0 0 1 2', None),
+])
+def test_shapes(points, shape):
+    assert parse_location(points).shape == shape
+
+
+def test_location_is_immutable_and_hashable():
+    location = Location(['2', '3', '2', '5'])
+    assert location == Location((2, 3, 2, 5))
+    assert len(set([location, Location([2, 3, 2, 5])])) == 1
+    assert str(location) == '2 3 2 5'
+    with pytest.raises(AttributeError):
+        location.points = (0, 0)
+    with pytest.raises(BDException):
+        Location(['a', '1'])
+    with pytest.raises(BDException):
+        Location([0, 0, 1, 2]).coordinates
+
+
+def test_bounds():
+    Location([0, 0, 3, 3]).check_bounds(4, 4)
+    with pytest.raises(BDException):
+        Location([0, 0, 0, 4]).check_bounds(4, 4)
+    with pytest.raises(BDException):
+        Location([0, 0, 0, 1, -1, 1]).check_bounds(4, 4)
+
+
+def test_split_locations():
+    assert split_locations('0 0 0 2, 1 1') == [
+        Location([0, 0, 0, 2]), Location([1, 1])]
+
+
+def test_read_words(grid):
+    locations = [parse_location(i) for i in [
+        '0 0 0 2', '0 0 2 0', '2 0 2 2', '2 2 0 0', '3 0 0 3',
+        '0 0 0 2 2 2', '1 1', '0 3 0 0']]
+    words = paths.read_words(grid, [i.path for i in locations])
+    assert words == ['CAT', 'COW', 'WEB', 'BXC', 'SEOS', 'CATOB', 'X',
+                     'STAC']
+    for location, word in zip(locations, words):
+        assert grid.letters(location.coordinates) == word
+
+
+def test_read_words_out_of_the_grid(grid):
+    with pytest.raises(IndexError):
+        paths.read_words(grid, [Location([0, 0, 0, 4]).path])
+    with pytest.raises(IndexError):
+        paths.read_words(grid, [Location([0, 0, -2, -2]).path])
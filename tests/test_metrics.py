@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import json
+
+import pytest
+
+from bdgame.utils import metrics
+
+from tests.conftest import puzzle_conf
+from tests.test_journal import new_game, play
+
+
+@pytest.fixture(autouse=True)
+def disabled(monkeypatch):
+    monkeypatch.delenv(metrics.METRICS_ENV, raising=False)
+    yield
+    metrics.disable()
+
+
+@metrics.timed('work', histogram='render_seconds')
+def work(value):
+    return value * 2
+
+
+def test_histogram():
+    histogram = metrics.Histogram((1, 5))
+    for value in (0.5, 1, 3, 9):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(1, 2), (5, 3)]
+    assert (histogram.count, histogram.sum) == (4, 13.5)
+
+
+def test_timed_only_when_enabled():
+    assert work(2) == 4
+    assert metrics.current() is None
+    recorded = metrics.enable()
+    assert work(3) == 6
+    metrics.incr('things', 2)
+    assert recorded.phases['work'][0] == 1
+    assert recorded.histograms['render_seconds'].count == 1
+    assert recorded.counters == {'things': 2}
+
+
+def test_configure(tmp_path, monkeypatch):
+    assert metrics.configure() is None
+    path = str(tmp_path / 'game.json')
+    monkeypatch.setenv(metrics.METRICS_ENV, path)
+    assert metrics.configure().path == path
+
+
+def test_game_counters(tmp_path):
+    metrics.enable()
+    play(new_game(puzzle_conf()), ['dog', 'cat', 'PASS', 'cat'])
+    assert metrics.current().counters == {
+        'turns': 4, 'wrong_answers': 1, 'correct_answers': 1, 'passes': 1,
+        'taken_answers': 1}
+
+    metrics.dump(str(tmp_path / 'game.json'))
+    with open(str(tmp_path / 'game.json')) as stream:
+        dumped = json.load(stream)
+    assert dumped['counters']['turns'] == 4
+    for name in ('game.prom', 'game.txt'):
+        metrics.dump(str(tmp_path / name))
+        text = (tmp_path / name).read_text()
+        assert 'bdgame_turns_total 4\n' in text
+        assert 'bdgame_render_seconds_bucket{le="+Inf"}' in text
+    assert sorted(i.name for i in tmp_path.iterdir()) == [
+        'game.json', 'game.prom', 'game.txt']
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from bdgame.utils.location import Location
+from bdgame.utils.model import Board, Player, Vocabulary
+
+
+def test_misses_are_not_in_the_vocabulary():
+    vocabulary = Vocabulary(['PASS', 'CAT', 'COW'])
+    player = Player('alice', vocabulary=vocabulary)
+    player.record('DOG', 'wrong')
+    player.record('CAT', 'correct')
+    player.record('DOG', 'wrong')
+    player.record('PASS', 'pass')
+    player.record('CAT', 'taken')
+    assert list(player.history()) == [
+        ('DOG', 'wrong'), ('CAT', 'correct'), ('DOG', 'wrong'),
+        ('PASS', 'pass'), ('CAT', 'taken')]
+    assert player.answers == ['DOG', 'CAT', 'DOG', 'PASS', 'CAT']
+    assert player.correct_answers == ['CAT']
+    assert vocabulary.words == ['PASS', 'CAT', 'COW']
+    assert vocabulary.id('DOG') is None
+    assert player.misses == ['DOG', 'DOG']
+
+
+def test_player_without_a_game():
+    player = Player('bob')
+    player.record('CAT', 'correct')
+    assert player.correct_answers == ['CAT']
+
+
+def test_board_owners():
+    board = Board(None, 4, 4)
+    alice = Player('alice')
+    board.claim('0 0 0 2', alice)
+    board.claim(Location([0, 0, 2, 0]))
+    assert board.owner(0, 1) == (Location([0, 0, 0, 2]), alice)
+    # the last claim of a cell owns it
+    assert board.owner(0, 0) == (Location([0, 0, 2, 0]), None)
+    assert board.owner(3, 3) is None
+
+    board.recognized_locations = [Location([2, 0, 2, 2])]
+    assert board.owner(0, 1) is None
+    assert board.owner(2, 1) == (Location([2, 0, 2, 2]), None)
+    assert board.claims == [(Location([2, 0, 2, 2]), None)]
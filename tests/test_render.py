@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import io
+import os
+
+import click
+import pytest
+
+from bdgame.utils import grid as grids
+from bdgame.utils import render
+from bdgame.utils.game import make_players, prepare_game
+from bdgame.utils.model import Board, Game
+from bdgame.utils.render import Renderer, Viewport
+
+from tests.conftest import PUZZLE, puzzle_conf
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    ''' Set the size of the terminal, columns and lines '''
+    def resize(columns, lines):
+        monkeypatch.setattr(render.shutil, 'get_terminal_size',
+                            lambda: os.terminal_size((columns, lines)))
+    resize(80, 24)
+    return resize
+
+
+def board(rows=None):
+    rows = rows or PUZZLE.splitlines()[:4]
+    grid = grids.read_grid(rows)
+    return Board(grid, grid.length, grid.breadth)
+
+
+def plain(cells=()):
+    return lambda row, column: 'red' if (row, column) in cells else None
+
+
+def test_printed_inline_without_ansi(terminal):
+    stream = io.StringIO()
+    Renderer(stream, ansi=False).render(board(), plain())
+    assert stream.getvalue() == (
+        '\n C  A  T  W \n O  X  W  E \n W  E  B  B \n S  X  X  X \n\n')
+
+
+def test_only_changed_cells_are_redrawn(terminal):
+    stream = io.StringIO()
+    renderer = Renderer(stream, ansi=True)
+    renderer.render(board(), plain())
+    first = stream.getvalue()
+    assert first.startswith(render.CLEAR_SCREEN)
+
+    stream.seek(0)
+    stream.truncate()
+    renderer.render(board(), plain())
+    assert stream.getvalue() == ''
+
+    renderer.render(board(), plain([(2, 1)]))
+    # only the cell at row 2, column 1 is written, on line 4 column 4
+    assert stream.getvalue() == (
+        render.SAVE_CURSOR + '\x1b[4;4H' + click.style(' E ', fg='red') +
+        render.RESTORE_CURSOR)
+
+    stream.seek(0)
+    stream.truncate()
+    renderer.close()
+    assert stream.getvalue().startswith(render.RESET_SCROLL)
+
+
+def test_big_board_is_printed_whole_without_viewport(terminal):
+    terminal(6, 24)
+    stream = io.StringIO()
+    Renderer(stream, ansi=True).render(board(), plain())
+    assert stream.getvalue().count('\n') == 6
+
+
+def test_viewport_window(terminal):
+    rows = [' '.join('ABCDEFGHIJ'[(i + j) % 10] for j in range(10))
+            for i in range(10)]
+    terminal(12, 10)
+    stream = io.StringIO()
+    renderer = Renderer(stream, ansi=False, viewport=True)
+    renderer.render(board(rows), plain())
+    lines = stream.getvalue().splitlines()
+    # 3 rows of 4 columns, the terminal keeps the rest for the prompt
+    assert lines[0].startswith('Rows 0-2 of 10, columns 0-3 of 10')
+    assert lines[1:4] == [' A  B  C  D ', ' B  C  D  E ', ' C  D  E  F ']
+
+    renderer.viewport.scroll(100, 1)
+    stream.seek(0)
+    stream.truncate()
+    renderer.render(board(rows), plain())
+    lines = stream.getvalue().splitlines()
+    assert lines[0].startswith('Rows 7-9 of 10, columns 1-4 of 10')
+    assert lines[1] == ' I  J  A  B '
+
+
+def test_viewport_center():
+    viewport = Viewport()
+    viewport.resize(board(), 3 + render.MIN_PROMPT_LINES + 2, 6)
+    assert (viewport.rows, viewport.columns) == (2, 2)
+    viewport.center(3, 3)
+    assert (viewport.top, viewport.left) == (2, 2)
+    viewport.center(0, 0)
+    assert (viewport.top, viewport.left) == (0, 0)
+
+
+def test_headless_game_has_no_renderer():
+    game = prepare_game(puzzle_conf(), headless=True)
+    assert game.renderer is None
+    game.display_board()
+    game.view('/down')
+    assert prepare_game(puzzle_conf()).renderer is not None
+
+
+# 10 by 10 letters with two words, one at the top left and one at the
+# bottom right
+BIG_ROWS = [' '.join('ABCDEFGHIJ'[(i + j) % 10] for j in range(10))
+            for i in range(10)]
+BIG_PUZZLE = '\n'.join(BIG_ROWS) + '\n2\n0 0 0 2\n9 7 9 9\n2\n'
+
+
+def viewed_game(viewport=True):
+    conf = puzzle_conf(BIG_PUZZLE)
+    stream = io.StringIO()
+    messages = []
+    game = Game(Board(conf['grid'], conf['glen'], conf['gbred']),
+                make_players(conf['players']), conf,
+                renderer=Renderer(stream, ansi=False, viewport=viewport),
+                output=messages.append)
+    return game, stream, messages
+
+
+def shown(stream):
+    status = stream.getvalue().splitlines()[-5]
+    stream.seek(0)
+    stream.truncate()
+    return status
+
+
+def test_view_scrolls_the_board(terminal):
+    terminal(12, 10)
+    game, stream, messages = viewed_game()
+    game.display_board()
+    assert shown(stream).startswith('Rows 0-2 of 10, columns 0-3 of 10')
+
+    game.view('/down 4')
+    assert shown(stream).startswith('Rows 4-6 of 10')
+    game.view('/up')
+    assert shown(stream).startswith('Rows 3-5 of 10')
+    game.view('/right 100')
+    assert shown(stream).startswith('Rows 3-5 of 10, columns 6-9 of 10')
+    game.view('/LEFT 2')
+    assert shown(stream).startswith('Rows 3-5 of 10, columns 4-7 of 10')
+    assert messages == []
+
+
+def test_view_last_word(terminal):
+    terminal(12, 10)
+    game, stream, messages = viewed_game()
+    game.display_board()
+    shown(stream)
+    game.view('/last')
+    assert messages == ['No word is found yet']
+    assert stream.getvalue() == ''
+
+    game.board.claim(game.conf['locations'][1], game.players[0])
+    game.view('/last')
+    assert shown(stream).startswith('Rows 7-9 of 10, columns 6-9 of 10')
+
+
+def test_view_bad_commands(terminal):
+    terminal(12, 10)
+    game, stream, messages = viewed_game()
+    game.display_board()
+    shown(stream)
+    for command in ('/down x', '/sideways', '/up 1 2', '/last 3x'):
+        game.view(command)
+    assert len(messages) == 4
+    assert all(message.startswith('Use one of ') for message in messages)
+    assert stream.getvalue() == ''
+
+
+def test_view_without_viewport(terminal):
+    game, stream, messages = viewed_game(viewport=False)
+    game.view('/down')
+    assert messages[0].startswith('The whole board is shown')
+    assert stream.getvalue() == ''
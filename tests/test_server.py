@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import asyncio
+
+from bdgame.utils import server
+from bdgame.utils.server import GameServer, Session, load_puzzles
+
+PUZZLE = '''C A T
+O X O
+W E B
+3
+0 0 0 2
+0 0 2 0
+2 0 2 2
+2
+'''
+
+
+class FakeTransport(object):
+    ''' Transport of a client which reads nothing '''
+
+    def __init__(self):
+        self.size = 0
+        self.aborted = False
+
+    def get_write_buffer_size(self):
+        return self.size
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeWriter(object):
+    ''' Writer keeping the lines sent '''
+
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.lines = []
+
+    def write(self, data):
+        self.transport.size += len(data)
+        self.lines.append(data.decode('utf-8').rstrip('\n'))
+
+
+def make_server(tmp_path):
+    path = tmp_path / 'cat.txt'
+    path.write_text(PUZZLE)
+    return GameServer(load_puzzles([str(path)]))
+
+
+def session():
+    return Session(FakeWriter())
+
+
+def last(session):
+    return session.writer.lines[-1]
+
+
+def test_new_needs_two_players(tmp_path):
+    srv = make_server(tmp_path)
+    alice = session()
+    srv.dispatch(alice, 'NEW cat 1')
+    assert last(alice).startswith('ERR usage')
+    srv.dispatch(alice, 'NEW dog 2')
+    assert last(alice) == 'ERR no puzzle dog'
+    srv.dispatch(alice, 'NEW cat 2')
+    assert last(alice) == 'OK GAME 1'
+
+
+def test_game_is_played_in_turns(tmp_path):
+    srv = make_server(tmp_path)
+    alice, bob = session(), session()
+    srv.dispatch(alice, 'NEW cat 2')
+    srv.dispatch(alice, 'JOIN 1 alice')
+    srv.dispatch(bob, 'JOIN 1 bob')
+    assert 'START 1' in alice.writer.lines
+    assert last(bob) == 'TURN alice'
+
+    srv.dispatch(bob, 'GUESS cat')
+    assert last(bob) == 'ERR not your turn, alice plays'
+    srv.dispatch(alice, 'GUESS cat')
+    assert last(alice) == 'TURN bob'
+    srv.dispatch(bob, 'GUESS cow')
+    srv.dispatch(alice, 'GUESS web')
+    assert last(bob) == 'OVER alice'
+
+    srv.dispatch(bob, 'SCORES')
+    assert last(bob) == 'OK alice:2 bob:1'
+    srv.dispatch(bob, 'BOARD')
+    assert bob.writer.lines[-4:] == ['OK BOARD 3', 'c a t', 'o X O', 'w e b']
+
+
+def test_join_rejects_taken_names(tmp_path):
+    srv = make_server(tmp_path)
+    alice, other = session(), session()
+    srv.dispatch(alice, 'NEW cat 2')
+    srv.dispatch(alice, 'JOIN 1 alice')
+    srv.dispatch(other, 'JOIN 1 alice')
+    assert last(other) == 'ERR alice is taken in game 1'
+    assert other.room is None
+    srv.dispatch(other, 'JOIN 1 a,b')
+    assert last(other) == 'ERR , cannot be in a name'
+
+
+def test_slow_client_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'MAX_BUFFER', 100)
+    slow = session()
+    for _ in range(10):
+        slow.send('x' * 20)
+    assert slow.dropped
+    assert slow.writer.transport.aborted
+    assert len(slow.writer.lines) == 5
+
+
+def test_serves_over_tcp(tmp_path):
+    srv = make_server(tmp_path)
+
+    async def talk():
+        tcp = await srv.start(port=0)
+        port = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        greeting = await reader.readline()
+        writer.write(b'PUZZLES\n')
+        puzzles = await reader.readline()
+        writer.write(b'QUIT\n')
+        end = await reader.readline()
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return greeting, puzzles, end
+
+    greeting, puzzles, end = asyncio.run(talk())
+    assert greeting.startswith(b'OK bdgame')
+    assert puzzles == b'OK cat\n'
+    assert end == b''
+
+
+def start_game(srv, names):
+    sessions = [session() for _ in names]
+    srv.dispatch(sessions[0], 'NEW cat %d' % len(names))
+    for player, name in zip(sessions, names):
+        srv.dispatch(player, 'JOIN 1 %s' % name)
+    return sessions
+
+
+def leave(srv, player):
+    ''' Disconnect the player like the server does '''
+    room = player.room
+    room.leave(player)
+    srv._forget(room)
+
+
+def test_game_goes_on_without_a_player_leaving(tmp_path):
+    srv = make_server(tmp_path)
+    alice, bob, carol = start_game(srv, ['alice', 'bob', 'carol'])
+    srv.dispatch(alice, 'GUESS cat')
+    # bob leaves on his turn, carol plays next
+    leave(srv, bob)
+    assert carol.writer.lines[-2:] == ['LEFT bob', 'TURN carol']
+    srv.dispatch(carol, 'PASS')
+    assert last(alice) == 'TURN alice'
+    srv.dispatch(alice, 'GUESS cow')
+    assert last(carol) == 'TURN carol'
+
+    # the last one left wins
+    leave(srv, alice)
+    assert carol.writer.lines[-2:] == ['LEFT alice', 'OVER carol']
+    leave(srv, carol)
+    assert srv.rooms == {}
+
+
+def test_starter_leaving_before_playing(tmp_path):
+    srv = make_server(tmp_path)
+    alice, bob, carol = start_game(srv, ['alice', 'bob', 'carol'])
+    leave(srv, alice)
+    assert last(bob) == 'TURN bob'
+    srv.dispatch(bob, 'GUESS cat')
+    assert last(carol) == 'TURN carol'
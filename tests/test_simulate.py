@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import pytest
+
+from bdgame.utils import bots
+from bdgame.utils.simulate import play_one, simulate
+
+from tests.conftest import puzzle_conf
+
+
+def test_player_input_is_abstract():
+    with pytest.raises(TypeError):
+        bots.PlayerInput()
+
+
+def test_make_bot():
+    assert isinstance(bots.make_bot('random'), bots.RandomGuesser)
+    assert isinstance(bots.make_bot('perfect'), bots.PerfectSolver)
+    assert bots.make_bot('knows:25').knows == 0.25
+    for spec in ('knows:150', 'knows:x', 'clever'):
+        with pytest.raises(ValueError):
+            bots.make_bot(spec)
+
+
+def test_perfect_solver_finds_every_word():
+    winner, turns = play_one(puzzle_conf(), ['perfect', 'knows:0'], seed=1)
+    # the perfect bot plays first and finds the four words, WEB is there
+    # twice, the other one passes in between
+    assert (winner, turns) == (0, 7)
+
+
+def test_same_seed_same_games():
+    conf = puzzle_conf()
+    first = simulate(conf, ['random', 'knows:50'], 20, seed=3, processes=1)
+    again = simulate(conf, ['random', 'knows:50'], 20, seed=3, processes=2)
+    for key in ('wins', 'draws', 'turns_mean', 'turns_min', 'turns_max'):
+        assert first[key] == again[key]
+    assert sum(first['wins']) + first['draws'] == 20
+
+
+def test_journaled_games(tmp_path):
+    simulate(puzzle_conf(), ['perfect', 'random'], 3, processes=1,
+             journal_dir=str(tmp_path / 'games'), max_turns=5)
+    assert len(list((tmp_path / 'games').iterdir())) == 3
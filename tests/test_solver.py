@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from click.testing import CliRunner
+
+from bdgame.app import app
+from bdgame.utils.solver import build_trie, solve
+
+from tests.conftest import PUZZLE
+
+ROWS = [row.split() for row in PUZZLE.splitlines()[:4]]
+
+
+def found(words, rows=ROWS, min_length=2):
+    return sorted(solve(rows, len(rows), len(rows[0]),
+                        build_trie(words, min_length=min_length)))
+
+
+def test_build_trie():
+    trie = build_trie(['cat', 'Ca', 'x', 'c-t', 'catalog'], max_length=4)
+    assert trie == {'C': {'A': {None: 'CA', 'T': {None: 'CAT'}}}}
+
+
+def test_finds_words_in_every_direction():
+    assert found(['cat', 'cow', 'web', 'tac', 'axe', 'bb', 'dog']) == [
+        ('AXE', 0, 1, 2, 1),
+        ('BB', 2, 2, 2, 3),
+        ('CAT', 0, 0, 0, 2),
+        ('COW', 0, 0, 2, 0),
+        ('TAC', 0, 2, 0, 0),
+        ('WEB', 0, 3, 2, 3),
+        ('WEB', 2, 0, 2, 2),
+    ]
+
+
+def test_palindromes_and_letters_found_once():
+    rows = [['A', 'B', 'A'], ['X', 'Y', 'X']]
+    assert found(['aba', 'y'], rows, min_length=1) == [
+        ('ABA', 0, 0, 0, 2), ('Y', 1, 1, 1, 1)]
+    assert found(['xax'], rows) == []
+
+
+def test_command(tmp_path):
+    (tmp_path / 'grid.txt').write_text(''.join(PUZZLE.splitlines(True)[:4]))
+    (tmp_path / 'words.txt').write_text('cat\nweb\n')
+    result = CliRunner().invoke(app, [
+        'solve', '--inp', str(tmp_path / 'grid.txt'),
+        '--dictionary', str(tmp_path / 'words.txt'), '--show-words'])
+    assert result.exit_code == 0
+    assert sorted(result.stdout.splitlines()) == [
+        '0 0 0 2 CAT', '0 3 2 3 WEB', '2 0 2 2 WEB']
+    assert result.stderr == '3 words found\n'
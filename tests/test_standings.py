@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import random
+
+import pytest
+
+from bdgame.utils.standings import Standings
+
+
+def test_ties_keep_the_order_scores_were_reached():
+    standings = Standings(4)
+    assert standings.leaders() == [0, 1, 2, 3]
+    standings.add(2)
+    standings.add(0)
+    assert standings.leaders() == [2, 0]
+    assert standings.top(3) == [(2, 1), (0, 1), (1, 0)]
+    assert [standings.rank(i) for i in range(4)] == [1, 3, 1, 3]
+    standings.add(0)
+    assert standings.leaders() == [0]
+    assert standings.rank(2) == 2
+
+
+def test_scores_past_max_score():
+    standings = Standings(2, max_score=1)
+    standings.set(1, 100)
+    standings.add(0, 7)
+    assert standings.top(2) == [(1, 100), (0, 7)]
+    assert standings.rank(0) == 2
+    standings.set(1, 0)
+    assert standings.leaders() == [0]
+    with pytest.raises(ValueError):
+        standings.set(0, -1)
+
+
+def test_matches_sorting():
+    rng = random.Random(7)
+    standings = Standings(50, max_score=4)
+    for _ in range(2000):
+        index = rng.randrange(50)
+        if rng.random() < 0.2:
+            standings.set(index, rng.randrange(20))
+        else:
+            standings.add(index)
+        scores = standings.scores
+        for i in (0, index, 49):
+            assert standings.rank(i) == \
+                1 + sum(1 for score in scores if score > scores[i])
+        assert [score for _, score in standings.top(5)] == \
+            sorted(scores, reverse=True)[:5]
+        best = max(scores)
+        assert sorted(standings.leaders()) == \
+            [i for i, score in enumerate(scores) if score == best]
+
+
+def test_no_players():
+    standings = Standings(0)
+    assert standings.leaders() == []
+    assert standings.top(3) == []
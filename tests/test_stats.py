@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from bdgame.utils import journal
+from bdgame.utils.stats import Stats, chunks, journal_files, read_chunk, stats
+
+from tests.conftest import puzzle_conf
+from tests.test_journal import new_game, play
+
+# games of the puzzle, the last one is not finished
+GAMES = [
+    ['cat', 'cow', 'web', 'web'],
+    ['PASS', 'web', 'dog', 'cat', 'cow', 'web'],
+    ['cow', 'PASS'],
+]
+
+
+def journals(directory):
+    conf = puzzle_conf()
+    for moves in GAMES:
+        game = new_game(conf)
+        journal.start(game, str(directory))
+        play(game, moves)
+        game.journal.close()
+    return journal.puzzle_id(conf)
+
+
+def test_report(tmp_path):
+    puzzle = journals(tmp_path)
+    report = stats([str(tmp_path)], processes=1).report()
+    assert (report['records'], report['bad_records'], report['games']) == (
+        3 + 12 + 2, 0, 3)
+    result = report['puzzles'][puzzle]
+    assert (result['games'], result['finished'], result['draws']) == (3, 2, 1)
+    assert (result['turns_min'], result['turns_max']) == (4, 6)
+    assert result['outcomes'] == {'correct': 9, 'pass': 2, 'wrong': 1}
+    assert result['found_first'] == ['CAT', 'COW', 'WEB']
+    assert result['never_found'] == []
+    assert result['words']['WEB'] == {
+        'found': 4, 'found_first': 1, 'mean_turn_found': 3.75, 'left': 0}
+    assert result['scores'] == {'1': 1, '2': 2, '3': 1}
+
+
+def test_chunks_give_the_same_stats(tmp_path):
+    journals(tmp_path)
+    files = journal_files([str(tmp_path)])
+    assert len(files) == 3
+    whole = stats([str(tmp_path)], processes=1).report()
+    for chunk_size in (1, 100, 1000):
+        tasks = chunks(files, chunk_size)
+        assert sum(end - start for task in tasks
+                   for _, start, end in task) == sum(
+                       end for _, _, end in chunks(files, 10 ** 9)[0])
+        assert stats([str(tmp_path)], processes=2,
+                     chunk_size=chunk_size).report() == whole
+
+
+def test_bad_records(tmp_path):
+    path = tmp_path / 'cut.journal'
+    path.write_bytes(b'{"t":"start"}\nnot json\n{"t":"mo')
+    result = read_chunk((str(path), 0, path.stat().st_size))
+    assert (result.records, result.bad_records) == (0, 3)
+    assert Stats().merge(result).bad_records == 3
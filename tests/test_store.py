@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import sqlite3
+
+import pytest
+
+import bdgame.utils
+from bdgame.exceptions import BDException, ItemNotFound
+from bdgame.utils import parse_puzzle, store
+from bdgame.utils.model import Player
+
+from tests.conftest import PUZZLE, PUZZLE_WORDS
+
+GRID = '''C A T W
+O X W E
+W E B B
+S X X X'''
+
+LOCATIONS = '0 0 0 2,0 0 2 0,2 0 2 2,0 3 2 3'
+
+
+def save(path, game_id='g', players='alice,bob', grid=GRID):
+    store.save_game(game_id, 2, players, '4 4', grid, 4, LOCATIONS,
+                    path=path)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'games.db')
+
+
+def test_round_trip(db):
+    save(db)
+    conf = store.load_game('g', path=db)
+    assert conf['players'] == ['alice', 'bob']
+    assert (conf['glen'], conf['gbred'], conf['wcount']) == (4, 4, 4)
+    assert conf['grid'].text() == GRID
+    assert [str(i) for i in conf['locations']] == LOCATIONS.split(',')
+    words = conf['words']
+    assert sorted(words) == PUZZLE_WORDS
+    assert words.count('WEB') == 2
+    assert [str(i) for i in words.locations('WEB')] == ['2 0 2 2', '0 3 2 3']
+
+
+def test_missing_game(db):
+    with pytest.raises(ItemNotFound):
+        store.load_game('nope', path=db)
+
+
+def test_bad_game(db):
+    with pytest.raises(BDException):
+        save(db, players='alice')
+    with pytest.raises(BDException):
+        store.save_game('g', 2, 'a,b', '3 4', GRID, 4, LOCATIONS, path=db)
+
+
+def test_replace_and_share_puzzle(db):
+    save(db)
+    save(db, players='carol,dave')
+    save(db, game_id='h')
+    assert store.load_game('g', path=db)['players'] == ['carol', 'dave']
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM games').fetchone()[0] == 2
+        assert conn.execute('SELECT COUNT(*) FROM puzzles').fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_save_result(db):
+    save(db)
+    players = [Player('alice'), Player('bob')]
+    players[1].score = 3
+    store.save_result('g', players, players[1], path=db)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute('SELECT result FROM games').fetchone()[0] == 'bob'
+        assert conn.execute(
+            'SELECT score FROM players ORDER BY seat').fetchall() == [
+                (0,), (3,)]
+    finally:
+        conn.close()
+
+
+def test_words_are_not_read_again(db, monkeypatch):
+    save(db)
+
+    def fail(*args):
+        raise AssertionError('words read from the grid again')
+    monkeypatch.setattr(bdgame.utils, '_get_words', fail)
+    assert sorted(store.load_game('g', path=db)['words']) == PUZZLE_WORDS
+
+
+def test_parse_puzzle_blank_lines():
+    lines = PUZZLE.splitlines(True)
+    lines[2:2] = ['\n', '   \n']
+    puzzle = parse_puzzle(lines)
+    assert puzzle['gsize'] == '4 4'
+    assert puzzle['grid'] == GRID + '\n'
+    assert puzzle['wcount'] == 4
+
+
+def test_override_conf_blank_lines(db, monkeypatch):
+    monkeypatch.setenv(store.STORE_ENV, db)
+    monkeypatch.setattr('click.prompt',
+                        lambda text, default: default)
+    lines = PUZZLE.splitlines(True)
+    lines.insert(1, '\n')
+    bdgame.utils.override_conf(lines, game='g')
+    conf = store.load_game('g', path=db)
+    assert (conf['glen'], conf['gbred']) == (4, 4)
+    assert sorted(conf['words']) == PUZZLE_WORDS
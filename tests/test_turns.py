@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import pytest
+
+from bdgame.utils.turns import RandomStart, RoundRobin, make_order
+
+
+def turns(order, index, count):
+    ''' Return the indexes of the next count turns after index '''
+    played = []
+    for _ in range(count):
+        index = order.next(index)
+        played.append(index)
+    return played
+
+
+def test_round_robin():
+    order = RoundRobin(3)
+    assert order.first() == 0
+    assert turns(order, 0, 4) == [1, 2, 0, 1]
+
+
+def test_eliminate():
+    order = RoundRobin(4)
+    order.eliminate(1)
+    order.eliminate(1)
+    assert order.active == 3
+    assert order.is_eliminated(1)
+    assert turns(order, 0, 4) == [2, 3, 0, 2]
+    # the player eliminated on his turn is followed by the next one
+    assert order.next(1) == 2
+    order.eliminate(2)
+    order.eliminate(3)
+    assert order.active == 1
+    assert turns(order, 0, 2) == [0, 0]
+    # the last player is never taken out
+    order.eliminate(0)
+    assert order.active == 1
+
+
+def test_first_player_left():
+    order = RoundRobin(3)
+    order.eliminate(0)
+    assert order.first() == 1
+
+
+def test_random_start():
+    firsts = set(RandomStart(5, seed=i).first() for i in range(50))
+    assert firsts == set(range(5))
+    assert RandomStart(5, seed=3).first() == RandomStart(5, seed=3).first()
+    order = RandomStart(5)
+    order.start_with(2)
+    assert order.first() == 2
+    assert turns(order, 2, 3) == [3, 4, 0]
+
+
+def test_make_order():
+    assert isinstance(make_order('round-robin', 2), RoundRobin)
+    assert isinstance(make_order('random-start', 2, seed=1), RandomStart)
+    with pytest.raises(ValueError):
+        make_order('backwards', 2)
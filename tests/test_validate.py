@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import json
+
+from click.testing import CliRunner
+
+from bdgame.app import app
+from bdgame.utils.validate import check_puzzle, puzzle_files, validate
+
+from tests.conftest import PUZZLE
+
+
+def checks(text):
+    return [(error['check'], error.get('location'))
+            for error in check_puzzle(text.splitlines(True))]
+
+
+def test_good_puzzle():
+    assert checks(PUZZLE) == []
+
+
+def test_problems_of_a_puzzle():
+    assert checks(PUZZLE.replace('2 0 2 2', '2 0 2 9')) == [('bounds', 2)]
+    assert checks(PUZZLE.replace('2 0 2 2', '0 0 1 2')) == [('shape', 2)]
+    assert checks(PUZZLE.replace('2 0 2 2', '0 0 0 1')) == [('overlap', 2)]
+    assert checks(PUZZLE.replace('0 3 2 3', '0 0 0 2')) == [('overlap', 3)]
+    assert checks(PUZZLE.replace('W E B B', 'W E B')) == [('grid', None)]
+    assert checks(PUZZLE.replace('S X X X', 'P A S S').replace(
+        '0 3 2 3', '3 0 3 3')) == [('blacklisted', 3)]
+    assert checks('C A T\n') == [('format', None)]
+
+
+def test_files_in_order(tmp_path):
+    for i in range(6):
+        text = PUZZLE if i % 2 else PUZZLE.replace('2 0 2 2', '2 0 2 9')
+        (tmp_path / ('%s.txt' % i)).write_text(text)
+    (tmp_path / 'notes.md').write_text('not a puzzle')
+    files = puzzle_files([str(tmp_path)])
+    assert [path[-5:] for path in files] == ['%s.txt' % i for i in range(6)]
+    for processes in (1, 2):
+        results = list(validate(files, processes=processes))
+        assert [result['valid'] for result in results] == [
+            False, True] * 3
+    assert list(validate([str(tmp_path / 'missing.txt')]))[0]['errors'][0][
+        'check'] == 'file'
+
+
+def test_command(tmp_path):
+    (tmp_path / 'good.txt').write_text(PUZZLE)
+    runner = CliRunner()
+    result = runner.invoke(app, ['validate', str(tmp_path)])
+    assert result.exit_code == 0
+    assert json.loads(result.output.splitlines()[0])['valid']
+
+    (tmp_path / 'bad.txt').write_text('C A T\n')
+    result = runner.invoke(app, ['validate', str(tmp_path),
+                                 '--processes', '1'])
+    assert result.exit_code == 1
+    assert not json.loads(result.output.splitlines()[0])['valid']
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from bdgame.utils.location import Location
+from bdgame.utils.words import WordIndex
+
+A, B, C = Location([0, 0, 0, 2]), Location([1, 0, 1, 2]), Location([2, 0])
+
+
+def index():
+    words = WordIndex()
+    words.extend('CAT', [A, B])
+    words.add('OX', C)
+    return words
+
+
+def test_claims_in_and_out_of_turn():
+    words = index()
+    words.extend('CAT', [C])
+    assert (len(words), words.total, words.remaining) == (2, 4, 4)
+    assert words.claim('CAT', 0) == A
+    assert words.claim('CAT', 0) is None
+    assert words.claim('CAT') == B
+    assert words.unclaimed('CAT') == [C]
+    assert words.claimed('CAT') == [A, B]
+    assert words.claim('CAT') == C
+    assert words.claim('CAT') is None
+    assert words.claim('DOG') is None
+    assert (words.count('CAT'), words.remaining) == (0, 1)
+    words.remove('OX')
+    assert 'OX' not in words
+    assert (words.total, words.remaining) == (3, 0)
+
+
+def test_copy_is_independent():
+    words = index()
+    words.claim('CAT', 0)
+    copy = words.copy()
+    copy.extend('CAT', [C])
+    copy.extend('OX', [A])
+    copy.claim('CAT')
+    copy.claim('OX')
+    assert words.locations('CAT') == [A, B]
+    assert words.locations('OX') == [C]
+    assert words.unclaimed('CAT') == [B]
+    assert (words.count('OX'), words.total, words.remaining) == (1, 3, 2)
+    assert copy.total == 5
+
+
+def test_restore():
+    words = index()
+    words.extend('CAT', [C])
+    copy = words.copy()
+    copy.claim('CAT', 1)
+    copy.claim('CAT')
+    words.restore('CAT', copy.unclaimed('CAT'))
+    assert words.unclaimed('CAT') == copy.unclaimed('CAT') == [A]
+    assert words.remaining == copy.remaining == 2
+    assert words.claim('CAT') == A
+
+
+def test_restore_same_location_twice():
+    words = WordIndex()
+    words.extend('WEB', [A, B, A])
+    words.claim('WEB', 1)
+    words.restore('WEB', [A, A])
+    assert words.count('WEB') == 2
+    assert words.claimed('WEB') == [B]
+    assert words.claim('WEB', 0) == A
+    assert words.claim('WEB', 2) == A
+    assert words.claim('WEB') is None